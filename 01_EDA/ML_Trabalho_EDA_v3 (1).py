@@ -9,6 +9,10 @@ import pandas as pd                     # Importa a biblioteca pandas e a apelid
 import numpy as np                      # Importa a biblioteca numpy e a apelida de 'np' para operações numéricas, especialmente com arrays.
 import matplotlib.pyplot as plt         # Importa o submódulo pyplot da biblioteca matplotlib e o apelida de 'plt' para criar gráficos.
 import seaborn as sns                   # Importa a biblioteca seaborn e a apelida de 'sns' para visualizações estatísticas mais atraentes.
+import os                               # Caminho da pasta dos módulos compartilhados.
+import sys                              # Permite importar o módulo de rastreamento da pasta 04_Treinamento.
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '04_Treinamento'))  # Pasta dos módulos compartilhados.
+from rastreamento import TRACER, traced  # Rastreamento de tempo/memória por etapa (ativar com TRACE_ETAPAS=1).
 
 # ==============================================================================
 # SEÇÃO 2: CONFIGURAÇÕES GLOBAIS
@@ -43,6 +47,7 @@ nome_dataset2 = 'Dataset 2: Original + Sinteticos'      # Define um nome descrit
 # ==============================================================================
 # Esta seção contém a definição da função `carregar_e_limpar_dados`.
 
+@traced('carga_dados')  # Cada carregamento vira uma etapa do trace.
 def carregar_e_limpar_dados(nome_arquivo, nome_dataset_str):
     """
     Carrega um arquivo CSV, realiza limpeza básica de dados e imprime informações iniciais.
@@ -166,6 +171,7 @@ df2 = carregar_e_limpar_dados(nome_arquivo2, nome_dataset2)  # Carrega e process
 # "Adequação MILHO" entre os dois datasets. Inclui a impressão das porcentagens
 # de cada classe e a geração de um gráfico de barras comparativo.
 
+TRACER.begin('grafico[adequacao_milho]')  # Rastreamento da etapa (sem efeito se desativado).
 print("\n\n--- ANÁLISE COMPARATIVA DA COLUNA 'Adequação MILHO' ---")  # Imprime o título da seção de análise.
 adequacao_column_name = "Adequação MILHO"  # Define o nome da coluna a ser analisada.
 classes_ordem = ['Baixa', 'Média', 'Alta']  # Define a ordem desejada das classes para exibição e no gráfico.
@@ -250,6 +256,8 @@ print("--- FIM DA ANÁLISE DA COLUNA 'Adequação MILHO' ---")  # Imprime o fim
 # Esta seção realiza uma análise univariada para cada coluna numérica comum aos dois datasets.
 # Para cada coluna, gera histogramas e boxplots comparativos e calcula estatísticas de outliers.
 
+TRACER.end()  # Fim da etapa rastreada.
+TRACER.begin('analise_univariada')  # Rastreamento da etapa (sem efeito se desativado).
 print("\n\n--- INÍCIO DA ANÁLISE UNIVARIADA COMPARATIVA E DETECÇÃO DE OUTLIERS ---")  # Imprime o título da seção.
 if df1 is not None and df2 is not None:  # Verifica se ambos os DataFrames foram carregados.
     colunas_atributos1 = df1.columns.drop(
@@ -364,6 +372,8 @@ print("--- FIM DA ANÁLISE UNIVARIADA COMPARATIVA E DETECÇÃO DE OUTLIERS ---\n
 # Esta seção calcula e visualiza as matrizes de correlação para as colunas numéricas
 # de cada dataset, apresentando-as como heatmaps comparativos.
 
+TRACER.end()  # Fim da etapa rastreada.
+TRACER.begin('grafico[correlacao]')  # Rastreamento da etapa (sem efeito se desativado).
 print("\n--- ANÁLISE BIVARIADA COMPARATIVA (MATRIZ DE CORRELAÇÃO) ---")  # Imprime o título da seção.
 num_heatmaps = 0  # Inicializa um contador para o número de heatmaps a serem gerados.
 if df1 is not None and not df1.select_dtypes(
@@ -457,6 +467,7 @@ else:  # Caso nenhum dataset possua colunas numéricas.
     print(
         "Nenhum dos DataFrames possui colunas numéricas para gerar heatmaps de correlação.")  # Informa que não é possível gerar heatmaps.
 print("\n--- FIM DA ANÁLISE EXPLORATÓRIA COMPARATIVA ---")  # Imprime o fim da seção de análise exploratória.
+TRACER.end()  # Fim da etapa rastreada.
 
 # ==============================================================================
 # SEÇÃO 9: EXIBIÇÃO DOS GRÁFICOS
@@ -474,4 +485,6 @@ else:  # Caso nenhuma figura tenha sido criada.
 # SEÇÃO 10: FINALIZAÇÃO DO SCRIPT
 # ==============================================================================
 # Imprime uma mensagem indicando que o script foi finalizado.
+if TRACER.enabled:  # Exporta o trace (abre em chrome://tracing ou ui.perfetto.dev) se o rastreamento estiver ativo.
+    print(f"Trace das etapas salvo em: {TRACER.export_chrome_trace('trace_eda.json')}")
 print("\nScript finalizado.")  # Imprime uma mensagem final no console.
\ No newline at end of file
@@ -2,19 +2,34 @@
 # SEÇÃO: IMPORTAÇÃO DE BIBLIOTECAS E CONFIGURAÇÕES INICIAIS
 # Descrição: Esta seção importa todas as bibliotecas Python necessárias para
 #            o funcionamento do script e define algumas configurações globais
-#            para a visualização de gráficos.
+#            para a visualização de gráficos. matplotlib e seaborn só são
+#            importados quando o primeiro gráfico é gerado (a geração não
+#            depende deles); com SEM_GRAFICOS=1 (execução em lote) os gráficos
+#            não são gerados.
 # ==============================================================================
 
 import pandas as pd  # Importa a biblioteca pandas para manipulação de dados tabulares (DataFrames).
 import numpy as np  # Importa a biblioteca numpy para operações numéricas, especialmente arrays.
-import matplotlib.pyplot as plt  # Importa pyplot da matplotlib para criação de gráficos estáticos.
-import seaborn as sns  # Importa a biblioteca seaborn para visualizações estatísticas mais elaboradas.
 import random  # Importa a biblioteca random para geração de números e seleções aleatórias.
 import os  # Importa a biblioteca os para interagir com o sistema operacional, como manipulação de caminhos de arquivos.
+import sys  # Permite importar o módulo de rastreamento da pasta 04_Treinamento.
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '04_Treinamento'))  # Pasta dos módulos compartilhados.
+from rastreamento import TRACER  # Rastreamento de tempo/memória por etapa (ativar com TRACE_ETAPAS=1).
+from adequacao_culturas import crop_score_frame  # Pontuação vetorizada (todas as linhas de uma vez).
+from monitor_deriva import build_training_profile, save_profile  # Perfil do treino para o monitor de deriva.
+from fidelidade_sinteticos import append_fidelity_log, fidelity_metrics  # Métricas de fidelidade sintético x real.
 
 # --- Configurações Globais de Visualização ---
-sns.set_style('whitegrid')  # Define o estilo dos gráficos seaborn para 'whitegrid' (fundo branco com grades).
-plt.rcParams['figure.figsize'] = (12, 7)  # Define o tamanho padrão das figuras matplotlib para 12x7 polegadas.
+exibir_graficos = os.environ.get('SEM_GRAFICOS', '0') in ('', '0')  # SEM_GRAFICOS=1: sem gráficos (matplotlib/seaborn nem são importados).
+
+
+def carregar_bibliotecas_graficos():
+    """Importa matplotlib/seaborn (apenas quando um gráfico é gerado) e aplica as configurações globais de visualização."""
+    import matplotlib.pyplot as plt  # Importa pyplot da matplotlib para criação de gráficos estáticos.
+    import seaborn as sns  # Importa a biblioteca seaborn para visualizações estatísticas mais elaboradas.
+    sns.set_style('whitegrid')  # Define o estilo dos gráficos seaborn para 'whitegrid' (fundo branco com grades).
+    plt.rcParams['figure.figsize'] = (12, 7)  # Define o tamanho padrão das figuras matplotlib para 12x7 polegadas.
+    return plt, sns
 
 # ==============================================================================
 # SEÇÃO: CARREGAMENTO DO DATASET ORIGINAL
@@ -28,6 +43,7 @@ plt.rcParams['figure.figsize'] = (12, 7)  # Define o tamanho padrão das figuras
 nome_arquivo = 'C:\\Users\\maiqu\\Documents\\Mestrado\\01 - Aprendizado de Maquina\\Trabalho final\\Dataset\\link_r7tjn68rmw-1\\r7tjn68rmw-1\\Original\\SOIL DATA GR.csv'  # Define o caminho completo para o arquivo CSV. Substitua pelo seu caminho, se necessário.
 
 # --- Tentativa de Leitura do Arquivo CSV ---
+TRACER.begin('carga_dados')  # Rastreamento da etapa (sem efeito se desativado).
 try:  # Inicia um bloco de tratamento de exceções.
     df_original = pd.read_csv(nome_arquivo, sep=';',
                               decimal=',')  # Lê o arquivo CSV, especificando ';' como separador de colunas e ',' como separador decimal.
@@ -39,6 +55,7 @@ except FileNotFoundError:  # Captura a exceção se o arquivo não for encontrad
 except Exception as e:  # Captura qualquer outra exceção que possa ocorrer durante o carregamento.
     print(f"Ocorreu um erro ao carregar o CSV: {e}")  # Imprime a mensagem de erro da exceção capturada.
     exit()  # Termina a execução do script.
+TRACER.end()  # Fim da etapa rastreada.
 
 print(
     f"\nDimensões originais do dataset: {df_original.shape[0]} linhas, {df_original.shape[1]} colunas.")  # Imprime as dimensões (linhas, colunas) do DataFrame original.
@@ -120,7 +137,9 @@ def calcular_pontuacao_amostra(amostra, criterios):
     return pontuacao
 
 
-df['Pontuacao_Milho'] = df.apply(lambda row: calcular_pontuacao_amostra(row, criterios_milho), axis=1)
+TRACER.begin('pontuacao_regras[original]')  # Rastreamento da etapa (sem efeito se desativado).
+df['Pontuacao_Milho'] = crop_score_frame(df, {'MILHO': criterios_milho})['Pontuação MILHO']  # Mesmo resultado de calcular_pontuacao_amostra.
+TRACER.end()  # Fim da etapa rastreada.
 
 
 # --- Função para Classificar a Adequação Baseada na Pontuação ---
@@ -158,21 +177,23 @@ if not contagem_classes_milho_original.empty:
     print(contagem_classes_milho_original)
     print("\nPercentual por classe de adequação para Milho (Original) (%):")
     print(percentual_classes_milho_original.round(3))
-    plt.figure(figsize=(10, 7))
-    ax_orig = sns.countplot(x=df['Adequacao_Milho'], hue=df['Adequacao_Milho'], order=ordem_desejada, palette="viridis",
-                            legend=False)
-    plt.title('Distribuição Original da Adequação do Solo para Milho', fontsize=15)
-    plt.xlabel('Classe de Adequação', fontsize=12);
-    plt.ylabel('Número de Amostras', fontsize=12)
-    plt.xticks(rotation=45, ha='right')
-    total_amostras_original_plot = len(df['Adequacao_Milho'].dropna())
-    for p in ax_orig.patches:
-        altura = p.get_height()
-        percent = (altura / total_amostras_original_plot) * 100 if total_amostras_original_plot > 0 else 0
-        ax_orig.text(p.get_x() + p.get_width() / 2., altura + total_amostras_original_plot * 0.005,
-                     f'{altura}\n({percent:.1f}%)', ha='center', va='bottom', fontsize=10)
-    plt.tight_layout();
-    plt.show()
+    if exibir_graficos:
+        plt, sns = carregar_bibliotecas_graficos()
+        plt.figure(figsize=(10, 7))
+        ax_orig = sns.countplot(x=df['Adequacao_Milho'], hue=df['Adequacao_Milho'], order=ordem_desejada, palette="viridis",
+                                legend=False)
+        plt.title('Distribuição Original da Adequação do Solo para Milho', fontsize=15)
+        plt.xlabel('Classe de Adequação', fontsize=12);
+        plt.ylabel('Número de Amostras', fontsize=12)
+        plt.xticks(rotation=45, ha='right')
+        total_amostras_original_plot = len(df['Adequacao_Milho'].dropna())
+        for p in ax_orig.patches:
+            altura = p.get_height()
+            percent = (altura / total_amostras_original_plot) * 100 if total_amostras_original_plot > 0 else 0
+            ax_orig.text(p.get_x() + p.get_width() / 2., altura + total_amostras_original_plot * 0.005,
+                         f'{altura}\n({percent:.1f}%)', ha='center', va='bottom', fontsize=10)
+        plt.tight_layout();
+        plt.show()
 else:
     print("Não foi possível calcular a contagem/percentual das classes de adequação no dataset original.")
 
@@ -378,6 +399,7 @@ if not contagem_classes_milho_original.empty:  # Se o dataset original tem conta
                 f"    Aviso: Nenhuma amostra base encontrada para a classe '{classe_alvo_geracao}'. Não é possível gerar sintéticos com ruído para esta classe.")
             continue  # Pula para a próxima classe.
 
+        TRACER.begin('geracao', classe=classe_alvo_geracao, necessarios=int(num_sinteticos_necessarios))  # Rastreamento por classe.
         while sinteticos_adicionados_para_esta_classe < num_sinteticos_necessarios:  # Loop até gerar o necessário.
             if total_geral_tentativas_para_classe > num_sinteticos_necessarios * MAX_RETRIES_PER_INDIVIDUAL_SAMPLE * 1.5:  # Limite de segurança.
                 print(f"    Aviso: Limite total de tentativas para a classe '{classe_alvo_geracao}' atingido.")
@@ -426,6 +448,7 @@ if not contagem_classes_milho_original.empty:  # Se o dataset original tem conta
                 # A mensagem de alerta final da classe indicará se o total não foi atingido.
                 pass
 
+        TRACER.end()  # Fim da geração da classe.
         if sinteticos_adicionados_para_esta_classe < num_sinteticos_necessarios:  # Checagem final para a classe.
             print(
                 f"  Alerta Final para Classe '{classe_alvo_geracao}': Gerou apenas {sinteticos_adicionados_para_esta_classe} de {num_sinteticos_necessarios} amostras desejadas.")
@@ -455,10 +478,12 @@ else:  # Se não foram gerados sintéticos.
     df_combinado = df.assign(FonteDados='Original', ClasseAlvoGeracao=df['Adequacao_Milho'])  # Combinado é só original.
     print("\nNenhuma amostra sintética foi gerada.")
 
-df_combinado['Pontuacao_Milho'] = df_combinado.apply(lambda row: calcular_pontuacao_amostra(row, criterios_milho),
-                                                     axis=1)  # Recalcula pontuação.
+TRACER.begin('pontuacao_regras[combinado]')  # Rastreamento da etapa (sem efeito se desativado).
+df_combinado['Pontuacao_Milho'] = crop_score_frame(df_combinado, {'MILHO': criterios_milho})[
+    'Pontuação MILHO']  # Recalcula pontuação.
 df_combinado['Adequacao_Milho'] = df_combinado['Pontuacao_Milho'].apply(
     classificar_adequacao_milho)  # Recalcula classificação.
+TRACER.end()  # Fim da etapa rastreada.
 
 # ==============================================================================
 # SEÇÃO: ANÁLISE DA DISTRIBUIÇÃO DAS CLASSES NO DATASET COMBINADO
@@ -473,21 +498,23 @@ if not contagem_classes_combinado.empty:
     print(contagem_classes_combinado)
     print("\nPercentual por classe de adequação para Milho (Dataset Combinado) (%):")
     print(percentual_classes_combinado.round(3))
-    plt.figure(figsize=(10, 7))
-    ax_comb = sns.countplot(x=df_combinado['Adequacao_Milho'], hue=df_combinado['Adequacao_Milho'],
-                            order=ordem_desejada, palette="magma", legend=False)
-    plt.title('Distribuição da Adequação do Solo para Milho (com Dados Sintéticos)', fontsize=15)
-    plt.xlabel('Classe de Adequação', fontsize=12);
-    plt.ylabel('Número de Amostras', fontsize=12)
-    plt.xticks(rotation=45, ha='right')
-    total_amostras_combinado_plot = len(df_combinado['Adequacao_Milho'].dropna())
-    for p in ax_comb.patches:
-        altura = p.get_height()
-        percent = (altura / total_amostras_combinado_plot) * 100 if total_amostras_combinado_plot > 0 else 0
-        ax_comb.text(p.get_x() + p.get_width() / 2., altura + total_amostras_combinado_plot * 0.005,
-                     f'{altura}\n({percent:.1f}%)', ha='center', va='bottom', fontsize=10)
-    plt.tight_layout();
-    plt.show()
+    if exibir_graficos:
+        plt, sns = carregar_bibliotecas_graficos()
+        plt.figure(figsize=(10, 7))
+        ax_comb = sns.countplot(x=df_combinado['Adequacao_Milho'], hue=df_combinado['Adequacao_Milho'],
+                                order=ordem_desejada, palette="magma", legend=False)
+        plt.title('Distribuição da Adequação do Solo para Milho (com Dados Sintéticos)', fontsize=15)
+        plt.xlabel('Classe de Adequação', fontsize=12);
+        plt.ylabel('Número de Amostras', fontsize=12)
+        plt.xticks(rotation=45, ha='right')
+        total_amostras_combinado_plot = len(df_combinado['Adequacao_Milho'].dropna())
+        for p in ax_comb.patches:
+            altura = p.get_height()
+            percent = (altura / total_amostras_combinado_plot) * 100 if total_amostras_combinado_plot > 0 else 0
+            ax_comb.text(p.get_x() + p.get_width() / 2., altura + total_amostras_combinado_plot * 0.005,
+                         f'{altura}\n({percent:.1f}%)', ha='center', va='bottom', fontsize=10)
+        plt.tight_layout();
+        plt.show()
 else:
     print("Não foi possível calcular a contagem/percentual das classes no dataset combinado.")
 
@@ -519,7 +546,44 @@ if not df_sinteticos_para_salvar.empty:  # Se há sintéticos para salvar.
         print(f"\nDados sintéticos salvos com sucesso em: {caminho_saida_sinteticos}")
     except Exception as e:
         print(f"\nErro ao salvar os dados sintéticos: {e}")
+
+    # ==========================================================================
+    # SUBSEÇÃO: FIDELIDADE DOS SINTÉTICOS (SUBSTITUI A COMPARAÇÃO VISUAL DO EDA)
+    # Descrição: KS por atributo, distância entre as correlações e MMD (random
+    #            features), no total e por classe. Cada execução acrescenta uma
+    #            linha ao historico_fidelidade.csv, com os parâmetros do ruído,
+    #            para comparar configurações do gerador sem olhar gráficos.
+    # ==========================================================================
+    try:
+        fidelidade = fidelity_metrics(df, df_sinteticos_para_salvar, target='Adequacao_Milho',
+                                      exclude_columns=('ID', 'Pontuacao_Milho'))
+        print("\n--- FIDELIDADE DOS SINTÉTICOS EM RELAÇÃO AO ORIGINAL (0 = distribuições iguais) ---")
+        print(fidelidade['per_class'].round(4).to_string(index=False))
+        caminho_historico = append_fidelity_log(
+            fidelidade, os.path.join(diretorio_base, "historico_fidelidade.csv"), fracao_std_ruido=FRACAO_STD_RUIDO,
+            max_retries=MAX_RETRIES_PER_INDIVIDUAL_SAMPLE, n_sinteticos=len(df_sinteticos_para_salvar))
+        print(f"Resumo da fidelidade acrescentado a: {caminho_historico}")
+    except Exception as e:
+        print(f"\nErro ao calcular a fidelidade dos sintéticos: {e}")
 else:
     print("\nNenhum dado sintético foi gerado/encontrado para salvar.")
 
+# ==============================================================================
+# SEÇÃO: PERFIL DO DATASET ORIGINAL PARA O MONITOR DE DERIVA
+# Descrição: Além do std/min/max usados no ruído (original_df_stats), salva
+#            momentos, quantis e o histograma da pontuação (geral e por classe)
+#            das colunas originais. O monitor_deriva.py compara as novas
+#            amostras do laboratório com esse perfil.
+# ==============================================================================
+try:
+    diretorio_base = os.path.dirname(nome_arquivo) if nome_arquivo and os.path.dirname(nome_arquivo) else os.getcwd()
+    caminho_perfil = save_profile(build_training_profile(df, features=colunas_para_ruido),
+                                  os.path.join(diretorio_base, "perfil_treinamento.json"))
+    print(f"Perfil do dataset original (monitor de deriva) salvo em: {caminho_perfil}")
+except Exception as e:
+    print(f"\nErro ao salvar o perfil do dataset original: {e}")
+
+if TRACER.enabled:  # Exporta o trace (abre em chrome://tracing ou ui.perfetto.dev) se o rastreamento estiver ativo.
+    print(f"Trace das etapas salvo em: {TRACER.export_chrome_trace('trace_gerador_sinteticos.json')}")
+
 print("\n--- FIM DO SCRIPT ---")
\ No newline at end of file
@@ -4,21 +4,28 @@
 # Esta seção importa todas as bibliotecas Python necessárias para a execução do script.
 # - pandas: Para manipulação e análise de dados tabulares (DataFrames).
 # - numpy: Para operações numéricas eficientes, especialmente com arrays.
-# - matplotlib.pyplot: Para criar gráficos estáticos, animados e interativos.
-# - seaborn: Baseada no matplotlib, fornece uma interface de alto nível para desenhar gráficos estatísticos atraentes.
-# - sklearn.preprocessing.MinMaxScaler: Para normalizar features escalando-as para um intervalo específico (geralmente [0, 1]).
 # - os: Fornece uma maneira de usar funcionalidades dependentes do sistema operacional, como manipulação de caminhos de arquivo e diretórios.
-# - tkinter: Para criar interfaces gráficas de usuário (GUI), usado aqui para exibir o DataFrame em uma janela.
+# As bibliotecas pesadas são importadas apenas onde são usadas, para que o
+# pré-processamento comece sem esperar por elas (importá-las levava mais tempo
+# que pré-processar o dataset):
+# - matplotlib.pyplot e seaborn: apenas no gráfico da Seção 5.
+# - tkinter: apenas na janela de visualização da Seção 10.
+# - A normalização Min-Max (Seção 7) é feita com pandas, com as mesmas operações
+#   do sklearn.preprocessing.MinMaxScaler (o sklearn sozinho levava ~1,3 s para importar).
+# Com SEM_GRAFICOS=1 (execução em lote) o gráfico e a janela não são exibidos.
+#
+# Execução (de qualquer pasta; os módulos compartilhados de 04_Treinamento são
+# localizados a partir do caminho deste arquivo, não do diretório atual):
+#   python 03_PreProcessamento/ML_Trabalho_PREprocessamento_v4.py
+#   SEM_GRAFICOS=1 python 03_PreProcessamento/ML_Trabalho_PREprocessamento_v4.py
 
 import pandas as pd  # Importa a biblioteca pandas e a apelida de 'pd'.
 import numpy as np  # Importa a biblioteca numpy e a apelida de 'np'.
-import matplotlib.pyplot as plt  # Importa o submódulo pyplot da matplotlib e o apelida de 'plt'.
-import seaborn as sns  # Importa a biblioteca seaborn e a apelida de 'sns'.
-from sklearn.preprocessing import \
-    MinMaxScaler  # Importa a classe MinMaxScaler do módulo de pré-processamento do scikit-learn.
 import os  # Importa o módulo 'os' para interagir com o sistema operacional, como criar pastas.
-import tkinter as tk  # Importa a biblioteca Tkinter para GUI
-from tkinter import ttk  # Importa o themed Tkinter (melhor aparência dos widgets)
+import sys  # Permite importar o módulo de rastreamento da pasta 04_Treinamento.
+sys.path.insert(0, os.path.normpath(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '04_Treinamento')))  # Pasta dos módulos compartilhados (antes de outros módulos com o mesmo nome).
+from rastreamento import TRACER  # Rastreamento de tempo/memória por etapa (ativar com TRACE_ETAPAS=1).
+from armazem_quantizado import feature_store_path, write_feature_store  # Cópia compacta (uint8/uint16) do dataset salvo.
 
 # ==============================================================================
 # SEÇÃO 1: DEFINIÇÕES INICIAIS E CONFIGURAÇÕES
@@ -41,6 +48,7 @@ col_areia = 'Sand %'  # Define o nome da coluna que representa a porcentagem de
 col_argila = 'Clay %'  # Define o nome da coluna que representa a porcentagem de argila.
 col_silte = 'Silt %'  # Define o nome da coluna que representa a porcentagem de silte.
 col_ph_nome = 'pH'  # Define o nome da coluna que representa o pH do solo.
+exibir_graficos_e_janelas = os.environ.get('SEM_GRAFICOS', '0') in ('', '0')  # SEM_GRAFICOS=1: sem gráfico e sem janela (matplotlib/seaborn/tkinter nem são importados).
 
 # Definições para salvamento
 sufixo_preprocessado_completo = "_PREPROCESSADO_COMPLETO"  # Sufixo para o nome do arquivo CSV completo após o pré-processamento.
@@ -57,6 +65,7 @@ print(
 # Também lida com possíveis erros durante o carregamento, como arquivo não encontrado.
 
 # --- 2. CARREGAMENTO DO DATASET ---
+TRACER.begin('carga_dados')  # Rastreamento da etapa (sem efeito se desativado).
 try:  # Inicia um bloco de tratamento de exceções para o carregamento do arquivo.
     df = pd.read_csv(caminho_arquivo, sep=';',
                      decimal=',')  # Tenta ler o arquivo CSV, especificando ';' como separador de colunas e ',' como separador decimal.
@@ -81,6 +90,8 @@ df.columns = df.columns.str.strip()  # Remove espaços em branco do início e do
 # o que ajuda a limpar o dataset de entradas completamente vazias.
 
 # --- 3. REMOÇÃO DE LINHAS E COLUNAS TOTALMENTE EM BRANCO ---
+TRACER.end()  # Fim da etapa rastreada.
+TRACER.begin('limpeza_vazios')  # Rastreamento da etapa (sem efeito se desativado).
 print("\n--- Removendo linhas e colunas totalmente em branco ---")  # Imprime um título para esta seção.
 colunas_originais = df.columns.tolist()  # Armazena a lista de nomes de colunas originais antes da remoção.
 linhas_originais = df.shape[0]  # Armazena o número original de linhas antes da remoção.
@@ -121,6 +132,8 @@ print("✅ Remoção de linhas e colunas vazias concluída.")  # Sinaliza a conc
 # 2. pH: identifica se os valores de pH estão fora da faixa fisicamente plausível (0-14).
 
 # --- 4. IDENTIFICAÇÃO DE OUTLIERS (TEXTURA E PH) ---
+TRACER.end()  # Fim da etapa rastreada.
+TRACER.begin('regra[soma_textura]')  # Rastreamento da etapa (sem efeito se desativado).
 print(f"\n--- Identificando Outliers (Soma das Frações Texturais e pH) ---")  # Imprime o título principal da seção.
 
 coluna_id_existe_em_df_limpo = True if coluna_id and isinstance(coluna_id,
@@ -210,6 +223,8 @@ print("✅ Verificação de outliers na soma das frações texturais concluída.
 # Verifica se os valores na coluna 'pH' estão dentro da faixa fisicamente plausível (0 a 14).
 # Valores fora dessa faixa são considerados outliers.
 
+TRACER.end()  # Fim da etapa rastreada.
+TRACER.begin('regra[pH]')  # Rastreamento da etapa (sem efeito se desativado).
 print(f"\n--- Verificando outliers na coluna '{col_ph_nome}' ---")  # Título da subseção.
 print(f"    (Outlier identificado se pH < 0 ou pH > 14)")  # Explica o critério de outlier para pH.
 if col_ph_nome in df_limpo.columns:  # Verifica se a coluna de pH existe no DataFrame.
@@ -274,6 +289,8 @@ print("✅ Identificação de Outliers (Textura e pH) concluída.")  # Sinaliza
 # e exibe um gráfico de barras com esses percentuais, na ordem "Baixa", "Média", "Alta".
 
 # --- 5. ANÁLISE DA COLUNA "Adequação MILHO" (PERCENTUAL E GRÁFICO) ---
+TRACER.end()  # Fim da etapa rastreada.
+TRACER.begin('grafico[distribuicao_alvo]')  # Rastreamento da etapa (sem efeito se desativado).
 print(f"\n--- Análise da coluna '{coluna_alvo}' ---")  # Título da seção.
 if coluna_alvo in df_limpo.columns:  # Verifica se a coluna alvo existe no DataFrame.
     ordem_desejada_classes = ['Baixa', 'Média',
@@ -287,27 +304,30 @@ if coluna_alvo in df_limpo.columns:  # Verifica se a coluna alvo existe no DataF
     for classe, percent in percentual_classes.items():  # Itera sobre as classes e suas porcentagens (já ordenadas).
         print(f"  {classe}: {percent:.2f}%")  # Imprime cada classe e sua respectiva porcentagem formatada.
 
-    plt.figure(figsize=(8, 5))  # Cria uma nova figura matplotlib para o gráfico com tamanho 8x5 polegadas.
-    sns.barplot(  # Cria um gráfico de barras usando a biblioteca seaborn.
-        x=percentual_classes.index,  # Define as categorias do eixo X (nomes das classes, já ordenados).
-        y=percentual_classes.values,  # Define os valores do eixo Y (as porcentagens).
-        hue=percentual_classes.index,
-        # Usa as classes também para o parâmetro 'hue', permitindo aplicar a paleta por classe e resolver um FutureWarning do seaborn.
-        palette="viridis",  # Define a paleta de cores "viridis" para o gráfico.
-        legend=False,  # Desativa a legenda automática para 'hue', pois seria redundante com os rótulos do eixo X.
-        order=ordem_desejada_classes  # Define explicitamente a ordem das barras no gráfico.
-    )
-    plt.title(f'Percentual de Classes - {coluna_alvo}')  # Define o título do gráfico.
-    plt.ylabel('Porcentagem (%)')  # Define o rótulo do eixo Y.
-    plt.xlabel('Classe')  # Define o rótulo do eixo X.
-    plt.ylim(0,
-             max(percentual_classes.values) + 10 if not percentual_classes.empty else 100)  # Ajusta o limite superior do eixo Y para melhor visualização dos valores anotados sobre as barras.
-    for i, v in enumerate(
-            percentual_classes.values):  # Itera sobre os valores das porcentagens para anotá-los no gráfico.
-        plt.text(i, v + 1, f"{v:.1f}%", color='black',
-                 ha='center')  # Adiciona o texto da porcentagem acima de cada barra.
-    plt.tight_layout()  # Ajusta o layout do gráfico para evitar sobreposição de elementos.
-    plt.show()  # Exibe o gráfico gerado.
+    if exibir_graficos_e_janelas:  # Gráfico opcional: matplotlib/seaborn são importados apenas aqui.
+        import matplotlib.pyplot as plt  # Importa o submódulo pyplot da matplotlib e o apelida de 'plt'.
+        import seaborn as sns  # Importa a biblioteca seaborn e a apelida de 'sns'.
+        plt.figure(figsize=(8, 5))  # Cria uma nova figura matplotlib para o gráfico com tamanho 8x5 polegadas.
+        sns.barplot(  # Cria um gráfico de barras usando a biblioteca seaborn.
+            x=percentual_classes.index,  # Define as categorias do eixo X (nomes das classes, já ordenados).
+            y=percentual_classes.values,  # Define os valores do eixo Y (as porcentagens).
+            hue=percentual_classes.index,
+            # Usa as classes também para o parâmetro 'hue', permitindo aplicar a paleta por classe e resolver um FutureWarning do seaborn.
+            palette="viridis",  # Define a paleta de cores "viridis" para o gráfico.
+            legend=False,  # Desativa a legenda automática para 'hue', pois seria redundante com os rótulos do eixo X.
+            order=ordem_desejada_classes  # Define explicitamente a ordem das barras no gráfico.
+        )
+        plt.title(f'Percentual de Classes - {coluna_alvo}')  # Define o título do gráfico.
+        plt.ylabel('Porcentagem (%)')  # Define o rótulo do eixo Y.
+        plt.xlabel('Classe')  # Define o rótulo do eixo X.
+        plt.ylim(0,
+                 max(percentual_classes.values) + 10 if not percentual_classes.empty else 100)  # Ajusta o limite superior do eixo Y para melhor visualização dos valores anotados sobre as barras.
+        for i, v in enumerate(
+                percentual_classes.values):  # Itera sobre os valores das porcentagens para anotá-los no gráfico.
+            plt.text(i, v + 1, f"{v:.1f}%", color='black',
+                     ha='center')  # Adiciona o texto da porcentagem acima de cada barra.
+        plt.tight_layout()  # Ajusta o layout do gráfico para evitar sobreposição de elementos.
+        plt.show()  # Exibe o gráfico gerado.
     print(
         f"✅ Análise percentual e gráfico da coluna '{coluna_alvo}' concluídos com ordem personalizada.")  # Sinaliza a conclusão da etapa.
 else:  # Caso a coluna alvo não seja encontrada.
@@ -321,6 +341,8 @@ else:  # Caso a coluna alvo não seja encontrada.
 # ("Baixa", "Média", "Alta") para valores numéricos (0, 5, 10, respectivamente).
 
 # --- 6. ALTERAÇÃO DA COLUNA "Adequação MILHO" PARA VALORES DECIMAIS ---
+TRACER.end()  # Fim da etapa rastreada.
+TRACER.begin('mapeamento_alvo')  # Rastreamento da etapa (sem efeito se desativado).
 print(f"\n--- Mapeando valores da coluna '{coluna_alvo}' ---")  # Título da seção.
 if coluna_alvo in df_limpo.columns:  # Verifica se a coluna alvo existe.
     mapeamento = {'Baixa': 0, 'Média': 5, 'Alta': 10}  # Define o dicionário de mapeamento.
@@ -353,6 +375,8 @@ else:  # Caso a coluna alvo não exista.
 # normalizados são arredondados para 5 casas decimais.
 
 # --- 7. NORMALIZAÇÃO MIN-MAX DE TODAS AS COLUNAS ---
+TRACER.end()  # Fim da etapa rastreada.
+TRACER.begin('normalizacao')  # Rastreamento da etapa (sem efeito se desativado).
 print("\n--- Normalizando colunas para o intervalo [0, 1] ---")  # Título da seção.
 
 # Seleciona todas as colunas que são de tipo numérico para normalização.
@@ -375,9 +399,14 @@ if not colunas_para_normalizar:  # Verifica se há colunas restantes para normal
         "⚠️ Nenhuma coluna numérica (restante) encontrada para normalizar.")
 else:  # Caso haja colunas para normalizar.
     print(f"Colunas a serem normalizadas: {colunas_para_normalizar}")  # Lista as colunas que serão normalizadas.
-    scaler = MinMaxScaler()  # Cria uma instância do normalizador MinMaxScaler.
-    df_limpo[colunas_para_normalizar] = scaler.fit_transform(
-        df_limpo[colunas_para_normalizar])  # Aplica a normalização (ajusta e transforma) às colunas selecionadas.
+    # Mesmas operações do MinMaxScaler (x * escala + deslocamento, em float64), sem importar o sklearn.
+    valores_normalizar = df_limpo[colunas_para_normalizar].astype(np.float64)  # Converte as colunas para float64, como o MinMaxScaler.
+    minimos = valores_normalizar.min()  # Mínimo de cada coluna (ignora NaN, como o MinMaxScaler).
+    amplitudes = valores_normalizar.max() - minimos  # Amplitude (máximo - mínimo) de cada coluna.
+    amplitudes[amplitudes < 10 * np.finfo(np.float64).eps] = 1.0  # Colunas constantes: amplitude 1 (como o MinMaxScaler).
+    escalas = 1.0 / amplitudes  # Fator de escala para o intervalo [0, 1].
+    df_limpo[colunas_para_normalizar] = valores_normalizar * escalas + (
+        0.0 - minimos * escalas)  # Aplica a normalização às colunas selecionadas.
     df_limpo[colunas_para_normalizar] = df_limpo[colunas_para_normalizar].round(
         5)  # Arredonda os valores normalizados para 5 casas decimais.
     print(
@@ -392,6 +421,8 @@ else:  # Caso haja colunas para normalizar.
 # Um 'random_state' é usado para garantir que o embaralhamento seja reprodutível.
 
 # --- 8. EMBARALHAMENTO DAS LINHAS DO DATASET ---
+TRACER.end()  # Fim da etapa rastreada.
+TRACER.begin('embaralhamento')  # Rastreamento da etapa (sem efeito se desativado).
 print(f"\n--- Embaralhando as linhas do DataFrame ---")  # Título da seção.
 if not df_limpo.empty:  # Verifica se o DataFrame não está vazio.
     df_limpo = df_limpo.sample(frac=1, random_state=42).reset_index(
@@ -401,6 +432,8 @@ if not df_limpo.empty:  # Verifica se o DataFrame não está vazio.
 else:  # Caso o DataFrame esteja vazio.
     print("⚠️ DataFrame está vazio. Nenhuma linha para embaralhar.")  # Informa que não há linhas para embaralhar.
 
+TRACER.end()  # Fim da etapa rastreada.
+TRACER.begin('salvamento')  # Rastreamento da etapa (sem efeito se desativado).
 print("\n--- Pré-processamento de dados concluído. Iniciando salvamento. ---")  # Mensagem de transição.
 
 # ==============================================================================
@@ -451,6 +484,9 @@ if not df_limpo.empty:  # Verifica se o DataFrame não está vazio.
                         decimal=',')  # Salva o DataFrame 'df_limpo' no caminho especificado, sem o índice, usando ';' como separador e ',' como decimal.
         print(
             f"✅ DataFrame pré-processado completo salvo em: {os.path.join(caminho_arquivos_saida_CSV, nome_arquivo_completo_salvo)}")  # Confirma o salvamento e mostra o caminho completo.
+        caminho_armazem = feature_store_path(os.path.join(caminho_arquivos_saida_CSV, nome_arquivo_completo_salvo))  # Mesmo nome, extensão .quant.
+        write_feature_store(df_limpo, caminho_armazem, decimals=5)  # Ponto fixo na grade do arredondamento (leitura idêntica ao CSV).
+        print(f"✅ Armazém quantizado salvo em: {caminho_armazem}")  # Confirma o salvamento do armazém.
     except Exception as e:  # Captura erros durante o salvamento.
         print(f"❌ Erro ao salvar o DataFrame completo: {e}")  # Imprime a mensagem de erro.
 else:  # Caso o DataFrame esteja vazio.
@@ -464,6 +500,8 @@ else:  # Caso o DataFrame esteja vazio.
 # em uma nova janela GUI utilizando Tkinter.
 
 # Função para exibir DataFrame em uma nova janela Tkinter
+TRACER.end()  # Fim da etapa rastreada.
+
 def exibir_dataframe_em_janela(df, titulo_janela="Visualização do DataFrame"):
     """
     Exibe um DataFrame pandas em uma nova janela Tkinter usando ttk.Treeview.
@@ -471,6 +509,8 @@ def exibir_dataframe_em_janela(df, titulo_janela="Visualização do DataFrame"):
     if df.empty:
         print("DataFrame está vazio. Nada para exibir na janela.")
         return
+    import tkinter as tk  # Importa a biblioteca Tkinter para GUI (apenas quando a janela é aberta).
+    from tkinter import ttk  # Importa o themed Tkinter (melhor aparência dos widgets)
 
     janela = tk.Tk()
     janela.title(titulo_janela)
@@ -532,15 +572,21 @@ if not df_limpo.empty:  # Verifica se o DataFrame final não está vazio.
     print(
         f"Visualizando o DataFrame final com {len(df_para_visualizar)} linhas e {len(df_para_visualizar.columns)} colunas em uma nova janela.")
 
-    try:
-        exibir_dataframe_em_janela(df_para_visualizar, titulo_janela="DataFrame Pré-processado Final")
-        print("✅ Janela de visualização do DataFrame foi aberta. Feche a janela para finalizar o script.")
-    except Exception as e:
-        print(f"❌ Erro ao tentar exibir o DataFrame na janela Tkinter: {e}")
-        print("Como alternativa, exibindo as primeiras 10 linhas no console:")
+    if not exibir_graficos_e_janelas:  # Execução em lote (SEM_GRAFICOS=1): primeiras linhas no console, sem importar o tkinter.
         print(df_para_visualizar.head(10).to_string())
+    else:
+        try:
+            exibir_dataframe_em_janela(df_para_visualizar, titulo_janela="DataFrame Pré-processado Final")
+            print("✅ Janela de visualização do DataFrame foi aberta. Feche a janela para finalizar o script.")
+        except Exception as e:
+            print(f"❌ Erro ao tentar exibir o DataFrame na janela Tkinter: {e}")
+            print("Como alternativa, exibindo as primeiras 10 linhas no console:")
+            print(df_para_visualizar.head(10).to_string())
 
 else:  # Caso o DataFrame final ('df_limpo') esteja vazio.
     print("O DataFrame final ('df_limpo') está vazio. Nada para visualizar.")
 
+if TRACER.enabled:  # Exporta o trace (abre em chrome://tracing ou ui.perfetto.dev) se o rastreamento estiver ativo.
+    print(f"Trace das etapas salvo em: {TRACER.export_chrome_trace('trace_preprocessamento.json')}")
+
 print("\n--- Script Finalizado ---")  # Mensagem final indicando que todo o script foi executado.
\ No newline at end of file
@@ -0,0 +1,312 @@
+# ==============================================================================
+# MÓDULO: PONTUAÇÃO DE ADEQUAÇÃO PARA VÁRIAS CULTURAS
+# Descrição: Generalização vetorizada de calcular_pontuacao_amostra +
+#            classificar_adequacao_milho (02_GeradorDeSinteticos) para várias
+#            culturas ao mesmo tempo. Os critérios de cada cultura
+#            ({atributo: (mínimo, máximo)}) são empilhados em um único tensor de
+#            limites (culturas x atributos x [mínimo, máximo]), de modo que uma
+#            única passada sobre as amostras pontua todas as culturas. As faixas
+#            de pontuação de cada classe viram uma tabela pontuação -> classe por
+#            cultura. A saída tem uma coluna de classe por cultura.
+#            Para sessões de ajuste dos critérios, CriteriaBitmask guarda um bit
+#            por critério em cada amostra e repontua só o critério editado.
+#
+# Uso:
+#   from adequacao_culturas import CRITERIOS_CULTURAS, FAIXAS_PONTUACAO_CULTURAS, crop_suitability
+#   criterios = {**CRITERIOS_CULTURAS, 'SOJA': {'pH': (6.0, 7.0), ...}}
+#   faixas = {**FAIXAS_PONTUACAO_CULTURAS, 'SOJA': {'Baixa': (0, 3), ...}}
+#   df_classes = crop_suitability(df_bruto, criterios, faixas)   # 'Adequação MILHO', 'Adequação SOJA', ...
+#   mascara = CriteriaBitmask(X_bruto, colunas)                  # Milho por padrão.
+#   mascara.update_criterion('pH', (5.0, 6.5))                   # Nova contagem por classe, sem repontuar tudo.
+# ==============================================================================
+
+import numpy as np  # Tensor de limites e pontuação vetorizada.
+import pandas as pd  # Entrada/saída em DataFrame.
+
+from regras_milho import CRITERIOS_MILHO, FAIXAS_PONTUACAO_MILHO  # Critérios do milho já usados no projeto (sem sklearn).
+
+# --- Critérios e faixas de pontuação por cultura (novas culturas entram como novas chaves) ---
+CRITERIOS_CULTURAS = {'MILHO': CRITERIOS_MILHO}
+FAIXAS_PONTUACAO_CULTURAS = {'MILHO': FAIXAS_PONTUACAO_MILHO}
+CLASSE_FORA_FAIXA = 'Indefinido_Fora_Faixa'  # Mesmo rótulo de classificar_adequacao_milho.
+_LINHAS_POR_LOTE = 2 ** 16  # Amostras por lote (o lote transposto cabe na cache).
+
+
+# ==============================================================================
+# SEÇÃO: TENSOR DE LIMITES
+# ==============================================================================
+
+def bounds_tensor(crop_criteria, columns):
+    """
+    Empilha os critérios das culturas em um tensor de limites.
+
+    Um atributo sem critério para a cultura recebe os limites (inf, -inf), que
+    nenhum valor atende; máximo inf = sem limite superior (como no gerador).
+
+    Args:
+        crop_criteria (dict): {cultura: {atributo: (mínimo, máximo)}}.
+        columns (list): Atributos, na ordem das colunas dos dados.
+    Returns:
+        np.ndarray: Limites (n_culturas, n_atributos, 2), na ordem de crop_criteria.
+    """
+    limites = np.empty((len(crop_criteria), len(columns), 2))
+    limites[:, :, 0], limites[:, :, 1] = np.inf, -np.inf
+    posicao = {coluna: i for i, coluna in enumerate(columns)}
+    for i_cultura, criterios in enumerate(crop_criteria.values()):
+        for atributo, (minimo, maximo) in criterios.items():
+            if atributo in posicao:  # Atributo ausente nos dados não pontua (como no gerador).
+                limites[i_cultura, posicao[atributo]] = (minimo, maximo)
+    return limites
+
+
+def score_class_table(score_ranges, max_score):
+    """
+    Tabela pontuação -> índice da classe de uma cultura.
+
+    Args:
+        score_ranges (dict): {classe: (pontuação mínima, máxima)}.
+        max_score (int): Maior pontuação possível (número de critérios).
+    Returns:
+        np.ndarray: Índice da classe (na ordem de score_ranges) para cada pontuação
+                    0..max_score; -1 para pontuações fora de todas as faixas.
+    """
+    tabela = np.full(max_score + 1, -1, dtype=np.int64)
+    for i_classe, (minimo, maximo) in enumerate(score_ranges.values()):
+        tabela[max(minimo, 0):min(maximo, max_score) + 1] = i_classe
+    return tabela
+
+
+# ==============================================================================
+# SEÇÃO: PONTUAÇÃO E CLASSIFICAÇÃO
+# ==============================================================================
+
+def crop_scores(X_raw, columns, crop_criteria=CRITERIOS_CULTURAS, batch_size=_LINHAS_POR_LOTE):
+    """
+    Pontuação de cada amostra para cada cultura, em uma única passada.
+
+    Args:
+        X_raw (np.ndarray): Atributos em unidades originais (n_amostras, n_colunas).
+        columns (list): Nomes das colunas de X_raw.
+        crop_criteria (dict): {cultura: {atributo: (mínimo, máximo)}}.
+        batch_size (int): Amostras por lote (limita a memória intermediária).
+    Returns:
+        np.ndarray: Pontuação (n_amostras, n_culturas), na ordem de crop_criteria. NaN não pontua.
+    """
+    X_raw = np.asarray(X_raw, dtype=float)
+    limites = bounds_tensor(crop_criteria, columns)
+    usadas = np.flatnonzero((limites[:, :, 0] != np.inf).any(axis=0))  # Só colunas com algum critério.
+    minimos, maximos = limites[:, usadas, 0, None], limites[:, usadas, 1, None]  # (culturas, atributos, 1)
+    pontuacao = np.empty((len(crop_criteria), len(X_raw)), dtype=np.int16)
+    for inicio in range(0, len(X_raw), batch_size):
+        # Atributos nas linhas (contíguos): cada comparação pontua o lote inteiro para todas as culturas.
+        bloco = np.ascontiguousarray(X_raw[inicio:inicio + batch_size, usadas].T)
+        acumulado = np.zeros((len(crop_criteria), bloco.shape[1]), dtype=np.int16)
+        for k, valores in enumerate(bloco):
+            acumulado += (valores >= minimos[:, k]) & (valores <= maximos[:, k])  # NaN é False.
+        pontuacao[:, inicio:inicio + batch_size] = acumulado
+    return pontuacao.T
+
+
+def classify_scores(scores, crop_criteria=CRITERIOS_CULTURAS, class_ranges=FAIXAS_PONTUACAO_CULTURAS):
+    """
+    Classe de adequação de cada amostra para cada cultura.
+
+    Args:
+        scores (np.ndarray): Pontuação (n_amostras, n_culturas) de crop_scores.
+        crop_criteria (dict): {cultura: critérios}, na ordem das colunas de scores.
+        class_ranges (dict): {cultura: {classe: (pontuação mínima, máxima)}}.
+    Returns:
+        np.ndarray: Rótulos (n_amostras, n_culturas), dtype object; CLASSE_FORA_FAIXA
+                    para pontuações fora de todas as faixas.
+    """
+    rotulos = np.empty(scores.shape, dtype=object)
+    for i_cultura, (cultura, criterios) in enumerate(crop_criteria.items()):
+        faixas = class_ranges[cultura]
+        tabela = score_class_table(faixas, len(criterios))
+        classes = np.array(list(faixas) + [CLASSE_FORA_FAIXA], dtype=object)  # Índice -1 -> fora da faixa.
+        rotulos[:, i_cultura] = classes[tabela[scores[:, i_cultura]]]
+    return rotulos
+
+
+def crop_score_frame(df, crop_criteria=CRITERIOS_CULTURAS):
+    """
+    Pontuação de cada linha do DataFrame para cada cultura.
+
+    Args:
+        df (pd.DataFrame): Amostras em unidades originais (colunas com os nomes dos critérios).
+        crop_criteria (dict): {cultura: {atributo: (mínimo, máximo)}}.
+    Returns:
+        pd.DataFrame: Uma coluna 'Pontuação <cultura>' por cultura, com o índice de df.
+    """
+    atributos = sorted({atributo for criterios in crop_criteria.values() for atributo in criterios} & set(df.columns))
+    X_raw = df[atributos].apply(pd.to_numeric, errors='coerce').to_numpy(dtype=float)  # Não numérico não pontua.
+    pontuacao = crop_scores(X_raw, atributos, crop_criteria)
+    return pd.DataFrame({f'Pontuação {cultura}': pontuacao[:, i] for i, cultura in enumerate(crop_criteria)},
+                        index=df.index)
+
+
+def crop_suitability(df, crop_criteria=CRITERIOS_CULTURAS, class_ranges=FAIXAS_PONTUACAO_CULTURAS,
+                     include_scores=False):
+    """
+    Classe de adequação de cada linha do DataFrame para cada cultura.
+
+    Args:
+        df (pd.DataFrame): Amostras em unidades originais (colunas com os nomes dos critérios).
+        crop_criteria (dict): {cultura: {atributo: (mínimo, máximo)}}.
+        class_ranges (dict): {cultura: {classe: (pontuação mínima, máxima)}}.
+        include_scores (bool): Inclui também as colunas 'Pontuação <cultura>'.
+    Returns:
+        pd.DataFrame: Uma coluna 'Adequação <cultura>' por cultura, com o índice de df.
+    """
+    pontuacao = crop_score_frame(df, crop_criteria)
+    rotulos = classify_scores(pontuacao.to_numpy(), crop_criteria, class_ranges)
+    resultado = pd.DataFrame({f'Adequação {cultura}': rotulos[:, i] for i, cultura in enumerate(crop_criteria)},
+                             index=df.index)
+    return pd.concat([resultado, pontuacao], axis=1) if include_scores else resultado
+
+
+# ==============================================================================
+# SEÇÃO: MÁSCARA DE BITS POR CRITÉRIO (REPONTUAÇÃO AO EDITAR CRITÉRIOS)
+# ==============================================================================
+
+def _contar_bits(mascaras):
+    """Número de bits 1 de cada máscara (popcount)."""
+    if hasattr(np, 'bitwise_count'):  # numpy >= 2.0.
+        return np.bitwise_count(mascaras)
+    tabela = np.array([bin(valor).count('1') for valor in range(2 ** 16)], dtype=np.uint8)
+    contagem = np.zeros(mascaras.shape, dtype=np.uint8)
+    mascaras = mascaras.astype(np.uint64)
+    for deslocamento in range(0, 64, 16):
+        contagem += tabela[(mascaras >> np.uint64(deslocamento)) & np.uint64(0xFFFF)]
+    return contagem
+
+
+class CriteriaBitmask:
+    """
+    Pontuação de uma cultura mantida como máscara de bits por amostra.
+
+    Cada amostra guarda um bit por critério (1 = atende), em um array uint16,
+    uint32 ou uint64 conforme o número de critérios. A pontuação é o número de
+    bits 1 (popcount) e a classe é uma consulta na tabela pontuação -> classe.
+    Também são mantidos a pontuação de cada amostra e o histograma das
+    pontuações, de modo que:
+    - update_criterion recalcula apenas a coluna de bits do critério editado e
+      atualiza pontuações e histograma só nas amostras que mudaram;
+    - set_class_ranges e class_counts usam apenas o histograma (não percorrem as amostras).
+
+    Args:
+        X_raw (np.ndarray): Atributos em unidades originais (n_amostras, n_colunas).
+        columns (list): Nomes das colunas de X_raw.
+        criteria (dict): {atributo: (mínimo, máximo)} da cultura (ex: CRITERIOS_MILHO).
+        class_ranges (dict): {classe: (pontuação mínima, máxima)} (ex: FAIXAS_PONTUACAO_MILHO).
+    """
+
+    def __init__(self, X_raw, columns, criteria=CRITERIOS_MILHO, class_ranges=FAIXAS_PONTUACAO_MILHO):
+        if len(criteria) > 64:
+            raise ValueError(f"No máximo 64 critérios por máscara ({len(criteria)} informados).")
+        self.criteria = dict(criteria)
+        self.attributes = list(self.criteria)  # Bit k = critério self.attributes[k].
+        self._bit = {atributo: k for k, atributo in enumerate(self.attributes)}
+        self._dtype = np.uint16 if len(self.attributes) <= 16 else np.uint32 if len(self.attributes) <= 32 else np.uint64
+        posicao = {coluna: i for i, coluna in enumerate(columns)}
+        X_raw = np.asarray(X_raw, dtype=float)
+        # Valores por critério (contíguos); atributo ausente nos dados = NaN (nunca pontua, como no gerador).
+        self._valores = np.empty((len(self.attributes), len(X_raw)))
+        for k, atributo in enumerate(self.attributes):
+            self._valores[k] = X_raw[:, posicao[atributo]] if atributo in posicao else np.nan
+
+        self.masks = np.zeros(len(X_raw), dtype=self._dtype)
+        for k in range(len(self.attributes)):
+            self.masks |= self._coluna_bits(k).astype(self._dtype) << self._dtype(k)
+        self.scores = _contar_bits(self.masks).astype(np.uint8)
+        self._histograma = np.bincount(self.scores, minlength=len(self.attributes) + 1)
+        self.set_class_ranges(class_ranges)
+
+    def _coluna_bits(self, k):
+        """Atende (bool) ao critério k, para todas as amostras. NaN não atende."""
+        minimo, maximo = self.criteria[self.attributes[k]]
+        valores = self._valores[k]
+        return (valores >= minimo) & (valores <= maximo)
+
+    # --------------------------------------------------------------------------
+    # Edição dos critérios e das faixas
+    # --------------------------------------------------------------------------
+
+    def update_criterion(self, attribute, bounds):
+        """
+        Troca a faixa de um critério e repontua de forma incremental.
+
+        Args:
+            attribute (str): Atributo já presente nos critérios.
+            bounds (tuple): Nova faixa (mínimo, máximo); máximo inf = sem limite superior.
+        Returns:
+            pd.Series: Contagem por classe após a edição.
+        """
+        if attribute not in self._bit:
+            raise KeyError(f"Critério '{attribute}' não existe. Critérios: {self.attributes}.")
+        k = self._bit[attribute]
+        self.criteria[attribute] = tuple(bounds)
+        bit = self._dtype(1) << self._dtype(k)
+        antes = (self.masks & bit) != 0
+        depois = self._coluna_bits(k)
+        mudou = np.flatnonzero(antes != depois)
+        if len(mudou):
+            pontuacao_antiga = self.scores[mudou]
+            self.masks[mudou] ^= bit
+            ganhou = depois[mudou]
+            pontuacao_nova = np.where(ganhou, pontuacao_antiga + 1, pontuacao_antiga - 1).astype(np.uint8)
+            self.scores[mudou] = pontuacao_nova
+            n_pontuacoes = len(self._histograma)
+            self._histograma += (np.bincount(pontuacao_nova, minlength=n_pontuacoes)
+                                 - np.bincount(pontuacao_antiga, minlength=n_pontuacoes))
+        return self.class_counts()
+
+    def set_class_ranges(self, class_ranges):
+        """
+        Troca as faixas de pontuação das classes (apenas a tabela de consulta muda).
+
+        Args:
+            class_ranges (dict): {classe: (pontuação mínima, máxima)}.
+        Returns:
+            pd.Series: Contagem por classe com as novas faixas.
+        """
+        self.class_ranges = dict(class_ranges)
+        self._tabela = score_class_table(self.class_ranges, len(self.attributes))
+        self._classes = np.array(list(self.class_ranges) + [CLASSE_FORA_FAIXA], dtype=object)
+        return self.class_counts()
+
+    # --------------------------------------------------------------------------
+    # Consultas
+    # --------------------------------------------------------------------------
+
+    def class_counts(self):
+        """
+        Contagem de amostras por classe, a partir do histograma das pontuações.
+
+        Returns:
+            pd.Series: {classe: contagem}, na ordem de class_ranges (CLASSE_FORA_FAIXA
+                       incluída apenas se houver amostras fora das faixas).
+        """
+        contagem = np.zeros(len(self._classes), dtype=np.int64)
+        np.add.at(contagem, self._tabela, self._histograma)  # Índice -1 (fora das faixas) = última posição.
+        contagem = pd.Series(contagem, index=self._classes, name='count')
+        return contagem if contagem[CLASSE_FORA_FAIXA] else contagem.drop(CLASSE_FORA_FAIXA)
+
+    def labels(self):
+        """
+        Classe de cada amostra (consulta na tabela pontuação -> classe).
+
+        Returns:
+            np.ndarray: Rótulos (n_amostras,), dtype object.
+        """
+        return self._classes[self._tabela[self.scores]]
+
+    def criterion_pass_rates(self):
+        """
+        Fração das amostras que atende a cada critério (lida das máscaras).
+
+        Returns:
+            pd.Series: {atributo: fração}.
+        """
+        bits = [np.count_nonzero(self.masks & (self._dtype(1) << self._dtype(k))) for k in range(len(self.attributes))]
+        return pd.Series(bits, index=self.attributes, dtype=float) / max(len(self.masks), 1)
@@ -0,0 +1,584 @@
+# ==============================================================================
+# MÓDULO: ANÁLISES DOS RESULTADOS DE UM EXPERIMENTO
+# Descrição: Funções de análise que antes eram copiadas nos dois notebooks
+#            (boxplots, testes estatísticos, intervalos bootstrap, métricas por
+#            classe, trade-off, SMOTE, ruído gaussiano, ensembles, curvas de
+#            aprendizado e calibração, matrizes de confusão, análise de erros,
+#            comparação de escalonadores, importância por permutação e
+#            auditoria de vazamento). Todas recebem o resultado de um
+#            experimento (experimento.run_experiments) em vez de variáveis
+#            globais do notebook; report_experiment executa as análises
+#            selecionadas pelas flags run_* dos notebooks.
+#            Gráficos (matplotlib/seaborn), testes (scipy.stats), SMOTE e o
+#            gerador por ruído são importados dentro das análises que os usam:
+#            importar o módulo não carrega bibliotecas de análises desativadas.
+# ==============================================================================
+
+import traceback  # Detalhes dos erros nas curvas de calibração.
+
+import numpy as np  # Médias e matrizes.
+import pandas as pd  # Tabelas impressas.
+from sklearn.impute import SimpleImputer
+from sklearn.metrics import brier_score_loss
+from sklearn.model_selection import StratifiedKFold, cross_val_score
+from sklearn.preprocessing import StandardScaler
+
+from auditoria_vazamento import leakage_audit  # Quase duplicatas entre treino e teste via KD-tree.
+from bootstrap_metricas import bootstrap_confidence_intervals  # Intervalos de confiança bootstrap vetorizados.
+from curva_aprendizado import learning_curve_cached  # Curvas de aprendizado com reuso dos folds e cache.
+from ensemble_probabilidades import ensemble_fold_metrics  # Ensembles a partir das probabilidades guardadas.
+from importancia_permutacao import permutation_importance_table  # Importância por permutação em lote.
+from rastreamento import TRACER, traced  # Tempo/memória por análise (desativado por padrão).
+from regras_milho import CRITERIOS_MILHO, FAIXAS_PONTUACAO_MILHO, load_feature_scale  # Regras da sobreamostragem por ruído.
+
+
+# ==============================================================================
+# SEÇÃO: MÉTRICAS DOS FOLDS
+# ==============================================================================
+
+@traced()
+def boxplot_metric(models_results, metric='f1_macro', config_name='Default', eval_label=''):
+    """Boxplot da métrica dos folds por modelo."""
+    import matplotlib.pyplot as plt  # Gráficos (importado só quando a análise é executada).
+    data, labels = [], []
+    for model_name, results in models_results.items():
+        vals = [m[metric] for m in results['fold_metrics']]
+        if vals:
+            data.append(vals)
+            labels.append(model_name)
+    if not data:
+        print(f"Sem dados para plotar boxplot para métrica {metric} na configuração {config_name}.")
+        return
+    plt.figure(figsize=(10, 6))
+    plt.boxplot(data, labels=labels, patch_artist=True)
+    plt.title(f'Boxplot {metric} por Modelo ({config_name})' + (f'\n(Avaliação: {eval_label})' if eval_label else ''))
+    plt.ylabel(metric)
+    plt.xticks(rotation=45, ha="right")
+    plt.grid(True, linestyle='--', alpha=0.7)
+    plt.tight_layout()
+    plt.show()
+
+
+@traced()
+def compare_models_stat_test(models_results, metric='f1_macro', config_name='Default'):
+    """Friedman (>2 modelos), teste T pareado e Wilcoxon (2 modelos) ou Wilcoxon par a par."""
+    from scipy.stats import friedmanchisquare, ttest_rel, wilcoxon  # Testes estatísticos entre modelos.
+    model_scores = {model_name: [m[metric] for m in results['fold_metrics']]
+                    for model_name, results in models_results.items() if results['fold_metrics']}
+    valid_models = {k: v for k, v in model_scores.items() if len(v) > 1}
+    if len(valid_models) < 2:
+        print(f"Não há modelos suficientes com resultados para comparação estatística ({metric}) na configuração {config_name}.")
+        return
+
+    print(f"\nComparação Estatística ({metric}) para Configuração: {config_name}")
+    f1_arrays = list(valid_models.values())
+    same_length = all(len(arr) == len(f1_arrays[0]) for arr in f1_arrays)
+
+    if len(f1_arrays) > 2 and same_length:
+        try:
+            _, p = friedmanchisquare(*f1_arrays)
+            print(f"Teste de Friedman p-valor: {p:.4f}")
+            if p < 0.05:
+                print("  Há diferença estatisticamente significativa entre os modelos.")
+            else:
+                print("  Não há diferença estatisticamente significativa entre os modelos segundo Friedman.")
+        except ValueError as e:
+            print(f"Não foi possível realizar o teste de Friedman: {e}")
+    elif len(f1_arrays) == 2 and same_length:
+        model_names_list = list(valid_models.keys())
+        print(f"Comparando {model_names_list[0]} e {model_names_list[1]}:")
+        try:
+            _, t_p = ttest_rel(f1_arrays[0], f1_arrays[1])
+            print(f"  Teste T pareado: p-valor = {t_p:.4f}")
+        except ValueError as e:
+            print(f"  Não foi possível realizar o Teste T pareado: {e}")
+        try:
+            _, w_p = wilcoxon(f1_arrays[0], f1_arrays[1], zero_method='zsplit')
+            print(f"  Teste de Wilcoxon: p-valor = {w_p:.4f}")
+        except ValueError as e:
+            print(f"  Não foi possível realizar o Teste de Wilcoxon: {e}")
+    else:
+        print("Não foi possível realizar o teste de Friedman (requer >2 grupos com o mesmo número de observações por grupo ou tamanhos diferentes).")
+        print("Comparações par a par (Wilcoxon) para todos os pares de modelos com mesmo número de observações:")
+        model_names_list = list(valid_models.keys())
+        for i in range(len(model_names_list)):
+            for j in range(i + 1, len(model_names_list)):
+                scores1, scores2 = valid_models[model_names_list[i]], valid_models[model_names_list[j]]
+                if len(scores1) == len(scores2) and len(scores1) > 1:
+                    try:
+                        _, p_wilcoxon = wilcoxon(scores1, scores2, zero_method='zsplit')
+                        print(f"  Wilcoxon entre {model_names_list[i]} e {model_names_list[j]}: p-valor={p_wilcoxon:.4f}")
+                    except ValueError as e:
+                        print(f"  Não foi possível realizar Wilcoxon entre {model_names_list[i]} e {model_names_list[j]}: {e}")
+
+
+@traced()
+def bootstrap_ci_report(models_results, class_names, y_true=None, n_resamples=10000, random_state=None,
+                        config_name='Default'):
+    """Intervalos de confiança bootstrap a partir das predições guardadas em fold_metrics."""
+    ci_table = bootstrap_confidence_intervals({config_name: models_results}, class_names, y_true=y_true,
+                                              n_resamples=n_resamples, random_state=random_state)
+    if ci_table.empty:
+        print(f"Sem predições armazenadas para intervalos de confiança na configuração {config_name}.")
+        return
+    print(f"\nIntervalos de Confiança Bootstrap (95%, {n_resamples} reamostragens) para Configuração: {config_name}")
+    for model_name, model_ci in ci_table.groupby('model', sort=False):
+        print(f"\nModelo: {model_name}")
+        for _, row in model_ci.iterrows():
+            print(f"  {row['metric']:<10} {row['class']:<8}: {row['mean']:.3f} [{row['ci_lower']:.3f}, {row['ci_upper']:.3f}]")
+
+
+@traced()
+def class_report_aggregate(models_results, class_names, config_name='Default'):
+    """Precisão, recall e F1 por classe (média ± desvio entre os folds)."""
+    print(f"\nMétricas Agregadas por Classe para Configuração: {config_name}")
+    for model_name, model_data in models_results.items():
+        if not model_data['fold_metrics']:
+            print(f"\nModelo: {model_name} - Sem métricas de fold para agregar.")
+            continue
+        print(f"\nModelo: {model_name}")
+        metrics_accumulator = {cls_name: {'precision': [], 'recall': [], 'f1-score': []} for cls_name in class_names}
+        for fold_data in model_data['fold_metrics']:
+            report = fold_data['report_dict']
+            for cls_name in class_names:  # O report pode não ter uma classe ausente no conjunto de avaliação
+                if cls_name in report:
+                    for metric_name in metrics_accumulator[cls_name]:
+                        metrics_accumulator[cls_name][metric_name].append(report[cls_name][metric_name])
+        for cls_name in class_names:
+            print(f"  Classe: {cls_name}")
+            for metric_name in ['precision', 'recall', 'f1-score']:
+                vals = metrics_accumulator[cls_name][metric_name]
+                if vals:
+                    print(f"    {metric_name.capitalize()}: {np.mean(vals):.3f} ± {np.std(vals):.3f} (de {len(vals)} folds)")
+                else:
+                    print(f"    {metric_name.capitalize()}: N/A (sem dados)")
+
+
+@traced()
+def tradeoff_plot(models_results, config_name='Default', eval_label=''):
+    """Dispersão F1 Macro médio x tempo médio de HPO por modelo."""
+    import matplotlib.pyplot as plt  # Gráficos (importado só quando a análise é executada).
+    models, mean_f1, mean_time_hpo = [], [], []
+    for model_name, model_data in models_results.items():
+        if model_data['fold_metrics'] and model_data['execution_times_hpo']:
+            models.append(model_name)
+            mean_f1.append(np.mean([m['f1_macro'] for m in model_data['fold_metrics']]))
+            mean_time_hpo.append(np.mean(model_data['execution_times_hpo']))
+        elif model_data['fold_metrics']:
+            print(f"Aviso: {model_name} ({config_name}) tem métricas mas não tem tempos de execução HPO para o gráfico de trade-off.")
+    if not models:
+        print(f"Sem dados suficientes para plotar gráfico de trade-off para configuração {config_name}.")
+        return
+
+    plt.figure(figsize=(10, 6))
+    safe_max_time, safe_max_f1 = max(mean_time_hpo), max(mean_f1)
+    plt.scatter(mean_time_hpo, mean_f1, s=100, alpha=0.7, edgecolors="k")
+    for i, model_label in enumerate(models):
+        plt.text(mean_time_hpo[i] + (safe_max_time * 0.01 if safe_max_time > 0 else 0.01),
+                 mean_f1[i] + (safe_max_f1 * 0.01 if safe_max_f1 > 0 else 0.01),
+                 model_label, fontsize=9)
+    plt.xlabel('Tempo Médio de Execução HPO (segundos)')
+    plt.ylabel('F1 Macro Médio' + (f' ({eval_label})' if eval_label else ''))
+    plt.title(f'Trade-off: F1 Macro vs. Tempo de HPO ({config_name})')
+    plt.grid(True, linestyle='--', alpha=0.7)
+    plt.tight_layout()
+    plt.show()
+
+
+# ==============================================================================
+# SEÇÃO: REAMOSTRAGEM E ENSEMBLES
+# ==============================================================================
+
+@traced()
+def smote_scores(X, y, base_models, n_splits=5, random_state=None):
+    """F1 Macro (CV no treino) de cada modelo com SMOTE após imputação e StandardScaler."""
+    from imblearn.over_sampling import SMOTE
+    from imblearn.pipeline import Pipeline as ImbPipeline
+    print("\nResultados com SMOTE (StandardScaler hardcoded, CV no dataset de treino):")
+    for name, mdl in base_models.items():
+        pipe_smote = ImbPipeline([
+            ('imputer', SimpleImputer(strategy="median")),
+            ('scaler', StandardScaler()),
+            ('smote', SMOTE(random_state=random_state)),
+            ('model', mdl)
+        ])
+        try:
+            scores = cross_val_score(pipe_smote, X, y, cv=StratifiedKFold(n_splits=n_splits, shuffle=True, random_state=random_state),
+                                     scoring='f1_macro', n_jobs=-1)
+            print(f"  {name} + SMOTE: F1 Macro = {np.mean(scores):.3f} ± {np.std(scores):.3f}")
+        except Exception as e:
+            print(f"  Erro ao calcular SMOTE score para {name}: {e}")
+
+
+@traced()
+def noise_oversampling_scores(X, y, base_models, label_encoder, raw_dataset_file, n_splits=5, random_state=None):
+    """
+    Mesma sobreamostragem do gerador de sintéticos (ruído gaussiano + validação pelas
+    regras), feita dentro de cada fold apenas na parte de treino (sem CSV pré-aumentado).
+    """
+    from imblearn.pipeline import Pipeline as ImbPipeline
+    from reamostragem_ruido import GaussianNoiseOversampler  # Sobreamostragem por ruído no fold.
+    print("\nResultados com sobreamostragem por ruído gaussiano no fold (StandardScaler hardcoded):")
+    try:
+        feature_scale = load_feature_scale(raw_dataset_file)
+        criteria = CRITERIOS_MILHO
+    except FileNotFoundError:
+        print(f"  AVISO: '{raw_dataset_file}' não encontrado. Amostras geradas sem validação pelas regras.")
+        feature_scale, criteria = None, None
+    # Classes codificadas em ordem crescente (0, 0.5, 1) = Baixa, Média, Alta.
+    classes = label_encoder.transform(label_encoder.classes_)
+    class_score_ranges = dict(zip(classes, FAIXAS_PONTUACAO_MILHO.values()))
+    for name, mdl in base_models.items():
+        pipe_noise = ImbPipeline([
+            ('oversampler', GaussianNoiseOversampler(random_state=random_state, criteria=criteria,
+                                                     class_score_ranges=class_score_ranges,
+                                                     special_texture_class=classes[-1],
+                                                     feature_scale=feature_scale)),
+            ('imputer', SimpleImputer(strategy="median")),
+            ('scaler', StandardScaler()),
+            ('model', mdl)
+        ])
+        try:
+            scores = cross_val_score(pipe_noise, X, y, cv=StratifiedKFold(n_splits=n_splits, shuffle=True, random_state=random_state),
+                                     scoring='f1_macro', n_jobs=-1)
+            print(f"  {name} + Ruído Gaussiano: F1 Macro = {np.mean(scores):.3f} ± {np.std(scores):.3f}")
+        except Exception as e:
+            print(f"  Erro ao calcular score com ruído gaussiano para {name}: {e}")
+
+
+@traced()
+def ensemble_tuned(experiment, models_results, config_name='Default'):
+    """
+    Combina os best_estimators já otimizados (nenhum modelo base é treinado de novo):
+    voto suave = média das probabilidades guardadas no prediction_cache; stacking =
+    regressão logística ajustada fora do fold (nos demais folds de teste ou, com teste
+    fixo, na parte do treino que ficou fora do fold).
+    """
+    print(f"\nResultados com Ensembles dos Modelos Otimizados para Config: {config_name}")
+    for method, method_label in [('soft', 'Voto Suave'), ('stacking', 'Stacking (Regressão Logística)')]:
+        try:
+            ensemble_folds = ensemble_fold_metrics(models_results, experiment['test_sets'], method=method,
+                                                   oof_sets=experiment['oof_sets'],
+                                                   prediction_cache=experiment['prediction_cache'],
+                                                   labels=experiment['labels'], report_labels=experiment['labels'],
+                                                   target_names=experiment['class_names'])
+            if not ensemble_folds:
+                print("  Sem modelos com predict_proba para combinar.")
+                return
+            scores = [fold_data['f1_macro'] for fold_data in ensemble_folds]
+            print(f"  {method_label}: F1 Macro = {np.mean(scores):.3f} ± {np.std(scores):.3f}")
+        except Exception as e:
+            print(f"  Erro ao calcular o ensemble {method_label}: {e}")
+
+
+# ==============================================================================
+# SEÇÃO: CURVAS
+# ==============================================================================
+
+@traced()
+def learning_curve_plot(estimator, X, y, cv, model_name="Modelo", config_name="Default", fitted_folds=None,
+                        cache_dir=None):
+    """
+    Curva de aprendizagem (F1 Macro) no dataset de treino. Com os mesmos folds do
+    loop externo, os estimadores já ajustados em cada fold (fitted_folds) são
+    reaproveitados no ponto de 100% do treino quando têm os mesmos hiperparâmetros.
+    """
+    import matplotlib.pyplot as plt  # Gráficos (importado só quando a análise é executada).
+    try:
+        train_sizes, train_scores, test_scores = learning_curve_cached(
+            estimator, X, y, cv=cv, scoring='f1_macro', train_sizes=np.linspace(0.1, 1.0, 5), n_jobs=-1,
+            fitted_folds=fitted_folds, cache_dir=cache_dir)
+        plt.figure(figsize=(8, 6))
+        plt.plot(train_sizes, np.mean(train_scores, axis=1), 'o-', color="r", label='Score de Treino')
+        plt.plot(train_sizes, np.mean(test_scores, axis=1), 'o-', color="g", label='Score de Validação Cruzada')
+        plt.title(f'Curva de Aprendizagem - {model_name} ({config_name})\n(Baseado no Dataset de TREINO)')
+        plt.xlabel('Número de Amostras de Treino')
+        plt.ylabel('F1 Macro Score')
+        plt.legend(loc="best")
+        plt.grid(True, linestyle='--', alpha=0.7)
+        plt.tight_layout()
+        plt.show()
+    except Exception as e:
+        print(f"Erro ao gerar curva de aprendizagem para {model_name} ({config_name}): {e}")
+
+
+@traced()
+def calibration_curves_plot(clf_pipeline, X, y_true, class_names, prediction_cache, model_name="Modelo",
+                            config_name="Default"):
+    """Curvas de calibração e Brier score por classe (y_true codificado 0..n-1, na ordem de class_names)."""
+    import matplotlib.pyplot as plt  # Gráficos (importado só quando a análise é executada).
+    from sklearn.calibration import calibration_curve
+    if not hasattr(clf_pipeline.named_steps['model'], "predict_proba"):
+        print(f"Modelo {model_name} ({config_name}) não suporta predict_proba. Curva de calibração não gerada.")
+        return
+
+    print(f"\nCurvas de Calibração e Brier Score - {model_name} ({config_name})")
+    try:
+        y_pred_probs = prediction_cache.predict_proba(clf_pipeline, X)  # Já calculado na avaliação dos folds
+        plt.figure(figsize=(10, 8))
+        overall_brier = 0
+        for i, class_label in enumerate(class_names):
+            y_true_class = (np.asarray(y_true) == i).astype(int)
+            class_probs = y_pred_probs[:, i]  # Coluna i corresponde à classe i do treino
+            fraction_of_positives, mean_predicted_value = calibration_curve(y_true_class, class_probs, n_bins=10, strategy='uniform')
+            plt.plot(mean_predicted_value, fraction_of_positives, "s-", label=f"Classe {class_label}")
+            brier = brier_score_loss(y_true_class, class_probs, pos_label=1)
+            print(f"  Brier Score para Classe {class_label}: {brier:.4f}")
+            overall_brier += brier
+        plt.plot([0, 1], [0, 1], "k--", label="Calibração Perfeita")
+        plt.xlabel("Probabilidade Média Prevista")
+        plt.ylabel("Fração de Positivos")
+        plt.legend(loc="lower right")
+        plt.title(f"Curvas de Calibração - {model_name} ({config_name})")
+        plt.grid(True, linestyle='--', alpha=0.7)
+        plt.tight_layout()
+        plt.show()
+        if len(class_names) > 0:
+            print(f"  Brier Score Médio Geral: {(overall_brier / len(class_names)):.4f}")
+    except Exception as e:
+        print(f"Erro ao gerar curvas de calibração para {model_name} ({config_name}): {e}")
+        traceback.print_exc()
+
+
+# ==============================================================================
+# SEÇÃO: MATRIZES DE CONFUSÃO E ERROS
+# ==============================================================================
+
+def confusion_analysis(models_results, class_names, config_name='Default', eval_label=''):
+    """Mapa de calor da matriz de confusão somada sobre os folds, por modelo."""
+    import matplotlib.pyplot as plt  # Gráficos (importado só quando a análise é executada).
+    import seaborn as sns  # Mapas de calor das matrizes de confusão.
+    n_classes = len(class_names)
+    with TRACER.stage('confusion_analysis', config=config_name):
+        for model_name, model_data in models_results.items():
+            cms = model_data['confusion_matrices']
+            if not cms:
+                print(f"  {model_name} ({config_name}): Sem matrizes de confusão para agregar.")
+                continue
+            valid_cms = [cm for cm in cms if isinstance(cm, np.ndarray) and cm.shape == (n_classes, n_classes)]
+            if not valid_cms:
+                print(f"  {model_name}: Sem matrizes de confusão válidas ou com forma esperada ({n_classes}x{n_classes}).")
+                continue
+            try:
+                aggregated_cm = np.sum(np.array(valid_cms), axis=0)
+                plt.figure(figsize=(7, 6))
+                sns.heatmap(aggregated_cm, annot=True, fmt="d", cmap="Blues",
+                            xticklabels=class_names, yticklabels=class_names, annot_kws={"size": 10})
+                plt.title("Matriz de Confusão Agregada" + (f" ({eval_label})" if eval_label else "")
+                          + f"\n{model_name} ({config_name})", fontsize=12)
+                plt.ylabel("Classe Real", fontsize=10)
+                plt.xlabel("Classe Predita", fontsize=10)
+                plt.xticks(rotation=45, ha="right")
+                plt.yticks(rotation=0)
+                plt.tight_layout()
+                plt.show()
+            except Exception as e:
+                print(f"  Erro ao agregar/plotar matriz de confusão para {model_name} ({config_name}): {e}")
+
+
+def error_analysis(models_results, class_names, config_name='Default'):
+    """Matriz de confusão do pior fold de cada modelo e a confusão mais frequente nele."""
+    n_classes = len(class_names)
+    with TRACER.stage('error_analysis', config=config_name):
+        for model_name, model_data in models_results.items():
+            if not model_data['fold_metrics']:
+                print(f"\n  {model_name} ({config_name}): Sem métricas de fold para análise de erros.")
+                continue
+            valid_fold_metrics = [fm for fm in model_data['fold_metrics']
+                                  if isinstance(fm.get('confusion_matrix'), np.ndarray)
+                                  and fm['confusion_matrix'].shape == (n_classes, n_classes)]
+            if not valid_fold_metrics:
+                print(f"\n  {model_name}: Dados de fold insuficientes para análise de erros detalhada.")
+                continue
+            worst_fold_data = min(valid_fold_metrics, key=lambda x: x['f1_macro'])
+            conf_matrix_worst_fold = worst_fold_data['confusion_matrix']
+            print(f"\n  Análise de erros para {model_name} (Pior Fold - Fold {worst_fold_data['fold_index']}, F1: {worst_fold_data['f1_macro']:.3f}):")
+            print("  Matriz de confusão do pior fold:")
+            print(pd.DataFrame(conf_matrix_worst_fold, index=class_names, columns=class_names))
+
+            off_diagonal_cm = conf_matrix_worst_fold.copy()
+            np.fill_diagonal(off_diagonal_cm, 0)
+            if np.sum(off_diagonal_cm) > 0:
+                real_class_idx, predicted_class_idx = np.unravel_index(np.argmax(off_diagonal_cm), off_diagonal_cm.shape)
+                count = off_diagonal_cm[real_class_idx, predicted_class_idx]
+                print(f"    Principal confusão no pior fold: Classe Real '{class_names[real_class_idx]}' -> Predita como '{class_names[predicted_class_idx]}' ({count} ocorrências).")
+            else:
+                print("    Sem erros de classificação (fora da diagonal) neste fold.")
+
+
+# ==============================================================================
+# SEÇÃO: ANÁLISES SOBRE TODAS AS CONFIGURAÇÕES
+# ==============================================================================
+
+@traced()
+def compare_scalers_performance(all_results_data, scaler1_name="STD", scaler2_name="NoExplicitScaler", metric='f1_macro'):
+    """Média ± desvio por modelo nos dois escalonadores e teste de Wilcoxon pareado entre eles."""
+    from scipy.stats import wilcoxon  # Teste pareado entre escalonadores.
+    print(f"\n\n{'='*40}\n COMPARAÇÃO DE PERFORMANCE: {scaler1_name} vs. {scaler2_name} \n{'='*40}")
+    if scaler1_name not in all_results_data or scaler2_name not in all_results_data:
+        print(f"ERRO: Resultados para '{scaler1_name}' e/ou '{scaler2_name}' não encontrados. Não é possível comparar.")
+        return
+    results_scaler1, results_scaler2 = all_results_data[scaler1_name], all_results_data[scaler2_name]
+    common_models = [m for m in results_scaler1 if m in results_scaler2]
+    if not common_models:
+        print("Nenhum modelo comum encontrado entre as duas configurações para comparar.")
+        return
+
+    for model_name in common_models:
+        print(f"\n--- Modelo: {model_name} ---")
+        scores_s1_list = [m[metric] for m in results_scaler1[model_name].get('fold_metrics', []) if metric in m]
+        scores_s2_list = [m[metric] for m in results_scaler2[model_name].get('fold_metrics', []) if metric in m]
+        if not scores_s1_list or not scores_s2_list:
+            print(f"  Dados de fold ({metric}) insuficientes para {model_name} em uma ou ambas as configurações ('{scaler1_name}', '{scaler2_name}').")
+            continue
+
+        mean_s1, std_s1 = np.mean(scores_s1_list), np.std(scores_s1_list)
+        mean_s2, std_s2 = np.mean(scores_s2_list), np.std(scores_s2_list)
+        print(f"  Média da Métrica ({metric}):")
+        print(f"    {scaler1_name:<20}: {mean_s1:.4f} ± {std_s1:.4f} (de {len(scores_s1_list)} folds)")
+        print(f"    {scaler2_name:<20}: {mean_s2:.4f} ± {std_s2:.4f} (de {len(scores_s2_list)} folds)")
+
+        if len(scores_s1_list) == len(scores_s2_list) and len(scores_s1_list) > 1:  # Wilcoxon requer amostras pareadas e >1 obs
+            try:
+                stat, p_value = wilcoxon(scores_s1_list, scores_s2_list, zero_method='zsplit', alternative='two-sided')
+                print(f"  Teste de Wilcoxon ({scaler1_name} vs. {scaler2_name}): Estatística={stat:.2f}, p-valor={p_value:.4f}")
+                if p_value < 0.05:
+                    print(f"    ➡ Diferença estatisticamente significativa no {metric} para {model_name}.")
+                    if mean_s1 > mean_s2:
+                        print(f"       Configuração '{scaler1_name}' apresentou performance significativamente melhor.")
+                    elif mean_s2 > mean_s1:
+                        print(f"       Configuração '{scaler2_name}' apresentou performance significativamente melhor.")
+                    else:
+                        print("       Médias idênticas, mas p-valor < 0.05 (verificar distribuição dos scores).")
+                else:
+                    print(f"     Não há diferença estatisticamente significativa no {metric} para {model_name}.")
+            except ValueError as e:
+                print(f"  Não foi possível realizar o teste de Wilcoxon para {model_name}: {e}")
+        else:
+            print("  Teste estatístico de Wilcoxon não realizado (número de folds diferente ou dados insuficientes).")
+
+
+def permutation_importance_report(experiment, n_repeats=10, random_state=None):
+    """Importância por permutação de todos os best_estimators nos conjuntos em que foram avaliados."""
+    print(f"\n\n{'='*40}\n IMPORTÂNCIA POR PERMUTAÇÃO ({experiment['experiment'].get('eval_label', 'teste')}) \n{'='*40}")
+    with TRACER.stage('permutation_importance'):
+        tabela = permutation_importance_table(experiment['all_results'], experiment['test_sets'], n_repeats=n_repeats,
+                                              random_state=random_state, n_jobs=-1,
+                                              prediction_cache=experiment['prediction_cache'])
+    for (sc_name, model_name), tabela_modelo in tabela.groupby(['config', 'model'], sort=False):
+        print(f"\n--- {model_name} ({sc_name}): queda média do F1 Macro ao permutar cada atributo ---")
+        print(tabela_modelo[['feature', 'importance_mean', 'importance_std']].to_string(index=False, float_format='%.4f'))
+    return tabela
+
+
+def leakage_audit_report(experiment, k=3):
+    """Quase duplicatas entre o treino e o teste fixo do experimento (sem teste fixo, não se aplica)."""
+    if experiment['X_test'] is None:
+        print(f"\nAuditoria de vazamento não se aplica a {experiment['name']} (sem dataset de teste fixo).")
+        return None
+    print(f"\n\n{'='*40}\n AUDITORIA DE VAZAMENTO (TREINO x {experiment['experiment'].get('eval_label', 'teste')}) \n{'='*40}")
+    with TRACER.stage('leakage_audit'):
+        relatorio = leakage_audit(experiment['X_train'], experiment['y_train'], experiment['X_test'], experiment['y_test'],
+                                  k=k, class_names=experiment['class_names'])
+    print(f"Limiar de quase duplicata (distância euclidiana nos atributos escalados, sem ID): {relatorio['threshold']:.4f}")
+    print(relatorio['per_class'].to_string(index=False, float_format='%.4f'))
+    return relatorio
+
+
+# ==============================================================================
+# SEÇÃO: RELATÓRIO COMPLETO DE UM EXPERIMENTO
+# ==============================================================================
+
+def report_experiment(experiment, boxplots=True, stats_tests=True, bootstrap_ci=True, per_class_metrics=True,
+                      tradeoff=True, smote=True, noise_oversampling=True, ensemble=True, learning_curves=True,
+                      calibration_curves=True, confusion=True, errors=True, scaler_comparison=True,
+                      permutation_importance=True, leakage=True, n_bootstrap=10000, n_repeats_perm=10,
+                      learning_curve_cache_dir=None):
+    """
+    Executa as análises selecionadas sobre o resultado de um experimento, na
+    mesma ordem dos notebooks: por configuração (escalonador), depois a
+    comparação entre escalonadores, a importância por permutação e a auditoria
+    de vazamento.
+
+    Args:
+        experiment (dict): Um resultado de experimento.run_experiments.
+        boxplots ... leakage (bool): Flags das análises (run_* nos notebooks).
+            noise_oversampling só roda se o experimento tiver 'raw_file';
+            leakage só roda se o experimento tiver teste fixo.
+        n_bootstrap (int): Reamostragens dos intervalos de confiança.
+        n_repeats_perm (int): Permutações por atributo.
+        learning_curve_cache_dir (str, opcional): Cache em disco das curvas de aprendizado.
+    """
+    all_results = experiment['all_results']
+    class_names, eval_label = experiment['class_names'], experiment['experiment'].get('eval_label', '')
+    random_state, n_splits_inner = experiment['settings']['random_state'], experiment['settings']['n_splits_inner']
+    teste_fixo = experiment['X_test'] is not None
+    # Calibração: no teste fixo ou, na validação cruzada externa, no dataset de treino completo (como no baseline).
+    X_calib, y_calib = ((experiment['X_test'], experiment['y_test']) if teste_fixo
+                        else (experiment['X_train'], experiment['y_train']))
+
+    for indice_config, (sc_name, resultados) in enumerate(all_results.items()):
+        print(f"\n\n{'='*40}\n ANÁLISES PARA CONFIGURAÇÃO: {sc_name} ({experiment['name']}, avaliação: {eval_label}) \n{'='*40}")
+        if boxplots:
+            print(f"\n--- Boxplots das Métricas ({sc_name}) ---")
+            for metric_to_plot in ['f1_macro', 'precision_macro', 'recall_macro']:
+                boxplot_metric(resultados, metric=metric_to_plot, config_name=sc_name, eval_label=eval_label)
+        if stats_tests:
+            compare_models_stat_test(resultados, metric='f1_macro', config_name=sc_name)
+        if bootstrap_ci:
+            bootstrap_ci_report(resultados, class_names, y_true=experiment['y_test'], n_resamples=n_bootstrap,
+                                random_state=random_state, config_name=sc_name)
+        if per_class_metrics:
+            class_report_aggregate(resultados, class_names, config_name=sc_name)
+        if tradeoff:
+            tradeoff_plot(resultados, config_name=sc_name, eval_label=eval_label)
+
+        # SMOTE e ruído gaussiano têm seu próprio scaler: executados uma vez, na primeira configuração.
+        if indice_config == 0:
+            if smote:
+                smote_scores(experiment['X_train'].copy(), experiment['y_train'].copy(), experiment['base_models'],
+                             n_splits=n_splits_inner, random_state=random_state)
+            if noise_oversampling and experiment['experiment'].get('raw_file'):
+                noise_oversampling_scores(experiment['X_train'].copy(), experiment['y_train'].copy(),
+                                          experiment['base_models'], experiment['label_encoder'],
+                                          experiment['experiment']['raw_file'], n_splits=n_splits_inner,
+                                          random_state=random_state)
+        if ensemble:
+            ensemble_tuned(experiment, resultados, config_name=sc_name)
+
+        if learning_curves:
+            print(f"\n--- Curvas de Aprendizagem ({sc_name}) ---")
+            for model_name, model_data in resultados.items():
+                if model_data['best_estimators']:
+                    print(f"Gerando Curva de Aprendizagem para: {model_name}")
+                    learning_curve_plot(model_data['best_estimators'][0], experiment['X_train'].copy(),
+                                        experiment['y_train'].copy(), experiment['outer_cv'], model_name=model_name,
+                                        config_name=sc_name, fitted_folds=model_data['best_estimators'],
+                                        cache_dir=learning_curve_cache_dir)
+                else:
+                    print(f"Sem estimadores salvos para {model_name} ({sc_name}) para gerar curva de aprendizagem.")
+
+        if calibration_curves:
+            print(f"\n--- Curvas de Calibração ({sc_name}) ---")
+            for model_name, model_data in resultados.items():
+                if model_data['best_estimators']:
+                    print(f"Gerando Curva de Calibração para: {model_name}")
+                    calibration_curves_plot(model_data['best_estimators'][0], X_calib, y_calib, class_names,
+                                            experiment['prediction_cache'], model_name=model_name, config_name=sc_name)
+                else:
+                    print(f"Sem estimadores salvos para {model_name} ({sc_name}) para gerar curva de calibração.")
+
+        if confusion:
+            print(f"\n--- Matrizes de Confusão Agregadas ({sc_name}) ---")
+            confusion_analysis(resultados, class_names, config_name=sc_name, eval_label=eval_label)
+        if errors:
+            print(f"\n--- Análise de Erros ({sc_name}) ---")
+            error_analysis(resultados, class_names, config_name=sc_name)
+        print(f"\n{'-'*40}\nFIM DAS ANÁLISES PARA CONFIGURAÇÃO: {sc_name}\n{'-'*40}\n")
+
+    if scaler_comparison:
+        compare_scalers_performance(all_results, scaler1_name="STD", scaler2_name="NoExplicitScaler", metric='f1_macro')
+    if permutation_importance:
+        permutation_importance_report(experiment, n_repeats=n_repeats_perm, random_state=random_state)
+    if leakage:
+        leakage_audit_report(experiment)
@@ -0,0 +1,264 @@
+# ==============================================================================
+# MÓDULO: ARMAZÉM QUANTIZADO DOS DATASETS PRÉ-PROCESSADOS
+# Descrição: O pré-processamento normaliza os atributos para [0, 1] e os
+#            arredonda em 5 casas decimais; o CSV guarda esses valores como
+#            texto (vírgula decimal) e a leitura os devolve em float64. Aqui
+#            cada coluna é gravada em ponto fixo: o valor vira o inteiro
+#            k = round(x * 10^decimals) e o arquivo guarda um código uint8 ou
+#            uint16 por linha:
+#            - 'linear': código = (k - offset) / stride (stride = 1 é exato);
+#            - 'table':  código = posição de k na tabela ordenada dos valores
+#                        distintos (exato; tabela int32 em arquivo próprio).
+#            Vale a codificação de menor tamanho; com `tolerance` > 0 entram
+#            também grades mais grossas (stride > 1). Se nada cabe em uint16,
+#            usa 'linear' com stride > 1 (com perda; o erro máximo fica nos
+#            metadados). O maior código do tipo indica valor ausente. Com
+#            stride = 1 ou tabela, a leitura devolve exatamente os mesmos
+#            float64 que a leitura do CSV.
+#            Cada coluna é um .npy (aberto como memmap: só as colunas pedidas
+#            são lidas e decodificadas) e a escala fica em metadados.json.
+#            Os códigos preservam a ordem dos valores, então modelos de
+#            árvore podem ser treinados direto sobre eles (binned_matrix).
+#
+# Uso:
+#   python armazem_quantizado.py ../00_Datasets/Arquivos_Pos_PreProcessamento/*.csv
+#   df = read_feature_store('Dataset_OriginalComClass_PREPROCESSADO_COMPLETO.quant')
+# ==============================================================================
+
+import argparse  # Conversão dos CSVs pela linha de comando.
+import json  # Metadados de escala.
+import os  # Diretório do armazém.
+import shutil  # Substituição de um armazém existente.
+import warnings  # Aviso de quantização com perda.
+
+import numpy as np  # Códigos e decodificação.
+import pandas as pd  # DataFrame de entrada e de saída.
+
+EXTENSAO = '.quant'
+ARQUIVO_METADADOS = 'metadados.json'
+VERSAO_FORMATO = 1
+_TIPOS = (np.uint8, np.uint16)  # Em ordem de preferência; o maior código de cada tipo marca ausentes.
+
+
+# ==============================================================================
+# SEÇÃO: QUANTIZAÇÃO DE UMA COLUNA
+# ==============================================================================
+
+def _menor_tipo(n_codigos):
+    """Menor tipo sem sinal que comporta n_codigos códigos mais o de ausente (None se nenhum)."""
+    for tipo in _TIPOS:
+        if n_codigos <= np.iinfo(tipo).max:
+            return tipo
+    return None
+
+
+def _quantizar_coluna(valores, decimals, tolerance=0.0):
+    """
+    Códigos, tabela (ou None) e metadados de uma coluna, na codificação de
+    menor tamanho entre as que respeitam `tolerance`.
+
+    Args:
+        valores (np.ndarray): Valores float64 (NaN = ausente).
+        decimals (int): Casas decimais da grade de ponto fixo.
+        tolerance (float): Erro absoluto aceito além do arredondamento na grade (0 = exato).
+    Returns:
+        tuple: (códigos, tabela int32/int64 ou None, metadados da coluna).
+    """
+    n, passo = len(valores), 10.0 ** -decimals
+    presentes = ~np.isnan(valores)
+    inteiros = np.rint(valores[presentes] / passo).astype(np.int64)
+    minimo = int(inteiros.min()) if len(inteiros) else 0
+    amplitude = int(inteiros.max()) - minimo if len(inteiros) else 0
+
+    # --- Candidatas: (bytes, tipo, stride, usa tabela) ---
+    candidatas = []
+    for tipo in _TIPOS:
+        stride = max(1, -(-amplitude // (np.iinfo(tipo).max - 1)))
+        if stride == 1 or (stride // 2) * passo <= tolerance:
+            candidatas.append((n * np.dtype(tipo).itemsize, np.dtype(tipo).itemsize, tipo, stride, False))
+    distintos = np.unique(inteiros)
+    tipo_tabela = _menor_tipo(len(distintos))
+    if tipo_tabela is not None:
+        item_tabela = 4 if distintos.size == 0 or max(-distintos[0], distintos[-1]) < 2 ** 31 else 8
+        candidatas.append((n * np.dtype(tipo_tabela).itemsize + item_tabela * len(distintos),
+                           np.dtype(tipo_tabela).itemsize, tipo_tabela, 1, True))
+    if not candidatas:  # Mais valores distintos que códigos uint16 e tolerância pequena: grade mais grossa (com perda).
+        tipo = _TIPOS[-1]
+        candidatas.append((0, 0, tipo, -(-amplitude // (np.iinfo(tipo).max - 1)), False))
+    _, _, tipo, stride, usa_tabela = min(candidatas, key=lambda c: c[:2])
+
+    ausente = np.iinfo(tipo).max
+    codigos = np.full(n, ausente, dtype=tipo)
+    tabela = None
+    if usa_tabela:
+        tabela = distintos.astype(np.int32 if item_tabela == 4 else np.int64)
+        codigos[presentes] = np.searchsorted(distintos, inteiros)
+    else:
+        codigos[presentes] = np.rint((inteiros - minimo) / stride)
+    meta = {'decimals': decimals, 'kind': 'table' if usa_tabela else 'linear', 'offset': minimo, 'stride': int(stride),
+            'dtype': np.dtype(tipo).name, 'missing_code': int(ausente)}
+    erro = np.abs(_decodificar(codigos, meta, tabela)[presentes] - valores[presentes])
+    meta['max_error'] = float(erro.max()) if len(erro) else 0.0
+    return codigos, tabela, meta
+
+
+def _decodificar(codigos, meta, tabela=None, dtype=np.float64):
+    """Valores (NaN nos ausentes) a partir dos códigos de uma coluna."""
+    ausentes = codigos == meta['missing_code']
+    if meta['kind'] == 'table':
+        tabela = np.append(np.asarray(tabela, dtype=np.int64), 0)  # Posição extra para o código de ausente.
+        inteiros = tabela[np.minimum(codigos, len(tabela) - 1)]
+    else:
+        inteiros = meta['offset'] + codigos.astype(np.int64) * meta['stride']
+    valores = inteiros / 10.0 ** meta['decimals']  # Divisão exata de inteiros: mesmo float64 da leitura do texto.
+    valores[ausentes] = np.nan
+    return valores.astype(dtype, copy=False)
+
+
+# ==============================================================================
+# SEÇÃO: ARMAZÉM EM DISCO
+# ==============================================================================
+
+def feature_store_path(csv_path):
+    """Caminho do armazém correspondente a um CSV (mesmo nome, extensão .quant)."""
+    return os.path.splitext(csv_path)[0] + EXTENSAO
+
+
+def is_feature_store(path):
+    """Indica se `path` é um armazém gravado por write_feature_store."""
+    return os.path.isfile(os.path.join(path, ARQUIVO_METADADOS))
+
+
+def write_feature_store(df, path, decimals=5, tolerance=0.0):
+    """
+    Grava as colunas numéricas de um DataFrame em ponto fixo (uint8/uint16).
+
+    Args:
+        df (pd.DataFrame): Dataset (ex: saída do pré-processamento, inclusive o alvo).
+        path (str): Diretório do armazém (substituído se existir).
+        decimals (int): Casas decimais da grade (5 = arredondamento do pré-processamento).
+        tolerance (float): Erro absoluto aceito para usar uma grade mais grossa quando ela
+            ocupa menos espaço (0 = leitura idêntica aos valores na grade).
+    Returns:
+        dict: Metadados gravados.
+    """
+    nao_numericas = [c for c in df.columns if not pd.api.types.is_numeric_dtype(df[c])]
+    if nao_numericas:
+        raise ValueError(f"Colunas não numéricas não podem ser quantizadas: {nao_numericas}")
+    if os.path.isdir(path):
+        shutil.rmtree(path)
+    os.makedirs(path)
+    metadados = {'version': VERSAO_FORMATO, 'n_rows': len(df), 'columns': []}
+    for i, coluna in enumerate(df.columns):
+        codigos, tabela, meta = _quantizar_coluna(df[coluna].to_numpy(dtype=np.float64), decimals, tolerance)
+        meta['integer'] = bool(pd.api.types.is_integer_dtype(df[coluna]))  # Ex: ID, lido como int64 do CSV.
+        if meta['max_error'] > 0.5 * 10.0 ** -decimals + tolerance:
+            warnings.warn(f"Coluna {coluna!r}: quantização com perda (erro máximo {meta['max_error']:.3g}).")
+        meta.update(name=str(coluna), file=f'{i:03d}.npy')
+        np.save(os.path.join(path, meta['file']), codigos)
+        if tabela is not None:
+            meta['table_file'] = f'{i:03d}_tabela.npy'
+            np.save(os.path.join(path, meta['table_file']), tabela)
+        metadados['columns'].append(meta)
+    with open(os.path.join(path, ARQUIVO_METADADOS), 'w', encoding='utf-8') as arquivo:
+        json.dump(metadados, arquivo, ensure_ascii=False, indent=1)
+    return metadados
+
+
+class FeatureStore:
+    """
+    Leitura de um armazém quantizado; cada coluna é aberta como memmap e só é
+    decodificada quando pedida.
+
+    Args:
+        path (str): Diretório gravado por write_feature_store.
+    """
+
+    def __init__(self, path):
+        with open(os.path.join(path, ARQUIVO_METADADOS), encoding='utf-8') as arquivo:
+            metadados = json.load(arquivo)
+        if metadados.get('version') != VERSAO_FORMATO:
+            raise ValueError(f"Versão do armazém não suportada: {metadados.get('version')}")
+        self.path = path
+        self.n_rows = metadados['n_rows']
+        self.metadata = {meta['name']: meta for meta in metadados['columns']}
+        self.columns = list(self.metadata)
+
+    def codes(self, column):
+        """Códigos (memmap somente leitura) de uma coluna."""
+        return np.load(os.path.join(self.path, self.metadata[column]['file']), mmap_mode='r')
+
+    def column(self, column, dtype=None):
+        """Valores decodificados de uma coluna (dtype None = int64 nas colunas inteiras, senão float64)."""
+        meta = self.metadata[column]
+        if dtype is None:
+            dtype = np.int64 if meta.get('integer') else np.float64
+        tabela = np.load(os.path.join(self.path, meta['table_file'])) if 'table_file' in meta else None
+        return _decodificar(self.codes(column), meta, tabela, dtype)
+
+    def to_frame(self, columns=None, dtype=None):
+        """
+        DataFrame decodificado.
+
+        Args:
+            columns (list, opcional): Colunas a ler (None = todas).
+            dtype: Tipo dos valores (None = mesmos tipos e valores da leitura do CSV).
+        Returns:
+            pd.DataFrame: Colunas na ordem pedida.
+        """
+        columns = self.columns if columns is None else list(columns)
+        return pd.DataFrame({c: self.column(c, dtype) for c in columns}, columns=columns, copy=False)
+
+    def binned_matrix(self, columns=None):
+        """
+        Matriz de códigos para modelos de árvore (a ordem dos valores é preservada).
+
+        Args:
+            columns (list, opcional): Colunas (None = todas).
+        Returns:
+            tuple: (matriz uint8/uint16, código de ausente comum), ex:
+                   XGBClassifier(missing=codigo_ausente).fit(matriz, y).
+        """
+        columns = self.columns if columns is None else list(columns)
+        tipo = max((np.dtype(self.metadata[c]['dtype']) for c in columns), key=lambda t: t.itemsize,
+                   default=np.dtype(_TIPOS[0]))
+        ausente = np.iinfo(tipo).max
+        matriz = np.empty((self.n_rows, len(columns)), dtype=tipo)
+        for j, coluna in enumerate(columns):
+            codigos = self.codes(coluna)
+            matriz[:, j] = np.where(codigos == self.metadata[coluna]['missing_code'], ausente, codigos)
+        return matriz, int(ausente)
+
+    def nbytes(self):
+        """Bytes dos arquivos do armazém (códigos + metadados)."""
+        return sum(os.path.getsize(os.path.join(self.path, nome)) for nome in os.listdir(self.path))
+
+
+def read_feature_store(path, columns=None, dtype=None):
+    """Atalho para FeatureStore(path).to_frame(columns, dtype)."""
+    return FeatureStore(path).to_frame(columns, dtype)
+
+
+# ==============================================================================
+# SEÇÃO: EXECUÇÃO PELA LINHA DE COMANDO
+# ==============================================================================
+
+if __name__ == '__main__':
+    from leitura_csv import read_dataset_csv  # Apenas para converter os CSVs.
+
+    parser = argparse.ArgumentParser(description="Converte CSVs pré-processados para o armazém quantizado.")
+    parser.add_argument('csv', nargs='+', help="CSVs do projeto (separador ';' e decimal ',').")
+    parser.add_argument('--decimals', type=int, default=5, help="Casas decimais da grade de ponto fixo.")
+    parser.add_argument('--tolerance', type=float, default=0.0, help="Erro absoluto aceito (0 = exato).")
+    args = parser.parse_args()
+
+    for caminho_csv in args.csv:
+        df = read_dataset_csv(caminho_csv)
+        destino = feature_store_path(caminho_csv)
+        write_feature_store(df, destino, args.decimals, args.tolerance)
+        armazem = FeatureStore(destino)
+        erro = (armazem.to_frame().astype(np.float64) - df.astype(np.float64)).abs().max().max()
+        tipos = pd.Series([m['dtype'] for m in armazem.metadata.values()]).value_counts().to_dict()
+        print(f"{os.path.basename(destino)}: {df.shape}, CSV {os.path.getsize(caminho_csv) / 1024:.1f} KiB, "
+              f"float64 {df.shape[0] * df.shape[1] * 8 / 1024:.1f} KiB, armazém {armazem.nbytes() / 1024:.1f} KiB "
+              f"{tipos}; erro máximo {erro:.2g}")
@@ -0,0 +1,371 @@
+# ==============================================================================
+# MÓDULO: ATUALIZAÇÃO INCREMENTAL DO MODELO IMPLANTADO
+# Descrição: Novas análises de solo acrescentadas ao Dataset_OriginalComClass.csv
+#            não exigem refazer geração, pré-processamento e o nested CV
+#            completo. O modelo implantado (XGBoost no mesmo pipeline dos
+#            experimentos, treinado em real + sintéticos) é atualizado assim:
+#            1. As estatísticas dos escalonadores (mínimo/máximo do MinMax do
+#               pré-processamento, média/variância do StandardScaler por
+#               partial_fit) passam a incluir as amostras novas. Os limiares
+#               das árvores já treinadas são convertidos para a nova escala
+#               (transformação afim e crescente por atributo): as predições do
+#               modelo antigo não mudam.
+#            2. Sintéticos são gerados só a partir das amostras novas das classes
+#               minoritárias, na mesma proporção sintéticos/reais da classe.
+#            3. O XGBoost continua o treinamento com rodadas extras de boosting
+#               sobre real + sintéticos (antigos e novos).
+#            Antes de treinar, as amostras novas são preditas pelo modelo atual
+#            (avaliação prequencial). O relatório indica busca completa
+#            (run_experiments) quando o monitor de deriva marca atributos ou
+#            quando o F1 prequencial cai abaixo do F1 de referência do nested CV.
+#
+# Uso:
+#   python atualizacao_incremental.py deploy --results resultados_experimentos.joblib
+#   python atualizacao_incremental.py update     # Código de saída 1 = busca completa recomendada.
+# ==============================================================================
+
+import argparse  # Parâmetros de linha de comando.
+import json  # Limiares das árvores (modelo do XGBoost em JSON).
+import os  # Caminhos padrão.
+import sys  # Código de saída da atualização.
+from datetime import datetime  # Histórico das atualizações.
+
+import joblib  # Persistência do modelo implantado.
+import numpy as np  # Escalas e limiares.
+import pandas as pd  # Datasets brutos.
+import xgboost as xgb  # Modelo implantado e continuação do boosting.
+from sklearn.preprocessing import StandardScaler
+
+from experimento import (BASE_MODELS, DIRETORIO_BASE, RANDOM_SEED, RAW_DATASET_FILE, TARGET,  # Pipeline e caminhos.
+                         build_pipeline, compare_experiments)
+from leitura_csv import read_dataset_csv  # Leitura do CSV bruto (';' e ',' decimal).
+from metricas import evaluation_metrics  # F1 prequencial.
+from monitor_deriva import DriftMonitor, build_training_profile  # Deriva das amostras novas.
+from rastreamento import TRACER  # Tempo/memória de cada etapa (desativado por padrão).
+from reamostragem_ruido import GaussianNoiseOversampler  # Sintéticos.
+from regras_milho import CRITERIOS_MILHO, FAIXAS_PONTUACAO_MILHO  # Faixas de pontuação das classes.
+
+DEPLOYED_MODEL_FILE = os.path.join(DIRETORIO_BASE, 'modelo_implantado.joblib')
+CLASSES = ('Baixa', 'Média', 'Alta')  # Ordem do LabelEncoder sobre o alvo pré-processado (0, 0.5, 1).
+COLUNA_ID = 'ID'
+_ULPS_LIMIAR = 4  # Recuo do limiar convertido (ulps float32): valores iguais ao corte seguem à direita.
+
+
+# ==============================================================================
+# SEÇÃO: FUNÇÕES AUXILIARES
+# ==============================================================================
+
+def _dataset_bruto(raw):
+    """CSV bruto (ou DataFrame) sem colunas vazias e sem linhas sem classe."""
+    df = read_dataset_csv(raw) if isinstance(raw, str) else raw
+    df = df.dropna(axis='columns', how='all')
+    return df[df[TARGET].notna()].reset_index(drop=True)
+
+
+def _escala_minmax(X_bruto, minimos=None, maximos=None):
+    """Mínimo e máximo por coluna (combinados com os anteriores, se informados)."""
+    minimos_novos, maximos_novos = np.nanmin(X_bruto, axis=0), np.nanmax(X_bruto, axis=0)
+    if minimos is not None:
+        minimos_novos, maximos_novos = np.fmin(minimos, minimos_novos), np.fmax(maximos, maximos_novos)
+    return minimos_novos, maximos_novos
+
+
+def _afim_minmax(minimos, maximos):
+    """Coeficientes (a, b) do MinMax do pré-processamento: x_norm = a * x + b."""
+    amplitude = maximos - minimos
+    amplitude = np.where(amplitude < 10 * np.finfo(float).eps, 1.0, amplitude)  # Como o MinMaxScaler.
+    return 1.0 / amplitude, -minimos / amplitude
+
+
+def _afim_modelo(bundle):
+    """Coeficientes (a, b) da entrada do modelo em função do valor bruto (MinMax seguido do StandardScaler)."""
+    a, b = _afim_minmax(bundle['feature_min'], bundle['feature_max'])
+    escalonador = bundle['pipeline'].named_steps.get('scaler')
+    if escalonador is not None:
+        a, b = a / escalonador.scale_, (b - escalonador.mean_) / escalonador.scale_
+    return a, b
+
+
+def _normalizar(bundle, X_bruto):
+    a, b = _afim_minmax(bundle['feature_min'], bundle['feature_max'])
+    return X_bruto * a + b
+
+
+def _rotulos(df):
+    """Classes codificadas (0, 1, 2 na ordem de CLASSES)."""
+    codigos = df[TARGET].map({classe: i for i, classe in enumerate(CLASSES)})
+    if codigos.isna().any():
+        raise ValueError(f"Classes desconhecidas: {sorted(set(df[TARGET][codigos.isna()]))}. Esperadas: {list(CLASSES)}.")
+    return codigos.to_numpy(dtype=int)
+
+
+def _sintetizar(X_bruto, rotulos, features, n_por_classe, base_indices, random_state):
+    """Sintéticos (unidades originais) com o mesmo sampler/critérios do gerador."""
+    if not any(n_por_classe.values()):
+        return np.empty((0, X_bruto.shape[1])), np.empty(0, dtype=int)
+    contagens = np.bincount(rotulos, minlength=len(CLASSES))
+    sampler = GaussianNoiseOversampler(
+        sampling_strategy={classe: int(contagens[classe] + n) for classe, n in n_por_classe.items()},
+        random_state=random_state, criteria=CRITERIOS_MILHO,
+        class_score_ranges={i: FAIXAS_PONTUACAO_MILHO[classe] for i, classe in enumerate(CLASSES)},
+        special_texture_class=CLASSES.index('Alta'), base_indices=base_indices)
+    X_res, y_res = sampler.fit_resample(pd.DataFrame(X_bruto, columns=features), rotulos)
+    return np.asarray(X_res)[len(X_bruto):], np.asarray(y_res)[len(X_bruto):]
+
+
+def remap_booster_thresholds(booster, a_old, b_old, a_new, b_new):
+    """
+    Converte os limiares das árvores para uma nova escala afim dos atributos.
+
+    Cada atributo entra no modelo como a * x + b (a > 0). O limiar t da escala
+    antiga vira a_new * (t - b_old) / a_old + b_new. O resultado é recuado
+    alguns ulps (float32, na magnitude dos termos): os cortes do XGBoost
+    coincidem com valores observados e, sem o recuo, o arredondamento poderia
+    mandar um valor igual ao corte para o outro lado.
+
+    Args:
+        booster (xgb.Booster): Modelo treinado na escala antiga.
+        a_old, b_old (np.ndarray): Escala antiga por atributo.
+        a_new, b_new (np.ndarray): Escala nova por atributo.
+    Returns:
+        xgb.Booster: Novo booster com as mesmas predições na escala nova.
+    """
+    modelo = json.loads(booster.save_raw(raw_format='json'))
+    for arvore in modelo['learner']['gradient_booster']['model']['trees']:
+        internos = np.asarray(arvore['left_children']) != -1  # Nas folhas, split_conditions guarda o valor da folha.
+        if not internos.any():
+            continue
+        atributos = np.asarray(arvore['split_indices'])[internos]
+        limiares = np.asarray(arvore['split_conditions'], dtype=float)
+        convertidos = (a_new[atributos] * (limiares[internos] - b_old[atributos]) / a_old[atributos]
+                       + b_new[atributos]).astype(np.float32)
+        magnitude = np.fmax(np.abs(convertidos), np.abs(b_new[atributos]).astype(np.float32))  # Cancelamento perto de 0.
+        limiares[internos] = convertidos - _ULPS_LIMIAR * np.spacing(magnitude)
+        arvore['split_conditions'] = limiares.tolist()
+    convertido = xgb.Booster()
+    convertido.load_model(bytearray(json.dumps(modelo).encode()))
+    return convertido
+
+
+# ==============================================================================
+# SEÇÃO: MODELO IMPLANTADO
+# ==============================================================================
+
+def best_model_params(results, experiment='TreinoSinteticoReal_ValReal', model='XGBoost'):
+    """
+    Hiperparâmetros do modelo no melhor escalonador de um resultado de run_experiments.
+
+    Usa o estimador do fold com maior F1 macro na configuração de maior F1 médio.
+
+    Returns:
+        tuple: (usa StandardScaler (bool), parâmetros do modelo (dict), F1 macro médio da configuração).
+    """
+    tabela = compare_experiments(results)
+    tabela = tabela[(tabela['experiment'] == experiment) & (tabela['model'] == model)]
+    if tabela.empty:
+        raise ValueError(f"Sem resultados de {model} no experimento {experiment!r}.")
+    melhor = tabela.loc[tabela['mean'].idxmax()]
+    dados_modelo = results[experiment]['all_results'][melhor['config']][model]
+    fold = int(np.argmax([m['f1_macro'] for m in dados_modelo['fold_metrics']]))
+    parametros = dados_modelo['best_estimators'][fold].named_steps['model'].get_params()
+    padrao = BASE_MODELS[model].get_params()
+    alterados = {chave: valor for chave, valor in parametros.items() if padrao.get(chave) != valor}
+    return melhor['config'] == 'STD', alterados, float(melhor['mean'])
+
+
+def deploy_model(raw=RAW_DATASET_FILE, model_params=None, use_scaler=True, reference_f1=None,
+                 random_state=RANDOM_SEED):
+    """
+    Treino completo do modelo implantado: gera os sintéticos (como o gerador),
+    aplica o MinMax do pré-processamento e ajusta o pipeline com o XGBoost.
+
+    Args:
+        raw (str ou pd.DataFrame): Dataset real bruto (Dataset_OriginalComClass.csv).
+        model_params (dict, opcional): Hiperparâmetros do XGBoost (ex: best_model_params).
+        use_scaler (bool): Inclui o StandardScaler (configuração 'STD').
+        reference_f1 (float, opcional): F1 macro do nested CV, referência da validação prequencial.
+        random_state (int): Semente dos sintéticos e do modelo.
+    Returns:
+        dict: Modelo implantado (ver save_deployed_model).
+    """
+    df = _dataset_bruto(raw)
+    features = [c for c in df.select_dtypes(include=np.number).columns if c != COLUNA_ID]
+    X_bruto, y = df[features].to_numpy(dtype=float), _rotulos(df)
+    with TRACER.stage('deploy_sinteticos'):
+        contagens = np.bincount(y, minlength=len(CLASSES))
+        X_sint, y_sint = _sintetizar(X_bruto, y, features, {c: int(contagens.max() - n) for c, n in enumerate(contagens)},
+                                     None, random_state)
+    minimos, maximos = _escala_minmax(X_bruto)
+    modelo = xgb.XGBClassifier(**{**BASE_MODELS['XGBoost'].get_params(), **(model_params or {}),
+                                  'random_state': random_state})
+    pipeline = build_pipeline(modelo, StandardScaler if use_scaler else None)
+    bundle = {'features': features, 'feature_min': minimos, 'feature_max': maximos, 'pipeline': pipeline,
+              'synthetic_X': X_sint, 'synthetic_y': y_sint, 'ids': set(df[COLUNA_ID]),
+              'ids_full_fit': set(df[COLUNA_ID]), 'class_counts': np.bincount(y, minlength=len(CLASSES)),
+              'profile': build_training_profile(df, features=features, target=TARGET),
+              'reference_f1': reference_f1, 'prequential': {'y_true': [], 'y_pred': []},
+              'history': [{'date': datetime.now().isoformat(timespec='seconds'), 'kind': 'full', 'n_real': len(df),
+                           'n_synthetic': len(X_sint), 'n_trees': None}]}
+    with TRACER.stage('deploy_treino', n=len(X_bruto) + len(X_sint)):
+        pipeline.fit(_normalizar(bundle, np.vstack([X_bruto, X_sint])), np.concatenate([y, y_sint]))
+    bundle['history'][-1]['n_trees'] = modelo.get_booster().num_boosted_rounds()
+    return bundle
+
+
+def predict_samples(bundle, samples):
+    """Classe prevista ('Baixa', 'Média', 'Alta') de amostras brutas (DataFrame com as colunas do treino)."""
+    X = _normalizar(bundle, samples[bundle['features']].to_numpy(dtype=float))
+    return np.asarray(CLASSES, dtype=object)[bundle['pipeline'].predict(X)]
+
+
+def save_deployed_model(bundle, path=DEPLOYED_MODEL_FILE):
+    """Grava o modelo implantado com joblib e retorna o caminho."""
+    joblib.dump(bundle, path)
+    return path
+
+
+def load_deployed_model(path=DEPLOYED_MODEL_FILE):
+    """Lê um modelo gravado por save_deployed_model."""
+    return joblib.load(path)
+
+
+# ==============================================================================
+# SEÇÃO: ATUALIZAÇÃO INCREMENTAL
+# ==============================================================================
+
+def incremental_update(bundle, raw=RAW_DATASET_FILE, extra_rounds=50, min_validation_samples=30, f1_tolerance=0.05,
+                       drift_limits=None, random_state=RANDOM_SEED):
+    """
+    Atualiza o modelo implantado com as linhas reais ainda não vistas (por ID).
+
+    Args:
+        bundle (dict): Modelo implantado (deploy_model ou load_deployed_model); é alterado no lugar.
+        raw (str ou pd.DataFrame): Dataset real bruto completo (antigas + novas).
+        extra_rounds (int): Rodadas extras de boosting.
+        min_validation_samples (int): Amostras mínimas (desde o último treino completo) para
+            os testes de deriva e de F1 prequencial.
+        f1_tolerance (float): Queda tolerada do F1 prequencial em relação a reference_f1.
+        drift_limits (dict, opcional): Limites do DriftMonitor.
+        random_state (int): Semente dos sintéticos.
+    Returns:
+        dict: n_new, n_synthetic_new, n_trees, prequential_f1, n_prequential,
+              drifted_features, needs_full_search e reasons.
+    """
+    df = _dataset_bruto(raw)
+    features = bundle['features']
+    novas = ~df[COLUNA_ID].isin(bundle['ids']).to_numpy()
+    relatorio = {'n_new': int(novas.sum()), 'n_synthetic_new': 0, 'n_trees': None, 'prequential_f1': np.nan,
+                 'n_prequential': len(bundle['prequential']['y_true']), 'drifted_features': [],
+                 'needs_full_search': False, 'reasons': []}
+    desconhecidas = sorted(set(df.loc[novas, TARGET]) - set(CLASSES))
+    if desconhecidas:  # O boosting não ganha classes novas: só o treino completo resolve.
+        relatorio.update(needs_full_search=True, reasons=[f"classes novas: {desconhecidas}"])
+        return relatorio
+    X_bruto, y = df[features].to_numpy(dtype=float), _rotulos(df)
+    pipeline = bundle['pipeline']
+    modelo = pipeline.named_steps['model']
+
+    if novas.any():
+        # --- Avaliação prequencial: predição antes de treinar com as amostras novas ---
+        bundle['prequential']['y_true'].extend(y[novas].tolist())
+        bundle['prequential']['y_pred'].extend(pipeline.predict(_normalizar(bundle, X_bruto[novas])).tolist())
+
+        # --- Sintéticos a partir das novas amostras das classes minoritárias (mesma proporção da classe) ---
+        contagens = np.bincount(y, minlength=len(CLASSES))
+        novas_por_classe = np.bincount(y[novas], minlength=len(CLASSES))
+        n_gerar = {c: int(round(novas_por_classe[c] * (contagens.max() - contagens[c]) / contagens[c]))
+                   for c in range(len(CLASSES)) if novas_por_classe[c] and contagens[c] < contagens.max()}
+        with TRACER.stage('incremental_sinteticos', n=sum(n_gerar.values())):
+            X_sint, y_sint = _sintetizar(X_bruto, y, features, n_gerar, np.flatnonzero(novas), random_state)
+        relatorio['n_synthetic_new'] = len(X_sint)
+
+        # --- Escalas: MinMax com as amostras novas e StandardScaler por partial_fit ---
+        with TRACER.stage('incremental_escalas'):
+            a_modelo_antigo, b_modelo_antigo = _afim_modelo(bundle)
+            a_antigo, b_antigo = _afim_minmax(bundle['feature_min'], bundle['feature_max'])
+            bundle['feature_min'], bundle['feature_max'] = _escala_minmax(X_bruto[novas], bundle['feature_min'],
+                                                                          bundle['feature_max'])
+            a_novo, b_novo = _afim_minmax(bundle['feature_min'], bundle['feature_max'])
+            imputador = pipeline.named_steps['imputer']  # Mediana do último treino completo, levada à nova escala.
+            imputador.statistics_ = (imputador.statistics_ - b_antigo) / a_antigo * a_novo + b_novo
+            escalonador = pipeline.named_steps.get('scaler')
+            if escalonador is not None:
+                escalonador.mean_ = (escalonador.mean_ - b_antigo) / a_antigo * a_novo + b_novo
+                escalonador.var_ = escalonador.var_ * (a_novo / a_antigo) ** 2
+                escalonador.partial_fit(imputador.transform(_normalizar(bundle, np.vstack([X_bruto[novas], X_sint]))))
+            a_modelo_novo, b_modelo_novo = _afim_modelo(bundle)
+            booster = remap_booster_thresholds(modelo.get_booster(), a_modelo_antigo, b_modelo_antigo,
+                                               a_modelo_novo, b_modelo_novo)
+
+        # --- Rodadas extras de boosting sobre real + todos os sintéticos ---
+        bundle['synthetic_X'] = np.vstack([bundle['synthetic_X'], X_sint])
+        bundle['synthetic_y'] = np.concatenate([bundle['synthetic_y'], y_sint])
+        X_treino = pipeline[:-1].transform(_normalizar(bundle, np.vstack([X_bruto, bundle['synthetic_X']])))
+        y_treino = np.concatenate([y, bundle['synthetic_y']])
+        total_arvores = booster.num_boosted_rounds() + extra_rounds
+        with TRACER.stage('incremental_boosting', rodadas=extra_rounds, n=len(X_treino)):
+            if extra_rounds > 0:
+                modelo.set_params(n_estimators=extra_rounds).fit(X_treino, y_treino, xgb_model=booster)
+            else:
+                modelo._Booster = booster
+            modelo.set_params(n_estimators=total_arvores)
+        bundle['ids'] |= set(df.loc[novas, COLUNA_ID])
+        bundle['class_counts'] = contagens
+        bundle['history'].append({'date': datetime.now().isoformat(timespec='seconds'), 'kind': 'incremental',
+                                  'n_new': int(novas.sum()), 'n_synthetic': len(X_sint), 'n_trees': total_arvores})
+        relatorio['n_trees'] = total_arvores
+
+    # --- Testes que pedem a busca completa (amostras desde o último treino completo) ---
+    desde_completo = ~df[COLUNA_ID].isin(bundle['ids_full_fit']).to_numpy()
+    monitor = DriftMonitor(bundle['profile'], limits=drift_limits, min_samples=min_validation_samples)
+    monitor.update_batch(df.loc[desde_completo, features], labels=df.loc[desde_completo, TARGET])
+    relatorio['drifted_features'] = monitor.drifted_features()
+    if relatorio['drifted_features']:
+        relatorio['reasons'].append(f"deriva em {relatorio['drifted_features']}")
+    y_true, y_pred = bundle['prequential']['y_true'], bundle['prequential']['y_pred']
+    relatorio['n_prequential'] = len(y_true)
+    if y_true:
+        relatorio['prequential_f1'] = evaluation_metrics(y_true, y_pred)['f1_macro']
+        if (bundle['reference_f1'] is not None and len(y_true) >= min_validation_samples
+                and relatorio['prequential_f1'] < bundle['reference_f1'] - f1_tolerance):
+            relatorio['reasons'].append(f"F1 prequencial {relatorio['prequential_f1']:.3f} < referência "
+                                        f"{bundle['reference_f1']:.3f} - {f1_tolerance}")
+    relatorio['needs_full_search'] = bool(relatorio['reasons'])
+    return relatorio
+
+
+# ==============================================================================
+# SEÇÃO: EXECUÇÃO PELA LINHA DE COMANDO
+# ==============================================================================
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Modelo implantado: treino completo e atualização incremental.")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    implantar = subparsers.add_parser('deploy', help="Treino completo (após o nested CV).")
+    implantar.add_argument('--results', help="Resultados de run_experiments (.joblib) com os hiperparâmetros do XGBoost.")
+    atualizar = subparsers.add_parser('update', help="Atualização incremental com as linhas novas do dataset.")
+    atualizar.add_argument('--extra-rounds', type=int, default=50)
+    atualizar.add_argument('--min-validation-samples', type=int, default=30)
+    for sub in (implantar, atualizar):
+        sub.add_argument('--raw', default=RAW_DATASET_FILE, help="Dataset real bruto.")
+        sub.add_argument('--model', default=DEPLOYED_MODEL_FILE, help="Arquivo do modelo implantado.")
+    args = parser.parse_args()
+
+    if args.command == 'deploy':
+        usa_scaler, parametros, f1_referencia = True, None, None
+        if args.results:
+            from experimento import load_results  # Apenas para ler os hiperparâmetros da busca completa.
+            usa_scaler, parametros, f1_referencia = best_model_params(load_results(args.results))
+        modelo_implantado = deploy_model(args.raw, parametros, usa_scaler, f1_referencia)
+        print(f"Modelo implantado salvo em: {save_deployed_model(modelo_implantado, args.model)}")
+    else:
+        modelo_implantado = load_deployed_model(args.model)
+        resultado = incremental_update(modelo_implantado, args.raw, extra_rounds=args.extra_rounds,
+                                       min_validation_samples=args.min_validation_samples)
+        if resultado['n_new']:
+            save_deployed_model(modelo_implantado, args.model)
+        for chave, valor in resultado.items():
+            print(f"  {chave:<18}: {valor}")
+        print("Busca completa recomendada (run_experiments)." if resultado['needs_full_search']
+              else "Atualização incremental suficiente.")
+        sys.exit(1 if resultado['needs_full_search'] else 0)
@@ -0,0 +1,147 @@
+# ==============================================================================
+# MÓDULO: AUDITORIA DE VAZAMENTO ENTRE TREINO (SINTÉTICO + REAL) E TESTE (REAL)
+# Descrição: Os sintéticos do gerador são pequenas perturbações (ruído de 5% do
+#            desvio padrão) de linhas reais, e o dataset de teste real contém
+#            essas mesmas linhas base. Esta auditoria mede quão perto cada linha
+#            de teste está do treino usando uma KD-tree (scipy cKDTree) no espaço
+#            dos atributos já escalados: construção O(n log n) e consultas
+#            O(log n) por linha, sem a varredura O(n x m) de todas as distâncias.
+#            São contadas, por classe:
+#            - linhas de teste com vizinho de treino quase duplicado (distância
+#              abaixo do limiar) e exatamente duplicado (distância 0);
+#            - linhas de treino quase duplicadas de alguma linha de teste.
+#            O limiar padrão é relativo ao espaçamento típico do próprio teste:
+#            uma fração da mediana da distância de cada linha de teste à linha de
+#            teste (distinta) mais próxima.
+# ==============================================================================
+
+import numpy as np  # Distâncias e contagens.
+import pandas as pd  # Tabelas por linha e por classe.
+from scipy.spatial import cKDTree  # Índice espacial (KD-tree) com consultas em paralelo.
+
+from rastreamento import TRACER  # Tempo/memória da construção e das consultas (desativado por padrão).
+
+
+# ==============================================================================
+# SEÇÃO: FUNÇÕES AUXILIARES
+# ==============================================================================
+
+def _matriz(X, exclude_columns):
+    """Converte X em array float (sem as colunas excluídas), retornando também os nomes das colunas."""
+    if isinstance(X, pd.DataFrame):
+        colunas = [coluna for coluna in X.columns if coluna not in exclude_columns]
+        return X[colunas].to_numpy(dtype=float), colunas
+    X = np.asarray(X, dtype=float)
+    return X, list(range(X.shape[1]))
+
+
+def _sem_ausentes(X, medianas):
+    """Substitui NaN pela mediana da coluna no treino (a KD-tree não aceita valores ausentes)."""
+    ausentes = np.isnan(X)
+    if ausentes.any():
+        X = np.where(ausentes, medianas, X)
+    return X
+
+
+def _indice(X):
+    """KD-tree sobre as linhas de X."""
+    with TRACER.stage('kdtree_build', n=len(X)):
+        # balanced_tree/compact_nodes=False: construção bem mais rápida, consultas quase iguais.
+        return cKDTree(X, leafsize=32, balanced_tree=False, compact_nodes=False)
+
+
+def nearest_neighbors(X_reference, X_query, k=1, n_jobs=-1, tree=None, max_distance=np.inf):
+    """
+    k vizinhos mais próximos (distância euclidiana) de cada linha de X_query em X_reference.
+
+    Args:
+        X_reference (np.ndarray): Linhas indexadas (n_referencia, n_atributos), sem NaN.
+        X_query (np.ndarray): Linhas consultadas (n_consultas, n_atributos), sem NaN.
+        k (int): Número de vizinhos.
+        n_jobs (int): Threads das consultas (-1 = todos os núcleos).
+        tree (cKDTree, opcional): Índice já construído sobre X_reference.
+        max_distance (float): Só procura vizinhos até essa distância (poda a busca);
+            sem vizinho nesse raio, distância inf e índice len(X_reference).
+    Returns:
+        tuple: (distâncias, índices), cada um com forma (n_consultas, k).
+    """
+    tree = _indice(X_reference) if tree is None else tree
+    with TRACER.stage('kdtree_query', n=len(X_query), k=k):
+        distancias, indices = tree.query(X_query, k=k, workers=n_jobs, distance_upper_bound=max_distance)
+    return distancias.reshape(len(X_query), k), indices.reshape(len(X_query), k)
+
+
+# ==============================================================================
+# SEÇÃO: AUDITORIA
+# ==============================================================================
+
+def leakage_audit(X_train, y_train, X_test, y_test, threshold=None, relative_threshold=0.5, k=1,
+                  exclude_columns=('ID',), class_names=None, n_jobs=-1):
+    """
+    Auditoria de quase duplicatas entre treino e teste.
+
+    Args:
+        X_train (pd.DataFrame ou np.ndarray): Atributos de treino (já escalados).
+        y_train (array): Classes do treino.
+        X_test (pd.DataFrame ou np.ndarray): Atributos de teste, mesmas colunas e escala.
+        y_test (array): Classes do teste.
+        threshold (float, opcional): Distância abaixo da qual um par é quase duplicado.
+        relative_threshold (float): Com threshold=None, limiar = relative_threshold x mediana
+            da distância de cada linha de teste à linha de teste mais próxima.
+        k (int): Vizinhos de treino por linha de teste (tabela por linha).
+        exclude_columns (tuple): Colunas ignoradas quando X é DataFrame (ex: 'ID').
+        class_names (list, opcional): Nomes das classes para rótulos codificados 0..n-1.
+        n_jobs (int): Threads das consultas (-1 = todos os núcleos).
+    Returns:
+        dict: 'threshold' (float), 'per_row' (pd.DataFrame: distâncias/índices/classes
+              dos k vizinhos de treino de cada linha de teste) e 'per_class'
+              (pd.DataFrame: por classe de teste, n_test, near_duplicates,
+              exact_duplicates, near_duplicate_rate, same_class_rate,
+              median_distance, train_rows, train_near_duplicates).
+    """
+    matriz_treino, colunas = _matriz(X_train, exclude_columns)
+    matriz_teste, colunas_teste = _matriz(X_test, exclude_columns)
+    if colunas != colunas_teste:
+        raise ValueError(f"Treino e teste com colunas diferentes: {colunas} x {colunas_teste}.")
+    medianas = np.nanmedian(matriz_treino, axis=0)
+    matriz_treino, matriz_teste = _sem_ausentes(matriz_treino, medianas), _sem_ausentes(matriz_teste, medianas)
+    y_train, y_test = np.asarray(y_train), np.asarray(y_test)
+
+    arvore_treino, arvore_teste = _indice(matriz_treino), _indice(matriz_teste)
+
+    # --- Limiar relativo ao espaçamento das linhas de teste ---
+    if threshold is None:
+        distancias_teste, _ = nearest_neighbors(matriz_teste, matriz_teste, k=2, n_jobs=n_jobs, tree=arvore_teste)
+        espacamento = distancias_teste[:, 1]
+        espacamento = espacamento[espacamento > 0]  # Linhas repetidas dentro do teste não definem a escala.
+        threshold = relative_threshold * float(np.median(espacamento)) if len(espacamento) else 0.0
+
+    # --- Teste -> treino: k vizinhos de cada linha de teste ---
+    distancias, indices = nearest_neighbors(matriz_treino, matriz_teste, k=k, n_jobs=n_jobs, tree=arvore_treino)
+    # --- Treino -> teste: linhas de treino quase duplicadas de alguma linha de teste ---
+    distancias_treino, _ = nearest_neighbors(matriz_teste, matriz_treino, k=1, n_jobs=n_jobs, tree=arvore_teste,
+                                             max_distance=np.nextafter(threshold, np.inf))
+    treino_quase_duplicado = distancias_treino[:, 0] <= threshold
+
+    def nomes(rotulos):
+        return np.asarray(class_names, dtype=object)[rotulos] if class_names is not None else rotulos
+
+    por_linha = pd.DataFrame({'test_index': np.arange(len(matriz_teste)), 'test_class': nomes(y_test)})
+    for j in range(k):
+        por_linha[f'distance_{j + 1}'] = distancias[:, j]
+        por_linha[f'train_index_{j + 1}'] = indices[:, j]
+        por_linha[f'train_class_{j + 1}'] = nomes(y_train[indices[:, j]])
+    por_linha['near_duplicate'] = distancias[:, 0] <= threshold
+    por_linha['exact_duplicate'] = distancias[:, 0] == 0
+    por_linha['same_class'] = y_train[indices[:, 0]] == y_test
+
+    por_classe = por_linha.groupby('test_class', sort=True).agg(
+        n_test=('test_index', 'size'), near_duplicates=('near_duplicate', 'sum'),
+        exact_duplicates=('exact_duplicate', 'sum'), near_duplicate_rate=('near_duplicate', 'mean'),
+        same_class_rate=('same_class', 'mean'), median_distance=('distance_1', 'median'))
+    treino = pd.DataFrame({'classe': nomes(y_train), 'quase': treino_quase_duplicado})
+    por_classe = por_classe.join(treino.groupby('classe').agg(train_rows=('quase', 'size'),
+                                                             train_near_duplicates=('quase', 'sum')), how='outer')
+    contagens = ['n_test', 'near_duplicates', 'exact_duplicates', 'train_rows', 'train_near_duplicates']
+    por_classe = por_classe.fillna(0).astype({coluna: int for coluna in contagens})
+    return {'threshold': threshold, 'per_row': por_linha, 'per_class': por_classe.rename_axis('class').reset_index()}
@@ -0,0 +1,365 @@
+# ==============================================================================
+# MÓDULO: BENCHMARK DAS ETAPAS DO PROJETO
+# Descrição: Mede tempo (wall), vazão (linhas/s) e pico de memória alocada
+#            (tracemalloc) das etapas críticas, em tamanhos de dataset que vão
+#            dos 781 registros originais até 10^7 linhas:
+#            - pontuação pelas regras do milho;
+#            - geração de sintéticos por classe (GaussianNoiseOversampler);
+#            - leitura do CSV (formato do projeto: ';' e ',' decimal), com o
+#              leitor multithread (csv_load) e com o pd.read_csv (csv_load[pandas]);
+#            - pré-processamento (mesmas transformações do 03_PreProcessamento);
+#            - auditoria de vazamento (dataset original x dataset aumentado);
+#            - HPO por modelo (make_hpo_search; pico medido com n_jobs=1, pois
+#              o tracemalloc não enxerga os processos do joblib);
+#            - predição em lote do melhor estimador;
+#            - inicialização (startup[<módulo>]): importação de cada ponto de
+#              entrada num interpretador novo, medida uma vez por execução.
+#            Os datasets maiores são criados pelo próprio gerador a partir do
+#            dataset original, mantendo a proporção das classes. Os resultados
+#            são salvos em CSV (um por commit) para comparação entre versões.
+#
+# Uso:
+#   python benchmark_etapas.py                                   # Todos os tamanhos padrão.
+#   python benchmark_etapas.py --sizes 781 100000 --compare resultados_benchmark/benchmark_<commit>.csv
+# ==============================================================================
+
+import argparse  # Parâmetros de linha de comando.
+import os  # Caminhos dos arquivos de entrada e saída.
+import subprocess  # Commit atual (identifica os resultados) e interpretadores novos (startup).
+import sys  # Interpretador usado na medição da inicialização.
+import tempfile  # CSV temporário da etapa de leitura.
+import time  # Medição de tempo.
+import tracemalloc  # Pico de memória alocada por etapa.
+from datetime import datetime  # Data da execução.
+
+import numpy as np  # Contagens e sorteios.
+import pandas as pd  # Leitura/escrita de CSV e tabela de resultados.
+import sklearn  # Versão registrada junto aos resultados.
+from sklearn.impute import SimpleImputer
+from sklearn.model_selection import StratifiedKFold, train_test_split
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import LabelEncoder, StandardScaler
+
+from auditoria_vazamento import leakage_audit  # Etapa de auditoria de vazamento.
+from busca_hiperparametros import make_hpo_search  # HPO como nos notebooks.
+from experimento import BASE_MODELS, PARAM_DISTS  # Modelos e espaços de busca dos experimentos (os mesmos dos notebooks).
+from leitura_csv import read_dataset_csv  # Leitura multithread do CSV (etapa csv_load).
+from reamostragem_ruido import GaussianNoiseOversampler  # Gerador vetorizado.
+from regras_milho import CRITERIOS_MILHO, FAIXAS_PONTUACAO_MILHO, rule_scores  # Regras vetorizadas.
+
+# --- Configurações padrão ---
+DIRETORIO_BASE = os.path.dirname(os.path.abspath(__file__))
+DATASET_ORIGINAL = os.path.join(DIRETORIO_BASE, '..', '00_Datasets', 'Dataset_OriginalComClass.csv')
+DIRETORIO_RESULTADOS = os.path.join(DIRETORIO_BASE, 'resultados_benchmark')
+TAMANHOS_PADRAO = (781, 10_000, 100_000, 1_000_000, 10_000_000)
+TARGET = 'Adequação MILHO'
+COLUNA_ID = 'ID'
+RANDOM_SEED = 42
+MODULOS_STARTUP = ('experimento', 'analises_experimento', 'hpo_distribuido', 'adequacao_culturas', 'regras_milho',
+                   'auditoria_vazamento', 'leitura_csv', 'rastreamento')  # Pontos de entrada dos scripts e notebooks.
+
+
+# ==============================================================================
+# SEÇÃO: FUNÇÕES AUXILIARES
+# ==============================================================================
+
+def _commit_atual():
+    """Hash curto do commit atual (ou 'desconhecido' fora de um repositório git)."""
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=DIRETORIO_BASE, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return 'desconhecido'
+
+
+def _medir(funcao, repeats=1, measure_memory=True, funcao_memoria=None):
+    """
+    Executa `funcao` e mede o menor tempo entre as repetições e o pico de memória.
+
+    O pico vem de uma execução extra sob tracemalloc (que deixaria a execução
+    cronometrada mais lenta). O NumPy registra seus buffers no tracemalloc.
+    O tracemalloc só enxerga o processo atual: etapas que usam processos do
+    joblib passam em `funcao_memoria` a mesma etapa com n_jobs=1.
+
+    Args:
+        funcao (callable): Etapa sem argumentos.
+        repeats (int): Repetições cronometradas.
+        measure_memory (bool): Se False, não faz a execução sob tracemalloc.
+        funcao_memoria (callable, opcional): Execução medida pelo tracemalloc (padrão: `funcao`).
+    Returns:
+        tuple: (tempo em segundos, pico em MB ou NaN, retorno da última execução cronometrada).
+    """
+    tempos = []
+    for _ in range(repeats):
+        inicio = time.perf_counter()
+        resultado = funcao()
+        tempos.append(time.perf_counter() - inicio)
+    pico_mb = np.nan
+    if measure_memory:
+        tracemalloc.start()
+        try:
+            (funcao_memoria or funcao)()
+            pico_mb = tracemalloc.get_traced_memory()[1] / 2 ** 20
+        finally:
+            tracemalloc.stop()
+    return min(tempos), pico_mb, resultado
+
+
+def measure_startup(modules=MODULOS_STARTUP, repeats=3):
+    """
+    Mede o tempo de importação de cada módulo num interpretador novo (sem cache
+    de módulos já importados), como na primeira célula de um notebook ou na
+    chamada de um script. A etapa 'startup[python]' é o interpretador vazio.
+
+    Args:
+        modules (iterable): Módulos da pasta 04_Treinamento.
+        repeats (int): Repetições por módulo (vale o menor tempo).
+    Returns:
+        list: Tuplas (nome da etapa, tempo em segundos).
+    """
+    medicoes = []
+    for modulo in ('python', *modules):
+        comando = [sys.executable, '-c', 'pass' if modulo == 'python' else f'import {modulo}']
+        tempos = []
+        for _ in range(max(repeats, 1)):
+            inicio = time.perf_counter()
+            subprocess.run(comando, cwd=DIRETORIO_BASE, check=True, stdout=subprocess.DEVNULL)
+            tempos.append(time.perf_counter() - inicio)
+        medicoes.append((f'startup[{modulo}]', min(tempos)))
+    return medicoes
+
+
+def load_raw_dataset(path=DATASET_ORIGINAL):
+    """Lê o CSV bruto como o pré-processamento (colunas aparadas, colunas/linhas vazias removidas)."""
+    df = read_dataset_csv(path)
+    return df.dropna(axis='columns', how='all').dropna(axis='rows', how='all').reset_index(drop=True)
+
+
+def preprocess_dataframe(df):
+    """
+    Mesmas transformações do 03_PreProcessamento/ML_Trabalho_PREprocessamento_v4.py,
+    sem gráficos, janelas e impressões: limpeza de vazios, verificação da soma
+    da textura, mapeamento do alvo, MinMax (exceto ID) com 5 casas, embaralhamento
+    e remoção de ID, Fe e Mn.
+
+    Args:
+        df (pd.DataFrame): Dataset bruto.
+    Returns:
+        pd.DataFrame: Dataset pré-processado.
+    """
+    df = df.copy()
+    df.columns = df.columns.str.strip()
+    df = df.dropna(axis='columns', how='all').dropna(axis='rows', how='all')
+    soma_textura = df['Sand %'] + df['Clay %'] + df['Silt %']
+    _ = ((soma_textura < 99.0) | (soma_textura > 101.0)).sum()  # Contagem de outliers (apenas informativa no script).
+    df[TARGET] = df[TARGET].map({'Baixa': 0, 'Média': 5, 'Alta': 10})
+    colunas = [c for c in df.select_dtypes(include=np.number).columns if c != COLUNA_ID]
+    valores = df[colunas].astype(np.float64)  # MinMax em pandas, como no script (sem o MinMaxScaler).
+    minimos = valores.min()
+    amplitudes = valores.max() - minimos
+    amplitudes[amplitudes < 10 * np.finfo(np.float64).eps] = 1.0
+    escalas = 1.0 / amplitudes
+    df[colunas] = (valores * escalas + (0.0 - minimos * escalas)).round(5)
+    df = df.sample(frac=1, random_state=42).reset_index(drop=True)
+    return df.drop(columns=[COLUNA_ID, 'Fe ppm', 'Mn ppm'], errors='ignore')
+
+
+def _sampler_gerador(classe, alvo):
+    """GaussianNoiseOversampler configurado como o gerador de sintéticos, para uma única classe."""
+    return GaussianNoiseOversampler(sampling_strategy={classe: alvo}, random_state=RANDOM_SEED,
+                                    criteria=CRITERIOS_MILHO, class_score_ranges=FAIXAS_PONTUACAO_MILHO,
+                                    special_texture_class='Alta')
+
+
+def scale_up_dataset(df_bruto, n_rows, repeats=1, measure_memory=True):
+    """
+    Amplia o dataset bruto até n_rows linhas com o gerador (mantendo a proporção
+    das classes) e mede a geração de cada classe.
+
+    Args:
+        df_bruto (pd.DataFrame): Dataset bruto original.
+        n_rows (int): Tamanho desejado (>= tamanho original).
+        repeats (int): Repetições cronometradas.
+        measure_memory (bool): Mede o pico de memória.
+    Returns:
+        tuple: (dataset ampliado, lista de medições por classe).
+    """
+    X, y = df_bruto.drop(columns=[TARGET]), df_bruto[TARGET]
+    contagens = y.value_counts()
+    alvos = (contagens / contagens.sum() * n_rows).round().astype(int)
+    partes, medicoes = [df_bruto], []
+    for classe, alvo in alvos.items():
+        if alvo <= contagens[classe]:
+            continue
+        sampler = _sampler_gerador(classe, int(alvo))
+        tempo, pico, (X_res, _) = _medir(lambda: sampler.fit_resample(X, y), repeats, measure_memory)
+        novos = X_res.iloc[len(X):].assign(**{TARGET: classe})
+        partes.append(novos)
+        medicoes.append((f'generation[{classe}]', len(novos), tempo, pico))
+    return pd.concat(partes, ignore_index=True)[df_bruto.columns], medicoes
+
+
+# ==============================================================================
+# SEÇÃO: BENCHMARK
+# ==============================================================================
+
+def run_benchmark(sizes=TAMANHOS_PADRAO, models=None, n_iter=5, cv_splits=3, max_rows_hpo=20_000, repeats=1,
+                  measure_memory=True, dataset_path=DATASET_ORIGINAL, startup=True, verbose=True):
+    """
+    Executa todas as etapas para cada tamanho de dataset.
+
+    Args:
+        sizes (iterable): Tamanhos de dataset (linhas).
+        models (list, opcional): Modelos do HPO/predição (None = todos de BASE_MODELS).
+        n_iter (int): Combinações sorteadas por busca de hiperparâmetros.
+        cv_splits (int): Folds da validação cruzada do HPO.
+        max_rows_hpo (int): Limite de linhas (amostra estratificada) usadas no HPO.
+        repeats (int): Repetições cronometradas por etapa (vale o menor tempo).
+        measure_memory (bool): Mede o pico de memória (uma execução extra por etapa).
+        dataset_path (str): CSV bruto original.
+        startup (bool): Mede a importação dos pontos de entrada (etapas startup[...], n_rows=0).
+        verbose (bool): Imprime cada medição.
+    Returns:
+        pd.DataFrame: Colunas commit, sklearn_version, timestamp, stage, n_rows,
+                      n_processed, wall_s, rows_per_s, peak_mb.
+    """
+    commit, inicio_execucao = _commit_atual(), datetime.now().isoformat(timespec='seconds')
+    df_original = load_raw_dataset(dataset_path)
+    df_real_pre = preprocess_dataframe(df_original)  # Linhas reais consultadas na auditoria de vazamento.
+    modelos = list(BASE_MODELS) if models is None else list(models)
+    linhas = []
+
+    def registrar(etapa, n_rows, n_processadas, tempo, pico):
+        linhas.append({'commit': commit, 'sklearn_version': sklearn.__version__, 'timestamp': inicio_execucao,
+                       'stage': etapa, 'n_rows': n_rows,
+                       'n_processed': n_processadas, 'wall_s': tempo,
+                       'rows_per_s': n_processadas / tempo if tempo > 0 else np.inf, 'peak_mb': pico})
+        if verbose:
+            print(f"  {etapa:<24} n={n_processadas:>10,}  {tempo:10.3f} s  {n_processadas / max(tempo, 1e-12):14,.0f} linhas/s"
+                  f"  pico={pico:10.1f} MB")
+
+    if startup:
+        if verbose:
+            print("\n--- Inicialização (importação num interpretador novo) ---")
+        for etapa, tempo in measure_startup(repeats=max(repeats, 3)):
+            registrar(etapa, 0, 1, tempo, np.nan)
+
+    for n_rows in sizes:
+        if verbose:
+            print(f"\n--- Tamanho do dataset: {n_rows:,} linhas ---")
+        df_bruto, medicoes_geracao = scale_up_dataset(df_original, n_rows, repeats, measure_memory)
+        for etapa, n_gerados, tempo, pico in medicoes_geracao:
+            registrar(etapa, n_rows, n_gerados, tempo, pico)
+
+        # --- Pontuação pelas regras ---
+        atributos = df_bruto.drop(columns=[TARGET]).select_dtypes(include=np.number)
+        X_bruto = atributos.to_numpy(dtype=float)
+        tempo, pico, _ = _medir(lambda X_bruto=X_bruto, colunas=list(atributos.columns): rule_scores(
+            X_bruto, colunas, CRITERIOS_MILHO), repeats, measure_memory)
+        registrar('rule_scoring', n_rows, len(df_bruto), tempo, pico)
+        del X_bruto, atributos
+
+        # --- Leitura do CSV (escrito uma vez, fora da medição) ---
+        with tempfile.TemporaryDirectory() as diretorio:
+            caminho_csv = os.path.join(diretorio, 'dataset.csv')
+            df_bruto.to_csv(caminho_csv, sep=';', decimal=',', index=False)
+            tempo, pico, _ = _medir(lambda: pd.read_csv(caminho_csv, sep=';', decimal=','), repeats, measure_memory)
+            registrar('csv_load[pandas]', n_rows, len(df_bruto), tempo, pico)
+            tempo, pico, _ = _medir(lambda: read_dataset_csv(caminho_csv), repeats, measure_memory)
+            registrar('csv_load', n_rows, len(df_bruto), tempo, pico)
+
+        # --- Pré-processamento ---
+        tempo, pico, df_pre = _medir(lambda df_bruto=df_bruto: preprocess_dataframe(df_bruto), repeats, measure_memory)
+        registrar('preprocessing', n_rows, len(df_bruto), tempo, pico)
+        del df_bruto
+
+        X = df_pre.drop(columns=[TARGET])
+        y = LabelEncoder().fit_transform(df_pre[TARGET])
+
+        # --- Auditoria de vazamento: linhas reais x dataset aumentado (KD-tree) ---
+        tempo, pico, _ = _medir(lambda: leakage_audit(X, y, df_real_pre.drop(columns=[TARGET]), df_real_pre[TARGET]),
+                                repeats, measure_memory)
+        registrar('leakage_audit', n_rows, len(X), tempo, pico)
+        if len(X) > max_rows_hpo:
+            X_hpo, _, y_hpo, _ = train_test_split(X, y, train_size=max_rows_hpo, stratify=y, random_state=RANDOM_SEED)
+        else:
+            X_hpo, y_hpo = X, y
+
+        # --- HPO e predição em lote por modelo ---
+        for nome in modelos:
+            pipeline = Pipeline([('imputer', SimpleImputer(strategy="median")), ('scaler', StandardScaler()),
+                                 ('model', BASE_MODELS[nome])])
+            def busca(n_jobs, pipeline=pipeline, nome=nome):
+                return make_hpo_search(pipeline, PARAM_DISTS[nome], cv=StratifiedKFold(n_splits=cv_splits, shuffle=True,
+                                                                                       random_state=RANDOM_SEED),
+                                       n_iter=n_iter, n_jobs=n_jobs, random_state=RANDOM_SEED, fast=True)
+            # Cronometrado com n_jobs=-1; pico com n_jobs=1 (o tracemalloc não vê os processos do joblib).
+            tempo, pico, busca_ajustada = _medir(lambda: busca(-1).fit(X_hpo, y_hpo), repeats, measure_memory,
+                                                 funcao_memoria=lambda: busca(1).fit(X_hpo, y_hpo))
+            registrar(f'hpo[{nome}]', n_rows, len(X_hpo), tempo, pico)
+            tempo, pico, _ = _medir(lambda: busca_ajustada.best_estimator_.predict(X), repeats, measure_memory)
+            registrar(f'predict[{nome}]', n_rows, len(X), tempo, pico)
+
+    return pd.DataFrame(linhas, columns=['commit', 'sklearn_version', 'timestamp', 'stage', 'n_rows', 'n_processed',
+                                         'wall_s', 'rows_per_s', 'peak_mb'])
+
+
+def save_benchmark(results, output_dir=DIRETORIO_RESULTADOS):
+    """Salva os resultados em output_dir/benchmark_<commit>.csv e retorna o caminho."""
+    os.makedirs(output_dir, exist_ok=True)
+    caminho = os.path.join(output_dir, f"benchmark_{results['commit'].iloc[0]}.csv")
+    results.to_csv(caminho, index=False)
+    return caminho
+
+
+def compare_benchmarks(baseline, current, tolerance=0.10):
+    """
+    Compara dois resultados de benchmark etapa a etapa.
+
+    Args:
+        baseline (pd.DataFrame ou str): Resultados (ou CSV) de referência.
+        current (pd.DataFrame ou str): Resultados (ou CSV) da versão avaliada.
+        tolerance (float): Aumento relativo de tempo ou memória considerado regressão.
+    Returns:
+        pd.DataFrame: Por (stage, n_rows): tempos, picos, razões atual/referência e
+                      'regression' (True se tempo ou pico subir mais que `tolerance`).
+    """
+    baseline = pd.read_csv(baseline) if isinstance(baseline, str) else baseline
+    current = pd.read_csv(current) if isinstance(current, str) else current
+    colunas = ['stage', 'n_rows', 'wall_s', 'peak_mb']
+    comparacao = baseline[colunas].merge(current[colunas], on=['stage', 'n_rows'], suffixes=('_base', '_atual'))
+    comparacao['wall_ratio'] = comparacao['wall_s_atual'] / comparacao['wall_s_base']
+    comparacao['peak_ratio'] = comparacao['peak_mb_atual'] / comparacao['peak_mb_base']
+    comparacao['regression'] = (comparacao['wall_ratio'] > 1 + tolerance) | (comparacao['peak_ratio'] > 1 + tolerance)
+    return comparacao
+
+
+# ==============================================================================
+# SEÇÃO: EXECUÇÃO
+# ==============================================================================
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Benchmark das etapas do projeto (tempo, vazão e pico de memória).")
+    parser.add_argument('--sizes', type=int, nargs='+', default=list(TAMANHOS_PADRAO), help="Tamanhos de dataset (linhas).")
+    parser.add_argument('--models', nargs='+', choices=list(BASE_MODELS), help="Modelos do HPO/predição (padrão: todos).")
+    parser.add_argument('--n-iter', type=int, default=5, help="Combinações por busca de hiperparâmetros.")
+    parser.add_argument('--max-rows-hpo', type=int, default=20_000, help="Limite de linhas usadas no HPO.")
+    parser.add_argument('--repeats', type=int, default=1, help="Repetições cronometradas por etapa.")
+    parser.add_argument('--no-memory', action='store_true', help="Não mede o pico de memória.")
+    parser.add_argument('--no-startup', action='store_true', help="Não mede a importação dos pontos de entrada.")
+    parser.add_argument('--output-dir', default=DIRETORIO_RESULTADOS, help="Pasta dos CSVs de resultados.")
+    parser.add_argument('--compare', help="CSV de uma execução anterior para comparação.")
+    parser.add_argument('--tolerance', type=float, default=0.10, help="Aumento relativo considerado regressão.")
+    args = parser.parse_args()
+
+    resultados = run_benchmark(sizes=args.sizes, models=args.models, n_iter=args.n_iter, max_rows_hpo=args.max_rows_hpo,
+                               repeats=args.repeats, measure_memory=not args.no_memory,
+                               startup=not args.no_startup)
+    print(f"\nResultados salvos em: {save_benchmark(resultados, args.output_dir)}")
+    if args.compare:
+        comparacao = compare_benchmarks(args.compare, resultados, args.tolerance)
+        print("\n--- Comparação com a execução de referência ---")
+        print(comparacao.to_string(index=False))
+        regressoes = comparacao[comparacao['regression']]
+        print(f"\n{len(regressoes)} regressão(ões) acima de {args.tolerance:.0%}." if len(regressoes) else
+              f"\nNenhuma regressão acima de {args.tolerance:.0%}.")
@@ -0,0 +1,161 @@
+# ==============================================================================
+# MÓDULO: INTERVALOS DE CONFIANÇA POR BOOTSTRAP (VETORIZADO)
+# Descrição: Reamostra os índices do conjunto de teste milhares de vezes com
+#            uma única matriz de índices do NumPy e calcula, a partir das
+#            predições já armazenadas em fold_metrics, F1, precisão e recall
+#            (macro e por classe) de todas as reamostragens de uma vez, por
+#            contagens vetorizadas da matriz de confusão. As mesmas
+#            reamostragens são usadas para todos os modelos (comparação pareada).
+# ==============================================================================
+
+import numpy as np  # Matriz de índices e contagens vetorizadas.
+import pandas as pd  # Tabela dos intervalos de confiança.
+
+_TAMANHO_BLOCO = 1000  # Reamostragens processadas por vez (limita a memória da matriz de contagens).
+
+
+# ==============================================================================
+# SEÇÃO: FUNÇÕES AUXILIARES
+# ==============================================================================
+
+def bootstrap_indices(n_samples, n_resamples=10000, random_state=None):
+    """
+    Matriz de índices das reamostragens (com reposição) do conjunto de teste.
+
+    Args:
+        n_samples (int): Número de amostras do conjunto de teste.
+        n_resamples (int): Número de reamostragens.
+        random_state (int ou None): Semente.
+    Returns:
+        np.ndarray: Índices no formato (n_resamples, n_samples).
+    """
+    return np.random.default_rng(random_state).integers(0, n_samples, size=(n_resamples, n_samples))
+
+
+def bootstrap_weights(indices, n_samples):
+    """
+    Converte a matriz de índices em contagens (quantas vezes cada amostra foi
+    sorteada em cada reamostragem), em blocos para manter os dados no cache.
+
+    Args:
+        indices (np.ndarray): Índices das reamostragens (n_resamples, n_samples).
+        n_samples (int): Número de amostras do conjunto de teste.
+    Returns:
+        np.ndarray: Contagens float32 no formato (n_resamples, n_samples).
+    """
+    pesos = np.empty((len(indices), n_samples), dtype=np.float32)
+    for inicio in range(0, len(indices), _TAMANHO_BLOCO):
+        bloco = indices[inicio:inicio + _TAMANHO_BLOCO]
+        deslocamento = np.arange(len(bloco))[:, None] * n_samples  # Cada reamostragem em sua faixa do bincount.
+        pesos[inicio:inicio + len(bloco)] = np.bincount(
+            (bloco + deslocamento).ravel(), minlength=len(bloco) * n_samples).reshape(len(bloco), n_samples)
+    return pesos
+
+
+def _matrizes_confusao(pares, pesos, n_classes):
+    """
+    Matrizes de confusão de todas as reamostragens para vários pares
+    (y_true, y_pred) de uma vez: uma única multiplicação das contagens pela
+    codificação one-hot das células da matriz de confusão de cada par.
+
+    Args:
+        pares (list): Lista de (y_true, y_pred) codificados (0..n_classes-1), todos
+            com o tamanho do conjunto de teste das reamostragens.
+        pesos (np.ndarray): Contagens das reamostragens (n_resamples, n_samples).
+        n_classes (int): Número de classes.
+    Returns:
+        np.ndarray: Contagens no formato (n_resamples, n_pares, n_classes, n_classes),
+                    linhas = classe real, colunas = classe predita.
+    """
+    n_celulas = n_classes * n_classes
+    one_hot = np.zeros((pesos.shape[1], len(pares) * n_celulas), dtype=np.float32)
+    for i_par, (y_true, y_pred) in enumerate(pares):
+        celulas = np.asarray(y_true) * n_classes + np.asarray(y_pred)  # Célula da matriz de cada amostra.
+        one_hot[np.arange(len(celulas)), i_par * n_celulas + celulas] = 1
+    contagens = np.rint(pesos @ one_hot).astype(np.int64)  # Somas inteiras (< 2**24): exatas em float32.
+    return contagens.reshape(len(pesos), len(pares), n_classes, n_classes)
+
+
+def _metricas_matrizes(matrizes):
+    """
+    Precisão, recall e F1 por classe e macro de um lote de matrizes de confusão,
+    com a mesma convenção do sklearn (zero_division=0; a média macro considera
+    as classes presentes em y_true ou y_pred de cada reamostragem).
+
+    Args:
+        matrizes (np.ndarray): Contagens (..., n_classes, n_classes).
+    Returns:
+        dict: {'precision'|'recall'|'f1': (por_classe (..., n_classes), macro (...))}.
+    """
+    vp = np.diagonal(matrizes, axis1=-2, axis2=-1).astype(float)
+    preditos = matrizes.sum(axis=-2)  # VP + FP por classe.
+    reais = matrizes.sum(axis=-1)  # VP + FN por classe (suporte).
+    presentes = (preditos + reais) > 0
+
+    precisao = np.divide(vp, preditos, out=np.zeros_like(vp), where=preditos > 0)
+    recall = np.divide(vp, reais, out=np.zeros_like(vp), where=reais > 0)
+    f1 = np.divide(2 * vp, preditos + reais, out=np.zeros_like(vp), where=presentes)
+
+    n_presentes = np.maximum(presentes.sum(axis=-1), 1)
+    return {nome: (valores, (valores * presentes).sum(axis=-1) / n_presentes)
+            for nome, valores in (('precision', precisao), ('recall', recall), ('f1', f1))}
+
+
+# ==============================================================================
+# SEÇÃO: INTERVALOS DE CONFIANÇA
+# ==============================================================================
+
+def bootstrap_confidence_intervals(all_results, class_names, y_true=None, n_resamples=10000, confidence=0.95,
+                                   random_state=None):
+    """
+    Intervalos de confiança bootstrap (percentil) de F1, precisão e recall, macro
+    e por classe, para todos os modelos de todas as configurações. A métrica de
+    cada reamostragem é a média sobre os folds do modelo (a mesma agregação dos
+    boxplots e testes estatísticos).
+
+    Args:
+        all_results (dict): Resultados do treino; cada fold em 'fold_metrics' deve
+            ter 'y_pred' (e 'y_true' se y_true não for informado).
+        class_names (array-like): Nomes das classes, na ordem da codificação.
+        y_true (np.ndarray, opcional): Rótulos do conjunto de teste comum (ex: dataset REAL).
+        n_resamples (int): Número de reamostragens.
+        confidence (float): Nível de confiança do intervalo.
+        random_state (int ou None): Semente das reamostragens (as mesmas para todos os modelos).
+    Returns:
+        pd.DataFrame: Colunas config, model, metric, class ('macro' ou nome da classe),
+                      mean, ci_lower, ci_upper.
+    """
+    n_classes = len(class_names)
+
+    # --- Pares (y_true, y_pred) de todos os folds, agrupados pelo tamanho do conjunto de teste ---
+    pares_por_tamanho = {}
+    folds_por_modelo = {}  # (config, modelo) -> [(tamanho, posição do par no grupo)]
+    for config_name, config_results in all_results.items():
+        for model_name, model_data in config_results.items():
+            for fold in model_data['fold_metrics']:
+                if 'y_pred' not in fold:
+                    continue
+                rotulos = fold['y_true'] if y_true is None else y_true
+                pares = pares_por_tamanho.setdefault(len(fold['y_pred']), [])
+                folds_por_modelo.setdefault((config_name, model_name), []).append((len(fold['y_pred']), len(pares)))
+                pares.append((rotulos, fold['y_pred']))
+
+    # --- Uma matriz de índices e uma multiplicação por tamanho de conjunto de teste ---
+    metricas_por_tamanho = {}
+    for tamanho, pares in pares_por_tamanho.items():
+        pesos = bootstrap_weights(bootstrap_indices(tamanho, n_resamples, random_state), tamanho)
+        metricas_por_tamanho[tamanho] = _metricas_matrizes(_matrizes_confusao(pares, pesos, n_classes))
+
+    # --- Média sobre os folds de cada modelo e intervalos percentis ---
+    percentis = [50 * (1 - confidence), 50 * (1 + confidence)]
+    linhas = []
+    for (config_name, model_name), folds in folds_por_modelo.items():
+        for metric_name in ('f1', 'precision', 'recall'):
+            por_classe = np.mean([metricas_por_tamanho[tamanho][metric_name][0][:, posicao] for tamanho, posicao in folds], axis=0)
+            macro = np.mean([metricas_por_tamanho[tamanho][metric_name][1][:, posicao] for tamanho, posicao in folds], axis=0)
+            colunas = [('macro', macro)] + [(str(nome), por_classe[:, i]) for i, nome in enumerate(class_names)]
+            for class_label, valores in colunas:
+                ci_lower, ci_upper = np.percentile(valores, percentis)
+                linhas.append({'config': config_name, 'model': model_name, 'metric': metric_name,
+                               'class': class_label, 'mean': valores.mean(), 'ci_lower': ci_lower, 'ci_upper': ci_upper})
+    return pd.DataFrame(linhas, columns=['config', 'model', 'metric', 'class', 'mean', 'ci_lower', 'ci_upper'])
@@ -0,0 +1,602 @@
+# ==============================================================================
+# MÓDULO: BUSCA RÁPIDA DE HIPERPARÂMETROS
+# Descrição: Implementa modos de avaliação especializados por família de modelo
+#            para substituir o RandomizedSearchCV dos notebooks de treino.
+#            Cada modo aproveita a estrutura do modelo para avaliar muitos
+#            candidatos a partir de um único cálculo caro por split interno,
+#            mantendo a mesma interface usada nos notebooks
+#            (fit, best_estimator_, best_params_, best_score_, cv_results_).
+# ==============================================================================
+
+import math  # Arredondamento do número de combinações sorteadas.
+import time  # Medição do tempo de refit do melhor candidato.
+
+import numpy as np  # Operações vetorizadas sobre votos, distâncias e scores.
+from joblib import Parallel, delayed  # Paraleliza a avaliação dos splits internos.
+from scipy.stats import rankdata  # Ranking dos candidatos (mesma convenção do sklearn).
+from sklearn.base import clone  # Cópias não ajustadas do pipeline e de suas etapas.
+from sklearn.ensemble import RandomForestClassifier  # Modo rápido da RandomForest (prefixos de árvores).
+from sklearn.metrics.pairwise import rbf_kernel  # Matriz de kernel RBF reaproveitada no modo rápido do SVM.
+from sklearn.model_selection import ParameterSampler, RandomizedSearchCV  # Sorteio de candidatos e caminho padrão.
+from sklearn.neighbors import KNeighborsClassifier, NearestNeighbors  # Modo rápido do k-NN.
+from sklearn.svm import SVC  # Modo rápido do SVM (kernel pré-computado).
+from sklearn.tree import DecisionTreeClassifier  # Modo rápido da árvore de decisão (triagem por truncamento).
+
+from metricas import PREDICTION_METRICS  # Métricas calculadas direto das predições (F1 macro sem validação).
+
+
+# ==============================================================================
+# SEÇÃO: FUNÇÕES AUXILIARES
+# ==============================================================================
+
+def _valores_parametro(distribuicao):
+    """
+    Enumera todos os valores possíveis de um hiperparâmetro discreto.
+
+    Args:
+        distribuicao (list ou scipy.stats frozen discreta): Lista de valores ou
+            distribuição discreta (ex: randint(3, 50)).
+    Returns:
+        list: Valores possíveis, em ordem crescente para distribuições.
+    """
+    if hasattr(distribuicao, 'support'):  # Distribuição discreta do scipy (ex: randint).
+        inicio, fim = distribuicao.support()
+        return list(range(int(inicio), int(fim) + 1))
+    return list(distribuicao)  # Lista explícita de valores.
+
+
+def _e_discreta(distribuicao):
+    """Indica se o hiperparâmetro pode ser enumerado (lista ou distribuição discreta)."""
+    if hasattr(distribuicao, 'dist'):
+        return hasattr(distribuicao.dist, 'pmf')  # Apenas distribuições discretas têm pmf.
+    return isinstance(distribuicao, (list, tuple))
+
+
+def _preparar_split(preprocessamento, X_treino, y_treino, X_val):
+    """
+    Ajusta as etapas de pré-processamento do pipeline (imputer, scaler) apenas
+    na parte de treino do split e transforma treino e validação.
+
+    Args:
+        preprocessamento (list): Etapas (nome, transformador) anteriores ao modelo.
+        X_treino (np.ndarray): Atributos de treino do split.
+        y_treino (np.ndarray): Rótulos de treino do split.
+        X_val (np.ndarray): Atributos de validação do split.
+    Returns:
+        tuple: (X_treino transformado, X_val transformado).
+    """
+    for _, transformador in preprocessamento:
+        transformador = clone(transformador)
+        X_treino = transformador.fit_transform(X_treino, y_treino)
+        X_val = transformador.transform(X_val)
+    return np.asarray(X_treino, dtype=np.float64), np.asarray(X_val, dtype=np.float64)
+
+
+# ==============================================================================
+# SEÇÃO: CLASSE BASE DOS MODOS RÁPIDOS
+# ==============================================================================
+
+class _BuscaRapidaBase:
+    """
+    Estrutura comum dos modos de busca rápida.
+
+    Percorre os splits do `cv`, ajusta o pré-processamento do pipeline em cada
+    parte de treino e delega às subclasses a avaliação de todos os candidatos
+    do split (`_avaliar_split`). Ao final, agrega os scores, escolhe o melhor
+    candidato e reajusta o pipeline completo com ele (refit), como o
+    RandomizedSearchCV.
+
+    Args:
+        estimator (Pipeline): Pipeline ('imputer', ['scaler'], 'model').
+        param_distributions (dict): Distribuições dos hiperparâmetros ('model__...').
+        cv: Gerador de splits (ex: RepeatedStratifiedKFold).
+        n_iter (int): Número de candidatos sorteados (quando o modo sorteia).
+        scoring (str): Métrica a maximizar. Apenas 'f1_macro' é suportada.
+        n_jobs (int): Número de processos para avaliar os splits (-1 = todos).
+        random_state (int): Semente para o sorteio dos candidatos.
+        refit (bool): Se True, reajusta o pipeline com os melhores parâmetros.
+    """
+
+    modelo_suportado = None  # Classe do estimador final atendida pela subclasse.
+    parametros_suportados = ()  # Hiperparâmetros ('model__...') que o modo sabe avaliar.
+
+    def __init__(self, estimator, param_distributions, cv, n_iter=30, scoring='f1_macro',
+                 n_jobs=None, random_state=None, refit=True):
+        if scoring not in PREDICTION_METRICS:
+            raise ValueError(f"Métrica '{scoring}' não suportada pelos modos rápidos. Use uma de {list(PREDICTION_METRICS)}.")
+        self.estimator = estimator
+        self.param_distributions = param_distributions
+        self.cv = cv
+        self.n_iter = n_iter
+        self.scoring = scoring
+        self.n_jobs = n_jobs
+        self.random_state = random_state
+        self.refit = refit
+
+    @classmethod
+    def suporta(cls, pipeline, param_distributions):
+        """Indica se o modo rápido atende este pipeline e este espaço de busca."""
+        return (isinstance(pipeline.steps[-1][1], cls.modelo_suportado)
+                and set(param_distributions) <= set(cls.parametros_suportados))
+
+    def _candidatos(self):
+        """
+        Lista de dicionários de parâmetros avaliados. Por padrão, sorteia os
+        mesmos `n_iter` candidatos que o RandomizedSearchCV sortearia.
+        """
+        return list(ParameterSampler(self.param_distributions, self.n_iter, random_state=self.random_state))
+
+    def _avaliar_split(self, modelo, X_treino, y_treino, X_val, y_val, candidatos):
+        """Retorna um array com o score de cada candidato no split (implementado pelas subclasses)."""
+        raise NotImplementedError
+
+    def _reavaliar(self, X, y, splits, candidatos, scores):
+        """
+        Ponto de extensão para substituir scores aproximados por ajustes exatos
+        (alterando colunas de `scores`). Retorna a máscara dos candidatos
+        reavaliados ou None quando todos os scores já são exatos.
+        """
+        return None
+
+    def _executar_split(self, X, y, idx_treino, idx_val, candidatos):
+        """Pré-processa um split e avalia todos os candidatos nele."""
+        X_treino, X_val = _preparar_split(self.estimator.steps[:-1], X[idx_treino], y[idx_treino], X[idx_val])
+        modelo = clone(self.estimator.steps[-1][1])
+        return self._avaliar_split(modelo, X_treino, y[idx_treino], X_val, y[idx_val], candidatos)
+
+    def fit(self, X, y):
+        """
+        Avalia todos os candidatos em todos os splits e reajusta o melhor.
+
+        Args:
+            X (pd.DataFrame ou np.ndarray): Atributos de treino.
+            y (np.ndarray): Rótulos codificados.
+        Returns:
+            self
+        """
+        X_array = X.to_numpy() if hasattr(X, 'to_numpy') else np.asarray(X)
+        y_array = np.asarray(y)
+        candidatos = self._candidatos()
+
+        splits = list(self.cv.split(X_array, y_array))
+        scores_por_split = Parallel(n_jobs=self.n_jobs)(
+            delayed(self._executar_split)(X_array, y_array, idx_treino, idx_val, candidatos)
+            for idx_treino, idx_val in splits)
+        scores = np.vstack(scores_por_split)  # (n_splits, n_candidatos)
+        reavaliados = self._reavaliar(X_array, y_array, splits, candidatos, scores)
+
+        # --- Agregação no mesmo formato do cv_results_ do sklearn ---
+        medias = scores.mean(axis=0)
+        self.cv_results_ = {'params': candidatos,
+                            'mean_test_score': medias,
+                            'std_test_score': scores.std(axis=0)}
+        for i in range(scores.shape[0]):
+            self.cv_results_[f'split{i}_test_score'] = scores[i]
+        for chave in candidatos[0]:
+            self.cv_results_[f'param_{chave}'] = np.array([c[chave] for c in candidatos], dtype=object)
+        medias_rank = np.where(np.isnan(medias), -np.inf, medias)  # Candidatos inválidos ficam por último.
+        if reavaliados is None:
+            self.cv_results_['rank_test_score'] = rankdata(-medias_rank, method='min').astype(np.int32)
+        else:  # Reavaliados primeiro (só eles podem ser o melhor), depois os demais pelo score aproximado.
+            ranks = np.empty(len(candidatos), dtype=np.int32)
+            ranks[reavaliados] = rankdata(-medias_rank[reavaliados], method='min')
+            ranks[~reavaliados] = reavaliados.sum() + rankdata(-medias_rank[~reavaliados], method='min')
+            self.cv_results_['rank_test_score'] = ranks
+            self.cv_results_['exact_score'] = reavaliados
+
+        self.best_index_ = int(np.argmin(self.cv_results_['rank_test_score']))
+        self.best_params_ = candidatos[self.best_index_]
+        self.best_score_ = medias[self.best_index_]
+        self.n_splits_ = len(splits)
+
+        if self.refit:
+            inicio_refit = time.time()
+            self.best_estimator_ = clone(self.estimator).set_params(**self.best_params_).fit(X, y)
+            self.refit_time_ = time.time() - inicio_refit
+        return self
+
+    def predict(self, X):
+        """Prediz com o melhor estimador (requer refit=True)."""
+        return self.best_estimator_.predict(X)
+
+    def predict_proba(self, X):
+        """Probabilidades do melhor estimador (requer refit=True)."""
+        return self.best_estimator_.predict_proba(X)
+
+
+# ==============================================================================
+# SEÇÃO: k-NN — GRAFO DE VIZINHOS ÚNICO POR (SPLIT, p)
+# ==============================================================================
+
+class KNNNeighborGraphSearch(_BuscaRapidaBase):
+    """
+    Busca do k-NN a partir de um único grafo de vizinhos por (split, p).
+
+    Em vez de reajustar e reconsultar os vizinhos para cada candidato, calcula
+    uma vez as distâncias ordenadas até o maior k da distribuição e deriva os
+    votos de todos os k (soma acumulada ao longo dos vizinhos) e dos dois
+    esquemas de peso ('uniform' e 'distance'). Como o custo não depende do
+    número de candidatos, a grade completa (todos os k x p x weights) é
+    avaliada e `n_iter` é ignorado.
+
+    Observação: em empates exatos de distância na fronteira do k-ésimo vizinho,
+    a escolha do vizinho pode diferir de um ajuste isolado com aquele k.
+    """
+
+    modelo_suportado = KNeighborsClassifier
+    parametros_suportados = ('model__n_neighbors', 'model__p', 'model__weights')
+
+    @classmethod
+    def suporta(cls, pipeline, param_distributions):
+        return (super().suporta(pipeline, param_distributions)
+                and all(_e_discreta(d) for d in param_distributions.values()))
+
+    def _grade(self):
+        """Valores enumerados de k, p e weights (padrões do estimador quando ausentes)."""
+        modelo = self.estimator.steps[-1][1]
+        valores_k = _valores_parametro(self.param_distributions.get('model__n_neighbors', [modelo.n_neighbors]))
+        valores_p = _valores_parametro(self.param_distributions.get('model__p', [modelo.p]))
+        valores_peso = _valores_parametro(self.param_distributions.get('model__weights', [modelo.weights]))
+        return valores_k, valores_p, valores_peso
+
+    def _candidatos(self):
+        valores_k, valores_p, valores_peso = self._grade()
+        return [{'model__n_neighbors': k, 'model__p': p, 'model__weights': peso}
+                for p in valores_p for peso in valores_peso for k in valores_k]
+
+    def _avaliar_split(self, modelo, X_treino, y_treino, X_val, y_val, candidatos):
+        metrica = PREDICTION_METRICS[self.scoring]
+        classes, y_treino_idx = np.unique(y_treino, return_inverse=True)  # Mesma ordem de classes_ do sklearn.
+        k_maximo = min(max(c['model__n_neighbors'] for c in candidatos), len(X_treino))
+
+        votos_por_p = {}
+        for p in {c['model__p'] for c in candidatos}:
+            # --- Consulta única: vizinhos ordenados até o maior k ---
+            vizinhos = NearestNeighbors(n_neighbors=k_maximo, algorithm=modelo.algorithm, leaf_size=modelo.leaf_size,
+                                        metric=modelo.metric, p=p, metric_params=modelo.metric_params)
+            distancias, indices = vizinhos.fit(X_treino).kneighbors(X_val)
+            one_hot = np.eye(len(classes))[y_treino_idx[indices]]  # (n_val, k_maximo, n_classes)
+
+            # --- Pesos 'distance' com a mesma regra do sklearn para distância zero ---
+            with np.errstate(divide='ignore'):
+                pesos = 1.0 / distancias
+            mascara_inf = np.isinf(pesos)
+            linhas_inf = mascara_inf.any(axis=1)
+            pesos[linhas_inf] = mascara_inf[linhas_inf]
+
+            votos_por_p[p] = {'uniform': np.cumsum(one_hot, axis=1),  # Votos de todos os k de uma vez.
+                              'distance': np.cumsum(one_hot * pesos[:, :, None], axis=1)}
+
+        scores = np.full(len(candidatos), np.nan)
+        for i, candidato in enumerate(candidatos):
+            k = candidato['model__n_neighbors']
+            if k > k_maximo:  # k maior que o treino: o ajuste isolado falharia.
+                continue
+            votos = votos_por_p[candidato['model__p']][candidato['model__weights']][:, k - 1, :]
+            scores[i] = metrica(y_val, classes[np.argmax(votos, axis=1)])
+        return scores
+
+
+# ==============================================================================
+# SEÇÃO: SVM — MATRIZ DE KERNEL ÚNICA POR (SPLIT, gamma)
+# ==============================================================================
+
+def _valor_gamma(gamma, X_treino):
+    """
+    Converte 'scale'/'auto' no valor numérico de gamma, com a mesma regra do SVC.
+
+    Args:
+        gamma (str ou float): Valor do hiperparâmetro gamma.
+        X_treino (np.ndarray): Atributos de treino já pré-processados.
+    Returns:
+        float: Valor numérico de gamma.
+    """
+    if gamma == 'scale':
+        variancia = X_treino.var()
+        return 1.0 / (X_treino.shape[1] * variancia) if variancia != 0 else 1.0
+    if gamma == 'auto':
+        return 1.0 / X_treino.shape[1]
+    return float(gamma)
+
+
+class SVMKernelReuseSearch(_BuscaRapidaBase):
+    """
+    Busca do SVM (kernel RBF) reaproveitando a matriz de kernel.
+
+    Os candidatos sorteados são agrupados por gamma. Para cada (split, gamma),
+    as matrizes de kernel treino x treino e validação x treino são calculadas
+    uma única vez e todos os valores de C do grupo são ajustados sobre elas
+    (SVC com kernel='precomputed'), em ordem crescente de C. A libsvm não
+    expõe inicialização a partir de uma solução anterior (warm start), então
+    o ganho vem da reutilização do kernel.
+
+    Durante a busca o SVC é ajustado com probability=False: o score usa apenas
+    `predict`, que não depende da calibração de Platt (validação cruzada
+    interna de 5 folds). O refit final usa o estimador original.
+    """
+
+    modelo_suportado = SVC
+    parametros_suportados = ('model__C', 'model__gamma')
+
+    @classmethod
+    def suporta(cls, pipeline, param_distributions):
+        return super().suporta(pipeline, param_distributions) and pipeline.steps[-1][1].kernel == 'rbf'
+
+    def _avaliar_split(self, modelo, X_treino, y_treino, X_val, y_val, candidatos):
+        metrica = PREDICTION_METRICS[self.scoring]
+        modelo_pre = clone(modelo).set_params(kernel='precomputed', probability=False)
+
+        # --- Agrupamento por valor numérico de gamma ('scale'/'auto' resolvidos neste split) ---
+        grupos = {}
+        for i, candidato in enumerate(candidatos):
+            gamma = _valor_gamma(candidato.get('model__gamma', modelo.gamma), X_treino)
+            grupos.setdefault(gamma, []).append(i)
+
+        scores = np.full(len(candidatos), np.nan)
+        for gamma, indices in grupos.items():
+            kernel_treino = rbf_kernel(X_treino, gamma=gamma)  # Calculado uma vez por (split, gamma).
+            kernel_val = rbf_kernel(X_val, X_treino, gamma=gamma)
+            for i in sorted(indices, key=lambda j: candidatos[j].get('model__C', modelo.C)):
+                C = candidatos[i].get('model__C', modelo.C)
+                y_pred = clone(modelo_pre).set_params(C=C).fit(kernel_treino, y_treino).predict(kernel_val)
+                scores[i] = metrica(y_val, y_pred)
+        return scores
+
+
+# ==============================================================================
+# SEÇÃO: RANDOM FOREST — UMA FLORESTA POR COMBINAÇÃO, PREFIXOS PARA n_estimators
+# ==============================================================================
+
+class RandomForestPrefixSearch(_BuscaRapidaBase):
+    """
+    Busca da RandomForest cultivando uma floresta por combinação dos demais
+    hiperparâmetros e avaliando os valores menores de n_estimators como
+    prefixos dela.
+
+    Com random_state fixo, a floresta de n árvores é exatamente o prefixo das
+    n primeiras árvores da floresta maior (as sementes e as amostras bootstrap
+    de cada árvore são sorteadas em sequência). Assim, a predição de cada
+    n_estimators é obtida acumulando predict_proba das árvores em ordem.
+
+    Como o sorteio independente raramente repete a combinação dos demais
+    hiperparâmetros, os candidatos são sorteados de forma estruturada:
+    ceil(n_iter / n_estimators_por_combinacao) combinações, cada uma avaliada
+    em `n_estimators_por_combinacao` valores de n_estimators sorteados da
+    distribuição original. O total de candidatos continua próximo de n_iter.
+
+    Args:
+        n_estimators_por_combinacao (int): Valores de n_estimators avaliados
+            por floresta cultivada.
+        (demais argumentos: ver _BuscaRapidaBase)
+    """
+
+    modelo_suportado = RandomForestClassifier
+
+    def __init__(self, estimator, param_distributions, cv, n_iter=30, scoring='f1_macro',
+                 n_jobs=None, random_state=None, refit=True, n_estimators_por_combinacao=5):
+        super().__init__(estimator, param_distributions, cv, n_iter=n_iter, scoring=scoring,
+                         n_jobs=n_jobs, random_state=random_state, refit=refit)
+        self.n_estimators_por_combinacao = n_estimators_por_combinacao
+
+    @classmethod
+    def suporta(cls, pipeline, param_distributions):
+        """
+        Exige n_estimators no espaço de busca e apenas hiperparâmetros do
+        próprio modelo ('model__<parâmetro da RandomForest>'): a floresta de
+        cada combinação é configurada sem o prefixo, e chaves de outros passos
+        do pipeline seriam ignoradas.
+        """
+        modelo = pipeline.steps[-1][1]
+        if not isinstance(modelo, cls.modelo_suportado) or modelo.warm_start:
+            return False
+        parametros_modelo = modelo.get_params(deep=False)
+        return ('model__n_estimators' in param_distributions
+                and all(k.startswith('model__') and k[len('model__'):] in parametros_modelo
+                        for k in param_distributions))
+
+    def _candidatos(self):
+        rng = np.random.RandomState(self.random_state)
+        demais = {k: v for k, v in self.param_distributions.items() if k != 'model__n_estimators'}
+        dist_n = self.param_distributions['model__n_estimators']
+        n_combinacoes = math.ceil(self.n_iter / self.n_estimators_por_combinacao)
+        combinacoes = list(ParameterSampler(demais, n_combinacoes, random_state=rng)) if demais else [{}]
+
+        candidatos = []
+        for combinacao in combinacoes:
+            if hasattr(dist_n, 'rvs'):
+                valores_n = dist_n.rvs(size=self.n_estimators_por_combinacao, random_state=rng)
+            else:
+                valores_n = rng.choice(dist_n, size=self.n_estimators_por_combinacao)
+            for n in sorted({int(v) for v in valores_n}):
+                candidatos.append({**combinacao, 'model__n_estimators': n})
+        return candidatos
+
+    def _avaliar_split(self, modelo, X_treino, y_treino, X_val, y_val, candidatos):
+        metrica = PREDICTION_METRICS[self.scoring]
+        X_val32 = X_val.astype(np.float32)  # Mesmo dtype usado internamente pelas árvores.
+
+        # --- Agrupamento por combinação dos demais hiperparâmetros ---
+        grupos = {}
+        for i, candidato in enumerate(candidatos):
+            chave = tuple(sorted((k, v) for k, v in candidato.items() if k != 'model__n_estimators'))
+            grupos.setdefault(chave, []).append(i)
+
+        scores = np.full(len(candidatos), np.nan)
+        for chave, indices in grupos.items():
+            alvos = {candidatos[i]['model__n_estimators']: i for i in indices}
+            floresta = clone(modelo).set_params(**{k[len('model__'):]: v for k, v in chave},
+                                                n_estimators=max(alvos))
+            floresta.fit(X_treino, y_treino)  # Uma floresta por (split, combinação).
+
+            soma_proba = np.zeros((len(X_val), len(floresta.classes_)))
+            for n_arvores, arvore in enumerate(floresta.estimators_, start=1):
+                soma_proba += arvore.predict_proba(X_val32, check_input=False)
+                if n_arvores in alvos:  # Prefixo com n_arvores árvores = candidato com esse n_estimators.
+                    scores[alvos[n_arvores]] = metrica(y_val, floresta.classes_[np.argmax(soma_proba, axis=1)])
+        return scores
+
+
+# ==============================================================================
+# SEÇÃO: ÁRVORE DE DECISÃO — TRIAGEM POR TRUNCAMENTO E REAVALIAÇÃO EXATA
+# ==============================================================================
+
+def _caminhos_arvore(arvore, X):
+    """
+    Calcula, de forma vetorizada, o nó visitado por cada amostra em cada nível.
+
+    Args:
+        arvore (sklearn.tree._tree.Tree): Estrutura da árvore ajustada (`tree_`).
+        X (np.ndarray): Amostras (float32, como usado internamente pelas árvores).
+    Returns:
+        np.ndarray: Matriz (n_amostras, profundidade + 1) com os nós do caminho.
+                    Depois de chegar à folha, o nó se repete até o último nível.
+    """
+    linhas = np.arange(len(X))
+    no_atual = np.zeros(len(X), dtype=np.intp)
+    caminho = np.empty((len(X), arvore.max_depth + 1), dtype=np.intp)
+    caminho[:, 0] = 0
+    for nivel in range(1, arvore.max_depth + 1):
+        folha = arvore.children_left[no_atual] == -1
+        vai_esquerda = X[linhas, arvore.feature[no_atual]] <= arvore.threshold[no_atual]
+        proximo = np.where(vai_esquerda, arvore.children_left[no_atual], arvore.children_right[no_atual])
+        no_atual = np.where(folha, no_atual, proximo)
+        caminho[:, nivel] = no_atual
+    return caminho
+
+
+class DecisionTreePathSearch(_BuscaRapidaBase):
+    """
+    Busca da árvore de decisão com triagem por truncamento de uma árvore
+    completa por (split, criterion, min_samples_leaf) e reavaliação exata dos
+    melhores candidatos.
+
+    Os candidatos são os mesmos `n_iter` que o RandomizedSearchCV sortearia.
+    Na triagem, a árvore de cada grupo (criterion, min_samples_leaf) é
+    cultivada sem limite de profundidade e com min_samples_split=2, e a
+    predição de cada (max_depth, min_samples_split) é obtida percorrendo o
+    caminho de cada amostra e parando no primeiro nó que a árvore restrita
+    transformaria em folha.
+
+    O score da triagem é aproximado: o construtor do sklearn sorteia a ordem
+    dos atributos em cada nó, e forçar um nó a ser folha muda a sequência
+    sorteada nos nós seguintes (e com ela o desempate entre divisões de mesmo
+    ganho). A árvore truncada, portanto, nem sempre é a árvore que um ajuste
+    com esses parâmetros produziria. Por isso os `n_exatos` melhores da
+    triagem são reavaliados com o pipeline ajustado em cada split, e apenas
+    eles podem ser escolhidos: best_params_ e best_score_ vêm de ajustes reais
+    (cv_results_['exact_score'] marca os reavaliados). O resultado coincide
+    com o do RandomizedSearchCV sempre que o melhor candidato dele está entre
+    os `n_exatos` da triagem, e sempre quando n_exatos >= n_iter.
+
+    Ajustes por split: uma árvore completa por grupo (criterion,
+    min_samples_leaf) presente entre os candidatos, mais `n_exatos` pipelines
+    na reavaliação. Esses dois parâmetros mudam as divisões escolhidas e não
+    podem ser recuperados de uma árvore já ajustada. No espaço de PARAM_DISTS
+    (2 critérios x 4 valores de min_samples_leaf) são até 8 + 10 = 18
+    ajustes, contra os n_iter = 30 do RandomizedSearchCV; as árvores da
+    triagem também custam menos que os pipelines (sem pré-processamento).
+
+    Args:
+        n_exatos (int): Candidatos da triagem reavaliados com ajustes reais.
+        (demais argumentos: ver _BuscaRapidaBase)
+    """
+
+    modelo_suportado = DecisionTreeClassifier
+    parametros_suportados = ('model__max_depth', 'model__min_samples_split', 'model__min_samples_leaf',
+                             'model__criterion')
+
+    def __init__(self, estimator, param_distributions, cv, n_iter=30, scoring='f1_macro',
+                 n_jobs=None, random_state=None, refit=True, n_exatos=10):
+        super().__init__(estimator, param_distributions, cv, n_iter=n_iter, scoring=scoring,
+                         n_jobs=n_jobs, random_state=random_state, refit=refit)
+        self.n_exatos = n_exatos
+
+    def _avaliar_split(self, modelo, X_treino, y_treino, X_val, y_val, candidatos):
+        metrica = PREDICTION_METRICS[self.scoring]
+        X_val32 = X_val.astype(np.float32)  # Mesmo dtype usado internamente pelas árvores.
+        linhas = np.arange(len(X_val))
+
+        grupos = {}
+        for i, candidato in enumerate(candidatos):
+            grupo = (candidato.get('model__criterion', modelo.criterion),
+                     candidato.get('model__min_samples_leaf', modelo.min_samples_leaf))
+            grupos.setdefault(grupo, []).append(i)
+
+        scores = np.full(len(candidatos), np.nan)
+        for (criterio, folha), indices in grupos.items():
+            # --- Ajuste único da árvore completa do grupo ---
+            arvore_completa = clone(modelo).set_params(criterion=criterio, min_samples_leaf=folha,
+                                                       max_depth=None, min_samples_split=2)
+            arvore_completa.fit(X_treino, y_treino)
+            arvore = arvore_completa.tree_
+            classe_no = arvore_completa.classes_[np.argmax(arvore.value[:, 0, :], axis=1)]  # Predição de cada nó.
+
+            caminho = _caminhos_arvore(arvore, X_val32)
+            folha_caminho = arvore.children_left[caminho] == -1
+            amostras_caminho = arvore.n_node_samples[caminho]
+
+            nivel_por_split = {}
+            for i in indices:
+                profundidade = candidatos[i].get('model__max_depth', modelo.max_depth)
+                split = candidatos[i].get('model__min_samples_split', modelo.min_samples_split)
+                if split not in nivel_por_split:  # Primeiro nível em que o nó seria folha por min_samples_split.
+                    nivel_por_split[split] = np.argmax(folha_caminho | (amostras_caminho < split), axis=1)
+                nivel = nivel_por_split[split]
+                if profundidade is not None:
+                    nivel = np.minimum(nivel, profundidade)
+                scores[i] = metrica(y_val, classe_no[caminho[linhas, nivel]])
+        return scores
+
+    def _score_exato(self, X, y, idx_treino, idx_val, candidato):
+        """Score de um candidato com o pipeline ajustado de fato no split."""
+        pipeline = clone(self.estimator).set_params(**candidato).fit(X[idx_treino], y[idx_treino])
+        return PREDICTION_METRICS[self.scoring](y[idx_val], pipeline.predict(X[idx_val]))
+
+    def _reavaliar(self, X, y, splits, candidatos, scores):
+        medias = np.where(np.isnan(scores).any(axis=0), -np.inf, scores.mean(axis=0))
+        melhores = np.argsort(-medias, kind='stable')[:max(1, self.n_exatos)]
+        exatos = Parallel(n_jobs=self.n_jobs)(
+            delayed(self._score_exato)(X, y, idx_treino, idx_val, candidatos[c])
+            for idx_treino, idx_val in splits for c in melhores)
+        scores[:, melhores] = np.asarray(exatos).reshape(len(splits), len(melhores))
+        reavaliados = np.zeros(len(candidatos), dtype=bool)
+        reavaliados[melhores] = True
+        return reavaliados
+
+
+# ==============================================================================
+# SEÇÃO: FÁBRICA DE BUSCAS
+# ==============================================================================
+
+BUSCAS_RAPIDAS = [KNNNeighborGraphSearch, SVMKernelReuseSearch, RandomForestPrefixSearch,
+                  DecisionTreePathSearch]  # Modos rápidos disponíveis, testados em ordem.
+
+
+def make_hpo_search(pipeline, param_distributions, cv, n_iter=30, scoring='f1_macro', n_jobs=-1,
+                    random_state=None, fast=True):
+    """
+    Cria o objeto de busca de hiperparâmetros para um pipeline.
+
+    Usa o modo rápido correspondente ao modelo final do pipeline quando existe
+    um e ele suporta o espaço de busca; caso contrário (ou com fast=False),
+    retorna o RandomizedSearchCV com a mesma configuração usada nos notebooks.
+
+    Args:
+        pipeline (Pipeline): Pipeline a otimizar.
+        param_distributions (dict): Distribuições dos hiperparâmetros.
+        cv: Gerador de splits internos.
+        n_iter (int): Número de candidatos sorteados.
+        scoring (str): Métrica a maximizar.
+        n_jobs (int): Número de processos.
+        random_state (int): Semente.
+        fast (bool): Se False, sempre usa o RandomizedSearchCV.
+    Returns:
+        Objeto com fit, best_estimator_, best_params_ e best_score_.
+    """
+    if fast and scoring in PREDICTION_METRICS:
+        for classe_busca in BUSCAS_RAPIDAS:
+            if classe_busca.suporta(pipeline, param_distributions):
+                return classe_busca(pipeline, param_distributions, cv=cv, n_iter=n_iter, scoring=scoring,
+                                    n_jobs=n_jobs, random_state=random_state, refit=True)
+    return RandomizedSearchCV(pipeline, param_distributions, scoring=scoring, cv=cv, n_iter=n_iter,
+                              n_jobs=n_jobs, random_state=random_state, refit=True)
@@ -0,0 +1,121 @@
+# ==============================================================================
+# MÓDULO: CACHE DE PREDIÇÕES
+# Descrição: Guarda as predições (predict) e probabilidades (predict_proba) de
+#            cada estimador ajustado em cada conjunto de dados, com chave
+#            (impressão digital do estimador ajustado, hash do dataset). As
+#            etapas de análise dos notebooks (avaliação dos folds, calibração,
+#            importância por permutação, ensembles) leem deste cache, de modo
+#            que cada modelo prediz em cada dataset uma única vez. Evita, em
+#            especial, repetir o predict_proba do SVM (Platt scaling).
+# ==============================================================================
+
+import weakref  # Memoriza a impressão digital de cada estimador sem mantê-lo vivo.
+
+import joblib  # Hash estável de estimadores ajustados e dos dados.
+import numpy as np  # Armazenamento compacto das predições.
+import pandas as pd  # Hash do conteúdo de DataFrames.
+
+
+class PredictionCache:
+    """
+    Cache em memória de predições por (estimador ajustado, dataset).
+
+    As classes preditas são guardadas no menor tipo inteiro que comporta os
+    rótulos e as probabilidades em float32 (metade da memória de float64;
+    diferença < 1e-7, irrelevante para ROC, calibração e Brier).
+
+    A impressão digital de um estimador é calculada na primeira consulta e
+    reaproveitada enquanto o objeto existir: os estimadores guardados em
+    all_results não são reajustados. Se um estimador for reajustado no lugar
+    (fit no mesmo objeto), chame clear().
+
+    Args:
+        proba_dtype (np.dtype): Tipo usado para guardar as probabilidades.
+    """
+
+    def __init__(self, proba_dtype=np.float32):
+        self.proba_dtype = proba_dtype
+        self._predicoes = {}
+        self._probabilidades = {}
+        self._impressoes = weakref.WeakKeyDictionary()  # estimador -> hash do estimador ajustado.
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _hash_dados(X):
+        """Hash do conteúdo do dataset (cópias com os mesmos valores têm o mesmo hash)."""
+        if isinstance(X, pd.DataFrame):
+            return joblib.hash((list(X.columns), list(X.dtypes.astype(str)), pd.util.hash_pandas_object(X, index=False).to_numpy()))
+        return joblib.hash(np.ascontiguousarray(X))
+
+    def _chave(self, estimator, X):
+        """Chave (impressão digital do estimador ajustado, hash do dataset)."""
+        try:
+            impressao = self._impressoes.get(estimator)
+            if impressao is None:
+                impressao = self._impressoes[estimator] = joblib.hash(estimator)
+        except TypeError:  # Objeto sem suporte a weakref: calcula a cada consulta.
+            impressao = joblib.hash(estimator)
+        return impressao, self._hash_dados(X)
+
+    @staticmethod
+    def _compactar_rotulos(y_pred):
+        """Converte rótulos inteiros para o menor tipo que os comporta."""
+        y_pred = np.asarray(y_pred)
+        if np.issubdtype(y_pred.dtype, np.integer) and y_pred.size:
+            return y_pred.astype(np.result_type(np.min_scalar_type(y_pred.min()), np.min_scalar_type(y_pred.max())))
+        return y_pred
+
+    def predict(self, estimator, X):
+        """
+        Classes preditas por `estimator` em X (calculadas uma única vez).
+
+        Args:
+            estimator: Pipeline ou modelo ajustado.
+            X (pd.DataFrame ou np.ndarray): Dataset.
+        Returns:
+            np.ndarray: Classes preditas (somente leitura).
+        """
+        chave = self._chave(estimator, X)
+        if chave in self._predicoes:
+            self.hits += 1
+        else:
+            self.misses += 1
+            predicoes = self._compactar_rotulos(estimator.predict(X))
+            predicoes.setflags(write=False)  # Evita que uma análise altere o valor compartilhado.
+            self._predicoes[chave] = predicoes
+        return self._predicoes[chave]
+
+    def predict_proba(self, estimator, X):
+        """
+        Probabilidades preditas por `estimator` em X (calculadas uma única vez).
+
+        Args:
+            estimator: Pipeline ou modelo ajustado com predict_proba.
+            X (pd.DataFrame ou np.ndarray): Dataset.
+        Returns:
+            np.ndarray: Probabilidades (n_amostras, n_classes), somente leitura.
+        """
+        chave = self._chave(estimator, X)
+        if chave in self._probabilidades:
+            self.hits += 1
+        else:
+            self.misses += 1
+            probabilidades = np.asarray(estimator.predict_proba(X), dtype=self.proba_dtype)
+            probabilidades.setflags(write=False)
+            self._probabilidades[chave] = probabilidades
+        return self._probabilidades[chave]
+
+    def clear(self):
+        """Esvazia o cache e zera os contadores."""
+        self._predicoes.clear()
+        self._probabilidades.clear()
+        self._impressoes.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self._predicoes) + len(self._probabilidades)
+
+    def __repr__(self):
+        return f"PredictionCache(entradas={len(self)}, hits={self.hits}, misses={self.misses})"
@@ -0,0 +1,138 @@
+# ==============================================================================
+# MÓDULO: CURVAS DE APRENDIZADO COM REUSO E CACHE
+# Descrição: Substitui a chamada direta ao `learning_curve` do sklearn nos
+#            notebooks de treino. Calcula os mesmos pontos (mesmos folds,
+#            mesmos subconjuntos de treino), mas:
+#            - reaproveita os ajustes dos folds externos já feitos pelo loop
+#              principal no ponto de 100% do treino;
+#            - distribui os ajustes restantes (fold x tamanho) entre os núcleos;
+#            - guarda os resultados em cache por (parâmetros do estimador,
+#              hash dos dados, folds, tamanhos).
+# ==============================================================================
+
+import os  # Caminhos do cache em disco.
+
+import joblib  # Hash estável de estimadores/arrays e paralelização.
+import numpy as np  # Manipulação dos índices e dos scores.
+from joblib import Parallel, delayed  # Ajustes (fold x tamanho) em paralelo.
+from sklearn.base import clone  # Cópia não ajustada do estimador.
+from sklearn.metrics import get_scorer  # Mesma métrica usada pelo learning_curve.
+
+_CACHE_MEMORIA = {}  # Cache em memória (usado quando nenhum diretório é informado).
+
+
+# ==============================================================================
+# SEÇÃO: FUNÇÕES AUXILIARES
+# ==============================================================================
+
+def _tamanhos_absolutos(train_sizes, n_max):
+    """
+    Converte frações de treino em números de amostras, como o learning_curve.
+
+    Args:
+        train_sizes (array-like): Frações (0, 1] ou números absolutos.
+        n_max (int): Tamanho do menor conjunto de treino entre os folds.
+    Returns:
+        np.ndarray: Tamanhos absolutos únicos e ordenados.
+    """
+    train_sizes = np.asarray(train_sizes)
+    if np.issubdtype(train_sizes.dtype, np.floating):
+        tamanhos = np.clip((train_sizes * n_max).astype(int), 1, n_max)
+    else:
+        tamanhos = train_sizes.astype(int)
+    return np.unique(tamanhos)
+
+
+def _mesmos_parametros(estimador_a, estimador_b):
+    """Indica se dois estimadores têm exatamente os mesmos hiperparâmetros."""
+    return joblib.hash(clone(estimador_a)) == joblib.hash(clone(estimador_b))
+
+
+def _pontuar(estimador, X, y, idx_treino, idx_teste, scorer, estimador_ajustado=None):
+    """
+    Ajusta (ou reaproveita) o estimador em idx_treino e retorna (score_treino, score_teste).
+
+    Args:
+        estimador: Estimador não ajustado (modelo dos parâmetros).
+        X (np.ndarray ou pd.DataFrame): Atributos.
+        y (np.ndarray): Rótulos.
+        idx_treino (np.ndarray): Índices do subconjunto de treino.
+        idx_teste (np.ndarray): Índices de teste do fold.
+        scorer (callable): Scorer do sklearn.
+        estimador_ajustado: Estimador já ajustado exatamente em idx_treino (opcional).
+    Returns:
+        tuple: (score no treino, score no teste).
+    """
+    X_treino = X.iloc[idx_treino] if hasattr(X, 'iloc') else X[idx_treino]
+    X_teste = X.iloc[idx_teste] if hasattr(X, 'iloc') else X[idx_teste]
+    modelo = estimador_ajustado if estimador_ajustado is not None else clone(estimador).fit(X_treino, y[idx_treino])
+    return scorer(modelo, X_treino, y[idx_treino]), scorer(modelo, X_teste, y[idx_teste])
+
+
+# ==============================================================================
+# SEÇÃO: CURVA DE APRENDIZADO
+# ==============================================================================
+
+def learning_curve_cached(estimator, X, y, cv, train_sizes=np.linspace(0.1, 1.0, 5), scoring='f1_macro',
+                          n_jobs=-1, fitted_folds=None, cache_dir=None):
+    """
+    Curva de aprendizado equivalente ao sklearn.model_selection.learning_curve
+    (shuffle=False), com reuso dos ajustes dos folds e cache dos resultados.
+
+    Args:
+        estimator: Estimador (pipeline) cujos hiperparâmetros definem a curva.
+                   Pode estar ajustado; apenas os parâmetros são usados.
+        X (pd.DataFrame ou np.ndarray): Atributos.
+        y (np.ndarray): Rótulos codificados.
+        cv: Gerador de splits. Deve ser o mesmo usado para produzir `fitted_folds`.
+        train_sizes (array-like): Frações ou números absolutos de amostras de treino.
+        scoring (str): Métrica (nome aceito por sklearn.metrics.get_scorer).
+        n_jobs (int): Número de processos para os ajustes.
+        fitted_folds (list, opcional): Estimadores já ajustados em cada fold do `cv`
+            (na mesma ordem), ex: all_results[...]['best_estimators']. São
+            reaproveitados no ponto de 100% quando têm os mesmos parâmetros de
+            `estimator`.
+        cache_dir (str, opcional): Diretório do cache em disco. Se None, o cache
+            fica em memória durante a sessão.
+    Returns:
+        tuple: (train_sizes_abs, train_scores, test_scores), com scores no
+               formato (n_tamanhos, n_folds), como o learning_curve.
+    """
+    y = np.asarray(y)
+    splits = list(cv.split(X, y))
+    tamanhos = _tamanhos_absolutos(train_sizes, min(len(idx_treino) for idx_treino, _ in splits))
+
+    # --- Cache por (parâmetros, dados, folds, tamanhos, métrica) ---
+    dados = X.to_numpy() if hasattr(X, 'to_numpy') else np.asarray(X)
+    chave = joblib.hash((clone(estimator), dados, y, [idx_teste for _, idx_teste in splits], tamanhos, scoring))
+    caminho_cache = os.path.join(cache_dir, f"curva_{chave}.npz") if cache_dir else None
+    if caminho_cache and os.path.exists(caminho_cache):
+        with np.load(caminho_cache) as arquivo:
+            return arquivo['train_sizes'], arquivo['train_scores'], arquivo['test_scores']
+    if caminho_cache is None and chave in _CACHE_MEMORIA:
+        return _CACHE_MEMORIA[chave]
+
+    # --- Tarefas (fold x tamanho), reaproveitando os ajustes de 100% já existentes ---
+    scorer = get_scorer(scoring)
+    tarefas = []
+    for i_fold, (idx_treino, idx_teste) in enumerate(splits):
+        for tamanho in tamanhos:
+            ajustado = None
+            if (fitted_folds is not None and i_fold < len(fitted_folds) and tamanho == len(idx_treino)
+                    and _mesmos_parametros(fitted_folds[i_fold], estimator)):
+                ajustado = fitted_folds[i_fold]
+            tarefas.append((idx_treino[:tamanho], idx_teste, ajustado))
+
+    resultados = Parallel(n_jobs=n_jobs)(
+        delayed(_pontuar)(estimator, X, y, idx_treino, idx_teste, scorer, ajustado)
+        for idx_treino, idx_teste, ajustado in tarefas)
+
+    resultados = np.array(resultados).reshape(len(splits), len(tamanhos), 2)
+    train_scores, test_scores = resultados[:, :, 0].T, resultados[:, :, 1].T
+
+    if caminho_cache:
+        os.makedirs(cache_dir, exist_ok=True)
+        np.savez(caminho_cache, train_sizes=tamanhos, train_scores=train_scores, test_scores=test_scores)
+    else:
+        _CACHE_MEMORIA[chave] = (tamanhos, train_scores, test_scores)
+    return tamanhos, train_scores, test_scores
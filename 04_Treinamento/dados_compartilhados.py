@@ -0,0 +1,133 @@
+# ==============================================================================
+# MÓDULO: MATRIZES DE TREINO COMPARTILHADAS ENTRE OS PROCESSOS DO JOBLIB
+# Descrição: Com n_jobs=-1, cada despacho do cross_val_score/RandomizedSearchCV
+#            serializa o X_train_fold_data (uma cópia .iloc do DataFrame) e os
+#            rótulos para os processos do joblib, e cada fold externo cria uma
+#            nova cópia. Aqui X e y são gravados UMA vez em arquivos .npy (em
+#            /dev/shm, memória compartilhada, quando existir) e reabertos como
+#            memmap somente leitura. O joblib envia um memmap aos processos
+#            apenas como referência ao arquivo (sem copiar os dados), e os folds
+#            passam a ser apenas arrays de índices sobre a matriz completa.
+#
+# Uso:
+#   with SharedDataset(X_train_full, y_train_full_encoded) as dados:
+#       cross_val_score(pipe, dados.X, dados.y, cv=cv, n_jobs=-1)
+#       dados.fit_search(rs, train_fold_indices, X_refit=X_train_full.iloc[train_fold_indices])
+# ==============================================================================
+
+import os  # Caminhos e escolha do diretório (/dev/shm).
+import shutil  # Remoção dos arquivos ao fechar.
+import tempfile  # Diretório exclusivo dos arquivos .npy.
+import time  # Tempo do refit (refit_time_, como no sklearn).
+
+import numpy as np  # Arquivos .npy e memmaps.
+from sklearn.base import clone  # Refit do melhor candidato.
+
+_DIRETORIO_MEMORIA_COMPARTILHADA = '/dev/shm'  # tmpfs do Linux: arquivos mapeados ficam só na RAM.
+
+
+class FoldIndexSplitter:
+    """
+    Splitter que aplica um cv apenas às linhas de um fold e devolve os splits
+    como posições na matriz completa.
+
+    Como StratifiedKFold/RepeatedStratifiedKFold dependem só de y e do número de
+    linhas, os splits são os mesmos de cv.split(X[train_indices], y[train_indices]).
+
+    Args:
+        train_indices (np.ndarray): Posições das linhas do fold na matriz completa.
+        cv: Gerador de splits internos (ex: RepeatedStratifiedKFold).
+    """
+
+    def __init__(self, train_indices, cv):
+        self.train_indices = np.asarray(train_indices)
+        self.cv = cv
+
+    def split(self, X=None, y=None, groups=None):
+        """Splits internos do fold, em posições da matriz completa."""
+        y_fold = None if y is None else np.asarray(y)[self.train_indices]
+        grupos_fold = None if groups is None else np.asarray(groups)[self.train_indices]
+        for idx_treino, idx_val in self.cv.split(np.zeros(len(self.train_indices)), y_fold, grupos_fold):
+            yield self.train_indices[idx_treino], self.train_indices[idx_val]
+
+    def get_n_splits(self, X=None, y=None, groups=None):
+        """Número de splits internos."""
+        return self.cv.get_n_splits(X, y, groups)
+
+
+class SharedDataset:
+    """
+    X e y gravados uma vez em disco (ou /dev/shm) e abertos como memmap somente leitura.
+
+    Args:
+        X (pd.DataFrame ou np.ndarray): Atributos (convertidos para float64).
+        y (np.ndarray, opcional): Rótulos.
+        directory (str, opcional): Onde criar os arquivos (None = /dev/shm se
+            existir, senão o diretório temporário do sistema).
+    """
+
+    def __init__(self, X, y=None, directory=None):
+        if directory is None:
+            directory = _DIRETORIO_MEMORIA_COMPARTILHADA if os.access(_DIRETORIO_MEMORIA_COMPARTILHADA, os.W_OK) else None
+        self.path = tempfile.mkdtemp(prefix='dados_compartilhados_', dir=directory)
+        self.columns = list(X.columns) if hasattr(X, 'columns') else None
+        self.X = self._gravar('X', X.to_numpy(dtype=np.float64) if hasattr(X, 'to_numpy') else np.asarray(X, dtype=np.float64))
+        self.y = None if y is None else self._gravar('y', np.asarray(y))
+
+    def _gravar(self, nome, array):
+        """Grava o array em <path>/<nome>.npy e o reabre como memmap somente leitura."""
+        caminho = os.path.join(self.path, f'{nome}.npy')
+        np.save(caminho, np.ascontiguousarray(array))
+        return np.load(caminho, mmap_mode='r')
+
+    # --------------------------------------------------------------------------
+    # Busca de hiperparâmetros sobre um fold
+    # --------------------------------------------------------------------------
+
+    def fit_search(self, search, train_indices, X_refit=None):
+        """
+        Ajusta uma busca (RandomizedSearchCV ou modo rápido de make_hpo_search)
+        nas linhas de um fold, passando aos processos apenas a matriz compartilhada
+        e os índices dos splits internos. O refit do melhor candidato é feito
+        neste processo, apenas nas linhas do fold.
+
+        Args:
+            search: Busca com atributos cv e refit (o cv é aplicado às linhas do fold).
+            train_indices (np.ndarray): Posições das linhas do fold.
+            X_refit (pd.DataFrame, opcional): Linhas do fold para o refit (ex: o
+                DataFrame do fold, preservando os nomes das colunas); None = self.X[train_indices].
+        Returns:
+            A própria busca ajustada (best_params_, best_score_, cv_results_, best_estimator_).
+        """
+        if self.y is None:
+            raise ValueError("SharedDataset sem y: informe os rótulos para ajustar uma busca.")
+        train_indices = np.asarray(train_indices)
+        cv_original, refit_original = search.cv, search.refit
+        search.cv, search.refit = FoldIndexSplitter(train_indices, cv_original), False
+        try:
+            search.fit(self.X, self.y)
+        finally:
+            search.cv, search.refit = cv_original, refit_original
+        if refit_original:
+            X_fold = self.X[train_indices] if X_refit is None else X_refit
+            inicio_refit = time.time()
+            search.best_estimator_ = clone(search.estimator).set_params(**search.best_params_).fit(
+                X_fold, self.y[train_indices])
+            search.refit_time_ = time.time() - inicio_refit
+        return search
+
+    # --------------------------------------------------------------------------
+    # Ciclo de vida dos arquivos
+    # --------------------------------------------------------------------------
+
+    def close(self):
+        """Libera os memmaps e remove os arquivos."""
+        self.X = self.y = None
+        shutil.rmtree(self.path, ignore_errors=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
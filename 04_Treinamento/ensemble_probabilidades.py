@@ -0,0 +1,144 @@
+# ==============================================================================
+# MÓDULO: ENSEMBLES A PARTIR DOS ESTIMADORES JÁ OTIMIZADOS
+# Descrição: Combina as probabilidades dos best_estimators guardados em
+#            all_results (um por fold externo) em vez de treinar novos modelos
+#            dentro de um VotingClassifier. As probabilidades vêm do
+#            PredictionCache (já calculadas na avaliação dos folds), então:
+#            - voto suave: nenhum ajuste, apenas a média das probabilidades;
+#            - empilhamento (stacking): apenas o combinador (por padrão uma
+#              regressão logística) é ajustado, sobre probabilidades fora do fold.
+# ==============================================================================
+
+import numpy as np  # Empilhamento e média das probabilidades.
+from sklearn.base import clone  # Um combinador novo por fold.
+from sklearn.linear_model import LogisticRegression  # Combinador padrão do stacking.
+
+from metricas import evaluation_metrics  # Mesmas métricas de fold_metrics.
+
+
+# ==============================================================================
+# SEÇÃO: FUNÇÕES AUXILIARES
+# ==============================================================================
+
+def _modelos_com_probabilidade(models_results, models=None):
+    """Modelos (na ordem de models_results) cujos best_estimators têm predict_proba."""
+    nomes = list(models_results) if models is None else list(models)
+    return [nome for nome in nomes
+            if models_results[nome]['best_estimators'] and hasattr(models_results[nome]['best_estimators'][0], 'predict_proba')]
+
+
+def _probabilidades(estimador, X, prediction_cache):
+    """predict_proba de um estimador ajustado, lido do cache quando houver."""
+    if prediction_cache is not None:
+        return prediction_cache.predict_proba(estimador, X)
+    return estimador.predict_proba(X)
+
+
+def stored_probabilities(models_results, data_sets, prediction_cache=None, models=None):
+    """
+    Probabilidades de cada best_estimator no conjunto de dados do seu fold.
+
+    Args:
+        models_results (dict): all_results[config], com 'best_estimators' por modelo.
+        data_sets (tuple ou list): (X, y) usado para todos os folds, ou lista com
+            um (X, y) por fold, na ordem de 'best_estimators'.
+        prediction_cache (PredictionCache, opcional): Cache das probabilidades.
+        models (list, opcional): Modelos a combinar (None = todos com predict_proba).
+    Returns:
+        dict: {modelo: [probabilidades (n_amostras, n_classes) de cada fold]}.
+    """
+    probabilidades = {}
+    for nome in _modelos_com_probabilidade(models_results, models):
+        probabilidades[nome] = []
+        for fold_idx, estimador in enumerate(models_results[nome]['best_estimators']):
+            X_fold, _ = data_sets if isinstance(data_sets, tuple) else data_sets[fold_idx]
+            probabilidades[nome].append(np.asarray(_probabilidades(estimador, X_fold, prediction_cache), dtype=float))
+    return probabilidades
+
+
+def _atributos_meta(probabilidades, fold_idx):
+    """Matriz do combinador: probabilidades dos modelos lado a lado (n_amostras, n_modelos * n_classes)."""
+    return np.hstack([probas[fold_idx] for probas in probabilidades.values()])
+
+
+# ==============================================================================
+# SEÇÃO: ENSEMBLES
+# ==============================================================================
+
+def ensemble_fold_metrics(models_results, test_sets, method='soft', oof_sets=None, final_estimator=None,
+                          weights=None, prediction_cache=None, models=None, labels=None, report_labels=None,
+                          target_names=None):
+    """
+    Avalia, fold a fold, um ensemble dos best_estimators já otimizados.
+
+    method='soft': média (ponderada por `weights`) das probabilidades dos modelos.
+    method='stacking': `final_estimator` ajustado sobre as probabilidades fora do fold:
+        - com oof_sets: no fold k, ajusta nas probabilidades dos estimadores do fold k
+          em oof_sets[k] (dados que esses estimadores não viram no treino);
+        - sem oof_sets: os test_sets dos folds formam uma predição fora do fold de
+          todo o dataset; no fold k o combinador é ajustado nos demais folds.
+
+    Args:
+        models_results (dict): all_results[config], com 'best_estimators' por modelo.
+        test_sets (tuple ou list): (X, y) de teste comum a todos os folds, ou um (X, y) por fold.
+        method (str): 'soft' ou 'stacking'.
+        oof_sets (list, opcional): Um (X, y) fora do treino por fold, para o stacking.
+        final_estimator (estimator, opcional): Combinador do stacking
+            (None = LogisticRegression(max_iter=1000)).
+        weights (list, opcional): Pesos dos modelos no voto suave.
+        prediction_cache (PredictionCache, opcional): Cache das probabilidades.
+        models (list, opcional): Modelos a combinar (None = todos com predict_proba).
+        labels, report_labels, target_names: Repassados a evaluation_metrics.
+    Returns:
+        list: Um dict por fold com as mesmas chaves de fold_metrics
+              (fold_index, f1_macro, precision_macro, recall_macro, report_dict,
+              confusion_matrix, y_true, y_pred). Lista vazia se não houver modelos.
+    """
+    if method not in ('soft', 'stacking'):
+        raise ValueError(f"Método '{method}' não suportado. Use 'soft' ou 'stacking'.")
+    nomes = _modelos_com_probabilidade(models_results, models)
+    if not nomes:
+        return []
+    probabilidades_teste = stored_probabilities(models_results, test_sets, prediction_cache, nomes)
+    classes = models_results[nomes[0]]['best_estimators'][0].classes_
+    n_folds = min(len(probas) for probas in probabilidades_teste.values())
+
+    def rotulos_teste(fold_idx):
+        return np.asarray((test_sets if isinstance(test_sets, tuple) else test_sets[fold_idx])[1])
+
+    if method == 'stacking':
+        combinador_base = LogisticRegression(max_iter=1000) if final_estimator is None else final_estimator
+        if oof_sets is not None:
+            probabilidades_oof = stored_probabilities(models_results, oof_sets, prediction_cache, nomes)
+        elif isinstance(test_sets, tuple):
+            raise ValueError("Stacking sem oof_sets exige um conjunto de teste por fold (folds disjuntos).")
+
+    resultados = []
+    for fold_idx in range(n_folds):
+        y_teste = rotulos_teste(fold_idx)
+        if method == 'soft':
+            media = np.average(np.stack([probabilidades_teste[nome][fold_idx] for nome in nomes]), axis=0, weights=weights)
+            y_pred = classes[np.argmax(media, axis=1)]
+        else:
+            if oof_sets is not None:
+                X_meta = _atributos_meta(probabilidades_oof, fold_idx)
+                y_meta = np.asarray(oof_sets[fold_idx][1])
+            else:
+                outros = [k for k in range(n_folds) if k != fold_idx]
+                X_meta = np.vstack([_atributos_meta(probabilidades_teste, k) for k in outros])
+                y_meta = np.concatenate([rotulos_teste(k) for k in outros])
+            combinador = clone(combinador_base).fit(X_meta, y_meta)
+            y_pred = combinador.predict(_atributos_meta(probabilidades_teste, fold_idx))
+
+        metricas = evaluation_metrics(y_teste, y_pred, labels=labels, report_labels=report_labels, target_names=target_names)
+        resultados.append({
+            'fold_index': fold_idx,
+            'f1_macro': metricas['f1_macro'],
+            'precision_macro': metricas['precision_macro'],
+            'recall_macro': metricas['recall_macro'],
+            'report_dict': metricas['report_dict'],
+            'confusion_matrix': metricas['confusion_matrix'],
+            'y_true': y_teste,
+            'y_pred': y_pred,
+        })
+    return resultados
@@ -0,0 +1,579 @@
+# ==============================================================================
+# MÓDULO: EXPERIMENTOS DO PROJETO (BASELINE E PROPOSTA) EM UM ÚNICO PROCESSO
+# Descrição: Os dois notebooks repetiam o mesmo código (modelos, espaços de
+#            busca, spot-checking, HPO por fold e avaliação) e, para comparar
+#            baseline (TreinoReal_ValReal) e proposta (TreinoSinteticoReal_ValReal),
+#            era preciso rodar os dois, carregando o dataset real duas vezes.
+#            Aqui cada experimento é apenas uma entrada de EXPERIMENTS (arquivo
+#            de treino e, opcionalmente, arquivo de teste fixo) e run_experiments
+#            executa todos no mesmo processo, compartilhando:
+#            - a leitura dos CSVs (cada arquivo é lido uma vez);
+#            - os índices dos folds externos (calculados uma vez por arquivo de
+#              treino e reaproveitados por todos os escalonadores e análises);
+#            - a matriz de treino compartilhada com o joblib (SharedDataset);
+#            - o cache de predições (PredictionCache) e, opcionalmente, o cache
+#              em disco dos pré-processamentos ajustados (Pipeline(memory=...)).
+#            Os notebooks passam a ser apenas a camada de relatório (ver
+#            analises_experimento.py).
+#
+# Uso:
+#   from experimento import EXPERIMENTS, run_experiments
+#   resultados = run_experiments(EXPERIMENTS)
+#   resultados['TreinoSinteticoReal_ValReal']['all_results']['STD']['SVM']['fold_metrics']
+#
+#   python experimento.py --results resultados_experimentos.joblib
+# ==============================================================================
+
+import argparse  # Parâmetros de linha de comando.
+import hashlib  # Conteúdo dos datasets na assinatura dos resultados gravados.
+import os  # Caminhos padrão dos datasets.
+import shutil  # Remoção do cache temporário de pré-processamentos.
+import tempfile  # Diretório do cache de pré-processamentos.
+import time  # Tempo de HPO/ajuste por modelo.
+
+import joblib  # Persistência dos resultados e assinatura das configurações.
+import numpy as np  # Índices dos folds.
+import pandas as pd  # Tabela comparativa entre experimentos.
+import xgboost as xgb
+from scipy.stats import randint, uniform  # Distribuições do HPO.
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.impute import SimpleImputer
+from sklearn.model_selection import RepeatedStratifiedKFold, StratifiedKFold, cross_val_score
+from sklearn.neighbors import KNeighborsClassifier
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import LabelEncoder, StandardScaler
+from sklearn.svm import SVC
+from sklearn.tree import DecisionTreeClassifier
+
+from armazem_quantizado import is_feature_store, read_feature_store  # Datasets gravados em ponto fixo (.quant).
+from busca_hiperparametros import make_hpo_search  # Modos rápidos de HPO com fallback para RandomizedSearchCV.
+from cache_predicoes import PredictionCache  # Predições de cada modelo em cada dataset calculadas uma vez.
+from dados_compartilhados import SharedDataset  # Matriz de treino compartilhada (memmap) com os processos do joblib.
+from leitura_csv import read_dataset_csv  # Leitura multithread do CSV (separador ';' e decimal ',').
+from metricas import evaluation_metrics  # Métricas de avaliação a partir de uma única matriz de confusão.
+from rastreamento import TRACER  # Tempo/memória por etapa (desativado por padrão).
+
+# --- Configurações padrão ---
+DIRETORIO_BASE = os.path.dirname(os.path.abspath(__file__))
+DIRETORIO_DATASETS = os.path.join(DIRETORIO_BASE, '..', '00_Datasets')
+REAL_DATASET_FILE = os.path.join(DIRETORIO_DATASETS, 'Arquivos_Pos_PreProcessamento',
+                                 'Dataset_OriginalComClass_PREPROCESSADO_COMPLETO.csv')
+AUGMENTED_DATASET_FILE = os.path.join(DIRETORIO_DATASETS, 'Arquivos_Pos_PreProcessamento',
+                                      'Dataset_OriginalSinteticosComClass_PREPROCESSADO_COMPLETO.csv')
+RAW_DATASET_FILE = os.path.join(DIRETORIO_DATASETS, 'Dataset_OriginalComClass.csv')
+TARGET = 'Adequação MILHO'
+RANDOM_SEED = 42
+
+# --- Escalonadores, modelos e espaços de busca (comuns a todos os experimentos) ---
+SCALERS = {
+    "NoExplicitScaler": None,
+    "STD": StandardScaler,
+}
+BASE_MODELS = {
+    "k-NN":         KNeighborsClassifier(),
+    "DecisionTree": DecisionTreeClassifier(class_weight="balanced", random_state=RANDOM_SEED),
+    "RandomForest": RandomForestClassifier(class_weight="balanced", random_state=RANDOM_SEED),
+    "SVM":          SVC(kernel="rbf", class_weight="balanced", probability=True, random_state=RANDOM_SEED),
+    "XGBoost":      xgb.XGBClassifier(eval_metric="mlogloss", random_state=RANDOM_SEED),
+}
+PARAM_DISTS = {
+    "k-NN":         {"model__n_neighbors": randint(3, 50), "model__p": [1, 2], "model__weights": ["uniform", "distance"]},
+    "DecisionTree": {"model__max_depth": randint(3, 50), "model__min_samples_split": randint(2, 10),
+                     "model__min_samples_leaf": randint(1, 5), "model__criterion": ["gini", "entropy"]},
+    "RandomForest": {"model__n_estimators": randint(50, 300), "model__max_depth": randint(5, 50),
+                     "model__min_samples_split": randint(2, 10), "model__min_samples_leaf": randint(1, 5),
+                     "model__criterion": ["gini", "entropy"]},
+    "SVM":          {"model__C": uniform(0.1, 10), "model__gamma": ["scale", "auto"] + list(np.logspace(-3, 2, 6))},
+    "XGBoost":      {"model__n_estimators": randint(50, 300), "model__max_depth": randint(3, 10),
+                     "model__learning_rate": uniform(0.01, 0.2), "model__subsample": uniform(0.6, 0.4),
+                     "model__colsample_bytree": uniform(0.6, 0.4)},
+}
+
+# --- Experimentos (declarativos) ---
+# train_file: dataset dividido nos folds externos (spot-checking e HPO nas partes de treino).
+# test_file: None = cada fold é avaliado na sua parte de teste (validação cruzada externa);
+#            caminho = todos os folds são avaliados nesse dataset completo (teste fixo).
+# raw_file: CSV bruto (antes do pré-processamento) para a sobreamostragem por ruído no fold (opcional).
+# eval_label: rótulo do conjunto de avaliação usado nos relatórios.
+def build_experiments(real_file=REAL_DATASET_FILE, augmented_file=AUGMENTED_DATASET_FILE, raw_file=RAW_DATASET_FILE):
+    """Baseline (treino e validação no real) e proposta (treino no sintético+real, validação no real)."""
+    return [
+        {'name': 'TreinoReal_ValReal', 'train_file': real_file, 'test_file': None,
+         'raw_file': raw_file, 'eval_label': 'folds de teste'},
+        {'name': 'TreinoSinteticoReal_ValReal', 'train_file': augmented_file, 'test_file': real_file,
+         'raw_file': None, 'eval_label': 'Val. REAL'},
+    ]
+
+
+EXPERIMENTS = build_experiments()
+
+
+# ==============================================================================
+# SEÇÃO: DADOS E FOLDS
+# ==============================================================================
+
+def build_pipeline(model, scaler_cls=None, memory=None):
+    """
+    Pipeline ('imputer', ['scaler'], 'model') usado no spot-checking e no HPO.
+
+    Args:
+        model: Estimador final (clonado pelo cross_val_score/busca).
+        scaler_cls (type, opcional): Classe do escalonador (None = sem escalonador explícito).
+        memory (str ou joblib.Memory, opcional): Cache dos pré-processamentos ajustados.
+    Returns:
+        Pipeline: Pipeline não ajustado.
+    """
+    passos = [('imputer', SimpleImputer(strategy="median"))]
+    if scaler_cls is not None:
+        passos.append(('scaler', scaler_cls()))
+    passos.append(('model', model))
+    return Pipeline(passos, memory=memory)
+
+
+def _carregar(path, target, datasets, verbose):
+    """(X, rótulos) do CSV ou do armazém quantizado, lidos uma única vez por caminho (cache em `datasets`)."""
+    if path not in datasets:
+        with TRACER.stage('carga_dados', arquivo=os.path.basename(path)):
+            df = read_feature_store(path) if is_feature_store(path) else read_dataset_csv(path)
+        if verbose:
+            print(f"Dataset '{path}' carregado com sucesso. Shape: {df.shape}")
+        datasets[path] = (df.drop(columns=[target]), df[target])
+    return datasets[path]
+
+
+def load_experiment_data(experiment, target=TARGET, datasets=None, verbose=True):
+    """
+    Dados de um experimento: treino codificado e, se houver, teste fixo codificado
+    com o mesmo LabelEncoder (ajustado apenas no treino).
+
+    Args:
+        experiment (dict): Entrada de EXPERIMENTS.
+        target (str): Coluna alvo.
+        datasets (dict, opcional): Cache caminho -> (X, rótulos) compartilhado entre experimentos.
+        verbose (bool): Imprime o shape dos arquivos lidos.
+    Returns:
+        dict: X_train, y_train, X_test e y_test (None sem teste fixo), label_encoder,
+              class_names e labels (classes codificadas, na ordem do treino).
+    Raises:
+        ValueError: Se o teste tiver classes ausentes no treino.
+    """
+    datasets = {} if datasets is None else datasets
+    X_train, rotulos_treino = _carregar(experiment['train_file'], target, datasets, verbose)
+    le = LabelEncoder()
+    y_train = le.fit_transform(rotulos_treino)
+    X_test = y_test = None
+    if experiment.get('test_file'):
+        X_test, rotulos_teste = _carregar(experiment['test_file'], target, datasets, verbose)
+        desconhecidas = set(rotulos_teste.unique()) - set(le.classes_)
+        if desconhecidas:
+            raise ValueError(f"Classes do teste '{experiment['test_file']}' ausentes no treino: {sorted(desconhecidas)}. "
+                             f"Classes do treino: {list(le.classes_)}.")
+        y_test = le.transform(rotulos_teste)
+    return {'X_train': X_train, 'y_train': y_train, 'X_test': X_test, 'y_test': y_test, 'label_encoder': le,
+            'class_names': le.classes_.astype(str), 'labels': le.transform(le.classes_)}
+
+
+def outer_folds(y, n_splits=5, random_state=RANDOM_SEED):
+    """
+    Folds externos estratificados (dependem apenas de y e do número de linhas).
+
+    Returns:
+        tuple: (StratifiedKFold, lista de (índices de treino, índices de teste)).
+    """
+    cv = StratifiedKFold(n_splits=n_splits, shuffle=True, random_state=random_state)
+    return cv, list(cv.split(np.zeros(len(y)), y))
+
+
+# ==============================================================================
+# SEÇÃO: EXECUÇÃO DE UM EXPERIMENTO
+# ==============================================================================
+
+def _nova_estrutura_resultados(scalers, base_models, class_names):
+    """all_results e best_roc_data_storage vazios, no formato usado pelas análises."""
+    all_results = {sc_name: {model_name: {'fold_metrics': [], 'confusion_matrices': [], 'execution_times_hpo': [],
+                                          'best_estimators': []}
+                             for model_name in base_models}
+                   for sc_name in scalers}
+    best_roc = {sc_name: {model_name: {'best_f1': -1, 'y_test_actual': None, 'y_pred_probabilities': None,
+                                       'best_fold_index': -1, 'n_classes_for_roc': len(class_names),
+                                       'class_names_for_roc': class_names}
+                          for model_name in base_models}
+                for sc_name in scalers}
+    return all_results, best_roc
+
+
+def evaluation_sets(data, splits):
+    """
+    Conjuntos de avaliação de cada fold, no formato aceito por
+    ensemble_fold_metrics/permutation_importance_table.
+
+    Returns:
+        tuple: (test_sets, oof_sets). Com teste fixo, test_sets = (X_test, y_test) e
+               oof_sets = partes de teste dos folds do treino; sem teste fixo,
+               test_sets = um (X, y) por fold e oof_sets = None.
+    """
+    X_train, y_train = data['X_train'], data['y_train']
+    partes_teste = [(X_train.iloc[idx_teste], y_train[idx_teste]) for _, idx_teste in splits]
+    if data['X_test'] is not None:
+        return (data['X_test'], data['y_test']), partes_teste
+    return partes_teste, None
+
+
+def spot_check(X, y, scaler_cls, base_models=BASE_MODELS, n_splits=5, top_n=5, random_state=RANDOM_SEED, memory=None,
+               n_jobs=-1, trace_labels=None, verbose=True, scaler_name=''):
+    """
+    F1 Macro médio (CV estratificada em X, y) de cada modelo e os top_n que seguem para o HPO.
+
+    Returns:
+        tuple: (dict modelo -> F1 médio, lista dos modelos selecionados em ordem decrescente).
+    """
+    cv_spot_check = StratifiedKFold(n_splits=n_splits, shuffle=True, random_state=random_state)
+    medias = {}
+    for model_name, mdl in base_models.items():
+        with TRACER.stage('spot_check', model=model_name, **(trace_labels or {})):
+            scores = cross_val_score(build_pipeline(mdl, scaler_cls, memory), X, y, cv=cv_spot_check,
+                                     scoring='f1_macro', n_jobs=n_jobs)
+        medias[model_name] = scores.mean()
+        if verbose:
+            print(f"Spot-checking {model_name} (config: {scaler_name}, CV em dados de treino): F1_macro médio = {scores.mean():.3f}")
+    selecionados = [n for n, _ in sorted(medias.items(), key=lambda x: x[1], reverse=True)[:top_n]]
+    if verbose:
+        print(f"\n→ Modelos selecionados para HPO (configuração {scaler_name}): {selecionados}")
+    return medias, selecionados
+
+
+def record_fold(model_results, roc_storage, estimator, duration, fold_idx, X_eval, y_eval, labels, class_names,
+                prediction_cache, verbose=False, model_name='', eval_label='teste'):
+    """
+    Avalia o estimador do fold e acrescenta o resultado às estruturas de um
+    modelo (all_results[config][modelo] e best_roc_data_storage[config][modelo]).
+
+    Args:
+        model_results (dict): all_results[config][modelo].
+        roc_storage (dict): best_roc_data_storage[config][modelo].
+        estimator (Pipeline): Melhor estimador do fold, já ajustado.
+        duration (float): Tempo de HPO/ajuste (segundos).
+        fold_idx (int): Índice do fold externo.
+        X_eval, y_eval: Conjunto de avaliação do fold.
+        labels, class_names: Classes codificadas e seus nomes.
+        prediction_cache (PredictionCache): Cache de predições.
+    """
+    model_results['best_estimators'].append(estimator)
+    model_results['execution_times_hpo'].append(duration)
+    y_pred = prediction_cache.predict(estimator, X_eval)
+    metricas = evaluation_metrics(y_eval, y_pred, labels=labels, report_labels=labels, target_names=class_names)
+    if verbose:
+        print(f"  {model_name}: HPO/ajuste em {duration:.2f}s, F1 Macro ({eval_label}) = {metricas['f1_macro']:.4f}")
+    model_results['fold_metrics'].append({
+        'fold_index': fold_idx,
+        'f1_macro': metricas['f1_macro'],
+        'precision_macro': metricas['precision_macro'],
+        'recall_macro': metricas['recall_macro'],
+        'report_dict': metricas['report_dict'],
+        'confusion_matrix': metricas['confusion_matrix'],
+        'y_true': y_eval,  # Guardados para os intervalos de confiança bootstrap
+        'y_pred': y_pred,
+    })
+    model_results['confusion_matrices'].append(metricas['confusion_matrix'])
+    if hasattr(estimator.named_steps['model'], "predict_proba") and metricas['f1_macro'] > roc_storage['best_f1']:
+        roc_storage.update(best_f1=metricas['f1_macro'], y_test_actual=y_eval, best_fold_index=fold_idx,
+                           y_pred_probabilities=prediction_cache.predict_proba(estimator, X_eval))
+
+
+def experiment_result(experiment, data, outer_cv, splits, eval_sets, spot_scores, selected, all_results, best_roc,
+                      prediction_cache, base_models, n_splits_inner, random_state):
+    """
+    Resultado de um experimento no formato de run_experiment (lido pelas análises).
+    eval_sets é a saída de evaluation_sets usada na avaliação (os mesmos objetos,
+    para que as análises reaproveitem as predições do PredictionCache).
+    """
+    test_sets, oof_sets = eval_sets
+    return dict(data, name=experiment['name'], experiment=experiment, outer_cv=outer_cv, outer_splits=splits,
+                test_sets=test_sets, oof_sets=oof_sets, spot_scores=spot_scores, selected_for_hpo=selected,
+                all_results=all_results, best_roc_data_storage=best_roc, prediction_cache=prediction_cache,
+                base_models=base_models,
+                settings={'n_splits_outer': len(splits), 'n_splits_inner': n_splits_inner, 'random_state': random_state})
+
+
+def _cabecalho_scaler(sc_name, scaler_cls):
+    """Cabeçalho impresso antes de cada configuração, como nos notebooks."""
+    cabecalho = (f"===== ESCALONAMENTO: {sc_name} =====" if scaler_cls is not None
+                 else f"===== CONFIGURAÇÃO SEM ESCALONADOR EXPLÍCITO: {sc_name} =====")
+    print(f"\n\n{cabecalho}\n")
+
+
+def run_experiment(experiment, data, outer_cv, splits, scalers=SCALERS, base_models=BASE_MODELS,
+                   param_dists=PARAM_DISTS, n_splits_inner=5, n_repeats_hpo=5, n_iter=30, top_n=5, fast_hpo=True,
+                   shared=None, prediction_cache=None, memory=None, random_state=RANDOM_SEED, n_jobs=-1, verbose=True):
+    """
+    Spot-checking, HPO por fold externo e avaliação de um experimento, para cada escalonador.
+
+    Args:
+        experiment (dict): Entrada de EXPERIMENTS.
+        data (dict): Saída de load_experiment_data.
+        outer_cv, splits: Saída de outer_folds sobre data['y_train'].
+        scalers, base_models, param_dists (dict): Escalonadores, modelos e espaços de busca.
+        n_splits_inner (int): Folds do spot-checking e do CV interno do HPO.
+        n_repeats_hpo (int): Repetições do CV interno do HPO.
+        n_iter (int): Candidatos sorteados por busca.
+        top_n (int): Modelos do spot-checking que seguem para o HPO.
+        fast_hpo (bool): Usa os modos rápidos de busca_hiperparametros.py.
+        shared (SharedDataset, opcional): Matriz de treino compartilhada com o joblib.
+        prediction_cache (PredictionCache, opcional): Cache de predições (None = um novo).
+        memory (str ou joblib.Memory, opcional): Cache dos pré-processamentos ajustados.
+        random_state (int): Semente dos folds e das buscas.
+        n_jobs (int): Processos do joblib.
+        verbose (bool): Imprime o progresso como nos notebooks.
+    Returns:
+        dict: data + name, experiment, outer_cv, outer_splits, test_sets, oof_sets,
+              spot_scores, selected_for_hpo, all_results, best_roc_data_storage,
+              prediction_cache, base_models e settings.
+    """
+    prediction_cache = PredictionCache() if prediction_cache is None else prediction_cache
+    nome = experiment['name']
+    X_train, y_train, labels, class_names = data['X_train'], data['y_train'], data['labels'], data['class_names']
+    X_cv, y_cv = (shared.X, shared.y) if shared is not None else (X_train, y_train)
+    conjuntos_avaliacao = evaluation_sets(data, splits)
+    test_sets = conjuntos_avaliacao[0]
+
+    all_results, best_roc = _nova_estrutura_resultados(scalers, base_models, class_names)
+    spot_scores, selecionados = {}, {}
+    if verbose:
+        print(f"\n\n{'#' * 60}\n EXPERIMENTO: {nome} \n{'#' * 60}")
+
+    for sc_name, ScalerCls in scalers.items():
+        if verbose:
+            _cabecalho_scaler(sc_name, ScalerCls)
+        # --- Spot-checking: CV no dataset de treino completo ---
+        spot_scores[sc_name], selecionados[sc_name] = spot_check(
+            X_cv, y_cv, ScalerCls, base_models, n_splits=n_splits_inner, top_n=top_n, random_state=random_state,
+            memory=memory, n_jobs=n_jobs, trace_labels={'experiment': nome, 'scaler': sc_name}, verbose=verbose,
+            scaler_name=sc_name)
+
+        # --- HPO em cada fold externo e avaliação ---
+        for fold_idx, (idx_treino, _) in enumerate(splits):
+            if verbose:
+                print(f"\n--- Fold Externo {fold_idx + 1}/{len(splits)} (Config: {sc_name}) ---")
+            X_fold, y_fold = X_train.iloc[idx_treino], y_train[idx_treino]
+            X_eval, y_eval = test_sets if isinstance(test_sets, tuple) else test_sets[fold_idx]
+
+            for model_name in selecionados[sc_name]:
+                pipeline = build_pipeline(base_models[model_name], ScalerCls, memory)
+                parametros = param_dists.get(model_name)
+                inicio = time.time()
+                if not parametros:  # Modelos sem HPO
+                    with TRACER.stage('fit', experiment=nome, scaler=sc_name, fold=fold_idx, model=model_name):
+                        estimador = pipeline.fit(X_fold, y_fold)
+                else:
+                    cv_hpo = RepeatedStratifiedKFold(n_splits=n_splits_inner, n_repeats=n_repeats_hpo,
+                                                     random_state=random_state)
+                    rs = make_hpo_search(pipeline, parametros, cv=cv_hpo, n_iter=n_iter, n_jobs=n_jobs,
+                                         random_state=random_state, fast=fast_hpo)
+                    with TRACER.stage('hpo', experiment=nome, scaler=sc_name, fold=fold_idx, model=model_name):
+                        if shared is not None:  # Splits internos como índices sobre a matriz compartilhada
+                            shared.fit_search(rs, idx_treino, X_refit=X_fold)
+                        else:
+                            rs.fit(X_fold, y_fold)
+                    estimador = rs.best_estimator_
+                record_fold(all_results[sc_name][model_name], best_roc[sc_name][model_name], estimador,
+                            time.time() - inicio, fold_idx, X_eval, y_eval, labels, class_names, prediction_cache,
+                            verbose=verbose, model_name=model_name, eval_label=experiment.get('eval_label', 'teste'))
+
+    return experiment_result(experiment, data, outer_cv, splits, conjuntos_avaliacao, spot_scores, selecionados,
+                             all_results, best_roc, prediction_cache, base_models, n_splits_inner, random_state)
+
+
+# ==============================================================================
+# SEÇÃO: EXECUÇÃO DE TODOS OS EXPERIMENTOS
+# ==============================================================================
+
+def run_experiments(experiments=EXPERIMENTS, scalers=SCALERS, base_models=BASE_MODELS, param_dists=PARAM_DISTS,
+                    n_splits_outer=5, n_splits_inner=5, n_repeats_hpo=5, n_iter=30, top_n=5, fast_hpo=True,
+                    shared_data=True, transform_cache=False, prediction_cache=None, target=TARGET,
+                    random_state=RANDOM_SEED, n_jobs=-1, verbose=True):
+    """
+    Executa todos os experimentos no mesmo processo, compartilhando leitura dos
+    CSVs, folds externos, matrizes compartilhadas e caches.
+
+    Args:
+        experiments (list): Entradas no formato de EXPERIMENTS.
+        scalers, base_models, param_dists (dict): Escalonadores, modelos e espaços de busca.
+        n_splits_outer (int): Folds externos do dataset de treino.
+        n_splits_inner, n_repeats_hpo, n_iter, top_n, fast_hpo: Ver run_experiment.
+        shared_data (bool): Compartilha a matriz de treino com o joblib (SharedDataset).
+        transform_cache (bool ou str): Cache em disco dos pré-processamentos ajustados
+            (Pipeline(memory=...)); True = diretório temporário removido ao final.
+            Só compensa com datasets grandes: nos datasets do projeto o hash dos dados
+            custa mais que ajustar o imputer/scaler de novo.
+        prediction_cache (PredictionCache, opcional): Cache de predições (None = um novo, comum a todos).
+        target (str): Coluna alvo.
+        random_state (int): Semente.
+        n_jobs (int): Processos do joblib.
+        verbose (bool): Imprime o progresso.
+    Returns:
+        dict: nome do experimento -> resultado de run_experiment.
+    """
+    prediction_cache = PredictionCache() if prediction_cache is None else prediction_cache
+    datasets, folds, compartilhados = {}, {}, {}
+    diretorio_cache = tempfile.mkdtemp(prefix='cache_transformacoes_') if transform_cache is True else (transform_cache or None)
+    resultados = {}
+    try:
+        for experiment in experiments:
+            data = load_experiment_data(experiment, target=target, datasets=datasets, verbose=verbose)
+            arquivo_treino = experiment['train_file']
+            if arquivo_treino not in folds:
+                folds[arquivo_treino] = outer_folds(data['y_train'], n_splits_outer, random_state)
+            if shared_data and arquivo_treino not in compartilhados:
+                compartilhados[arquivo_treino] = SharedDataset(data['X_train'], data['y_train'])
+            outer_cv, splits = folds[arquivo_treino]
+            resultados[experiment['name']] = run_experiment(
+                experiment, data, outer_cv, splits, scalers=scalers, base_models=base_models, param_dists=param_dists,
+                n_splits_inner=n_splits_inner, n_repeats_hpo=n_repeats_hpo, n_iter=n_iter, top_n=top_n,
+                fast_hpo=fast_hpo, shared=compartilhados.get(arquivo_treino), prediction_cache=prediction_cache,
+                memory=diretorio_cache, random_state=random_state, n_jobs=n_jobs, verbose=verbose)
+    finally:
+        for compartilhado in compartilhados.values():
+            compartilhado.close()
+        if transform_cache is True:
+            shutil.rmtree(diretorio_cache, ignore_errors=True)
+    return resultados
+
+
+def compare_experiments(results, metric='f1_macro'):
+    """
+    Média e desvio da métrica por (experimento, escalonador, modelo), lado a lado.
+
+    Args:
+        results (dict): Saída de run_experiments.
+        metric (str): Chave de fold_metrics.
+    Returns:
+        pd.DataFrame: Colunas experiment, config, model, mean, std e n_folds.
+    """
+    linhas = []
+    for nome, resultado in results.items():
+        for sc_name, resultados_scaler in resultado['all_results'].items():
+            for model_name, model_data in resultados_scaler.items():
+                valores = [m[metric] for m in model_data['fold_metrics']]
+                if valores:
+                    linhas.append({'experiment': nome, 'config': sc_name, 'model': model_name,
+                                   'mean': np.mean(valores), 'std': np.std(valores), 'n_folds': len(valores)})
+    return pd.DataFrame(linhas, columns=['experiment', 'config', 'model', 'mean', 'std', 'n_folds'])
+
+
+# ==============================================================================
+# SEÇÃO: PERSISTÊNCIA DOS RESULTADOS
+# ==============================================================================
+
+def save_results(results, path, signature=None):
+    """
+    Grava os resultados (sem o cache de predições) com joblib.
+
+    Args:
+        results (dict): Saída de run_experiments.
+        path (str): Arquivo de saída.
+        signature (str, opcional): Assinatura das configurações que geraram os resultados.
+    Returns:
+        str: Caminho gravado.
+    """
+    sem_cache = {nome: {chave: valor for chave, valor in resultado.items() if chave != 'prediction_cache'}
+                 for nome, resultado in results.items()}
+    joblib.dump({'signature': signature, 'results': sem_cache}, path)
+    return path
+
+
+def load_results(path, signature=None):
+    """
+    Lê resultados gravados por save_results, com um cache de predições novo (comum a todos).
+
+    Returns:
+        dict ou None: Resultados, ou None se o arquivo não existir ou a assinatura não conferir.
+    """
+    if not os.path.exists(path):
+        return None
+    gravado = joblib.load(path)
+    if signature is not None and gravado['signature'] != signature:
+        return None
+    prediction_cache = PredictionCache()
+    return {nome: dict(resultado, prediction_cache=prediction_cache) for nome, resultado in gravado['results'].items()}
+
+
+def _conteudo_datasets(experiments):
+    """
+    SHA-256 do conteúdo de cada dataset dos experimentos (CSV ou todos os
+    arquivos de um armazém .quant), para que resultados gravados não sejam
+    reaproveitados depois que o gerador ou o pré-processamento reescrever os arquivos.
+
+    Returns:
+        dict: caminho -> hash (None se o arquivo não existir).
+    """
+    hashes = {}
+    for experimento in experiments:
+        for chave in ('train_file', 'test_file', 'raw_file'):
+            caminho = experimento.get(chave)
+            if caminho is None or caminho in hashes:
+                continue
+            if not os.path.exists(caminho):
+                hashes[caminho] = None
+                continue
+            arquivos = sorted(os.path.join(caminho, nome) for nome in os.listdir(caminho)) \
+                if os.path.isdir(caminho) else [caminho]
+            digest = hashlib.sha256()
+            for arquivo in arquivos:
+                digest.update(os.path.basename(arquivo).encode())
+                with open(arquivo, 'rb') as conteudo:
+                    for bloco in iter(lambda: conteudo.read(2 ** 20), b''):
+                        digest.update(bloco)
+            hashes[caminho] = digest.hexdigest()
+    return hashes
+
+
+def load_or_run_experiments(path=None, experiments=EXPERIMENTS, **kwargs):
+    """
+    Lê os resultados de `path` se foram gerados com as mesmas configurações e
+    os mesmos datasets (conteúdo dos arquivos); caso contrário executa run_experiments e os grava em `path`. Assim o
+    segundo notebook (ou uma nova sessão) reaproveita a execução conjunta.
+
+    Args:
+        path (str, opcional): Arquivo de resultados (None = sempre executa, sem gravar).
+        experiments (list): Entradas no formato de EXPERIMENTS.
+        **kwargs: Repassados a run_experiments.
+    Returns:
+        dict: nome do experimento -> resultado.
+    """
+    if path is None:
+        return run_experiments(experiments, **kwargs)
+    ignorados = ('prediction_cache', 'verbose', 'n_jobs', 'shared_data', 'transform_cache')
+    assinatura = joblib.hash((experiments, _conteudo_datasets(experiments),
+                              sorted((k, v) for k, v in kwargs.items() if k not in ignorados)))
+    resultados = load_results(path, signature=assinatura)
+    if resultados is not None:
+        if kwargs.get('verbose', True):
+            print(f"Resultados dos experimentos lidos de '{path}'.")
+        return resultados
+    resultados = run_experiments(experiments, **kwargs)
+    save_results(resultados, path, signature=assinatura)
+    return resultados
+
+
+# ==============================================================================
+# SEÇÃO: EXECUÇÃO PELA LINHA DE COMANDO
+# ==============================================================================
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Executa os experimentos (baseline e proposta) em um único processo.")
+    parser.add_argument('--experiments', nargs='+', choices=[e['name'] for e in EXPERIMENTS],
+                        help="Experimentos a executar (padrão: todos).")
+    parser.add_argument('--results', help="Arquivo .joblib onde gravar (ou de onde ler) os resultados.")
+    parser.add_argument('--n-splits-outer', type=int, default=5)
+    parser.add_argument('--n-splits-inner', type=int, default=5)
+    parser.add_argument('--n-repeats-hpo', type=int, default=5)
+    parser.add_argument('--n-iter', type=int, default=30)
+    parser.add_argument('--top-n', type=int, default=5)
+    args = parser.parse_args()
+
+    selecionados = [e for e in EXPERIMENTS if args.experiments is None or e['name'] in args.experiments]
+    resultados = load_or_run_experiments(args.results, selecionados, n_splits_outer=args.n_splits_outer,
+                                         n_splits_inner=args.n_splits_inner, n_repeats_hpo=args.n_repeats_hpo,
+                                         n_iter=args.n_iter, top_n=args.top_n)
+    tabela = compare_experiments(resultados)
+    print(tabela.pivot_table(index=['config', 'model'], columns='experiment', values='mean').to_string(float_format='%.4f'))
@@ -0,0 +1,277 @@
+# ==============================================================================
+# MÓDULO: FIDELIDADE DOS SINTÉTICOS EM RELAÇÃO AOS DADOS REAIS
+# Descrição: Substitui a comparação visual do 01_EDA (histogramas, boxplots e
+#            mapas de calor lado a lado) por métricas numéricas, calculadas
+#            para todas as linhas e para cada classe:
+#            - KS de duas amostras por atributo (maior distância entre as
+#              distribuições acumuladas empíricas);
+#            - distância entre as matrizes de correlação (RMSE e máximo das
+#              diferenças fora da diagonal);
+#            - MMD multivariada com kernel RBF aproximado por random Fourier
+#              features: cada linha vira um vetor de n_components cossenos e a
+#              MMD é a distância entre as médias desses vetores, em O(n) (sem a
+#              matriz n x n do kernel), numa única passada que acumula as
+#              médias de todas as classes e do total. As projeções são as
+#              mesmas para todas as classes e para todas as execuções com a
+#              mesma semente, e a escala/largura do kernel vem só dos dados
+#              reais: valores de execuções diferentes do gerador são
+#              comparáveis entre si.
+#            O resultado cabe em uma linha por execução (fidelity_summary),
+#            acumulada em CSV para comparar configurações do gerador.
+#
+# Uso:
+#   python fidelidade_sinteticos.py Dataset_OriginalComClass.csv Dataset_SinteticosComClass.csv --append historico.csv
+# ==============================================================================
+
+import argparse  # Parâmetros de linha de comando.
+import os  # Verifica se o histórico já existe.
+from datetime import datetime  # Data de cada linha do histórico.
+
+import numpy as np  # Métricas vetorizadas.
+import pandas as pd  # Tabelas por classe e por atributo.
+
+from rastreamento import TRACER  # Tempo/memória de cada métrica (desativado por padrão).
+
+TARGET_PADRAO = 'Adequação MILHO'
+_LINHAS_POR_BLOCO = 65_536  # Linhas projetadas por vez na MMD (memória O(bloco x n_components)).
+
+
+# ==============================================================================
+# SEÇÃO: MÉTRICAS
+# ==============================================================================
+
+def ks_statistics(X_real, X_synthetic):
+    """
+    Estatística KS de duas amostras de cada coluna (NaN ignorado).
+
+    Args:
+        X_real (np.ndarray): Linhas reais (n_reais, n_atributos).
+        X_synthetic (np.ndarray): Linhas sintéticas (n_sinteticas, n_atributos).
+    Returns:
+        np.ndarray: KS por coluna (NaN se um dos lados não tiver valores).
+    """
+    estatisticas = np.full(X_real.shape[1], np.nan)
+    for j in range(X_real.shape[1]):
+        reais = np.sort(X_real[~np.isnan(X_real[:, j]), j])
+        sinteticos = np.sort(X_synthetic[~np.isnan(X_synthetic[:, j]), j])
+        if len(reais) and len(sinteticos):
+            pontos = np.concatenate([reais, sinteticos])  # As CDFs só mudam nos valores observados.
+            cdf_reais = np.searchsorted(reais, pontos, side='right') / len(reais)
+            cdf_sinteticos = np.searchsorted(sinteticos, pontos, side='right') / len(sinteticos)
+            estatisticas[j] = np.abs(cdf_reais - cdf_sinteticos).max()
+    return estatisticas
+
+
+def correlation_distance(X_real, X_synthetic):
+    """
+    Diferença entre as matrizes de correlação de Pearson (NaN ignorado par a par).
+
+    Args:
+        X_real (np.ndarray): Linhas reais.
+        X_synthetic (np.ndarray): Linhas sintéticas.
+    Returns:
+        tuple: (RMSE, máximo) das diferenças absolutas fora da diagonal (NaN com menos de 3 linhas).
+    """
+    if min(len(X_real), len(X_synthetic)) < 3:
+        return np.nan, np.nan
+    diferencas = np.abs(pd.DataFrame(X_real).corr().to_numpy() - pd.DataFrame(X_synthetic).corr().to_numpy())
+    fora_diagonal = diferencas[~np.eye(len(diferencas), dtype=bool)]
+    fora_diagonal = fora_diagonal[~np.isnan(fora_diagonal)]  # Colunas constantes não têm correlação.
+    if not len(fora_diagonal):
+        return np.nan, np.nan
+    return float(np.sqrt(np.mean(fora_diagonal ** 2))), float(fora_diagonal.max())
+
+
+class RandomFourierMMD:
+    """
+    MMD com kernel RBF aproximado por random Fourier features.
+
+    z(x) = sqrt(2/D) cos(W x + b), com W ~ N(0, 1/largura^2) e b ~ U(0, 2pi);
+    k(x, y) ~ z(x).z(y), logo MMD^2 ~ ||média z(reais) - média z(sintéticos)||^2.
+    Os atributos são padronizados pela média/desvio dos reais (NaN = média) e a
+    largura padrão é a mediana das distâncias entre linhas reais. As projeções
+    são calculadas em float32 (o cosseno vetorizado em float32 é ~15x mais
+    rápido; o erro é muito menor que o da própria aproximação) e somadas em float64.
+
+    Args:
+        n_components (int): Número de random features (D).
+        bandwidth (float, opcional): Largura do kernel nos dados padronizados.
+        max_rows_bandwidth (int): Linhas reais sorteadas para a mediana das distâncias.
+        random_state (int): Semente das projeções.
+    """
+
+    def __init__(self, n_components=512, bandwidth=None, max_rows_bandwidth=1000, random_state=42):
+        self.n_components = n_components
+        self.bandwidth = bandwidth
+        self.max_rows_bandwidth = max_rows_bandwidth
+        self.random_state = random_state
+
+    def fit(self, X_real):
+        """Escala, largura e projeções a partir das linhas reais."""
+        rng = np.random.default_rng(self.random_state)
+        self.mean_ = np.nanmean(X_real, axis=0)
+        desvio = np.nanstd(X_real, axis=0)
+        self.scale_ = np.where(desvio > 0, desvio, 1.0)
+        if self.bandwidth is None:
+            amostra = self._padronizar(X_real)
+            if len(amostra) > self.max_rows_bandwidth:
+                amostra = amostra[rng.choice(len(amostra), self.max_rows_bandwidth, replace=False)]
+            quadrados = (amostra ** 2).sum(axis=1)
+            distancias = quadrados[:, None] + quadrados[None, :] - 2 * amostra @ amostra.T
+            distancias = np.sqrt(np.maximum(distancias[np.triu_indices(len(amostra), k=1)], 0))
+            mediana = np.median(distancias) if len(distancias) else 0.0
+            self.bandwidth_ = float(mediana) if mediana > 0 else 1.0
+        else:
+            self.bandwidth_ = float(self.bandwidth)
+        self.weights_ = rng.normal(scale=1 / self.bandwidth_,
+                                   size=(X_real.shape[1], self.n_components)).astype(np.float32)
+        self.offsets_ = rng.uniform(0, 2 * np.pi, self.n_components).astype(np.float32)
+        return self
+
+    def _padronizar(self, X):
+        return np.nan_to_num((X - self.mean_) / self.scale_)
+
+    def mean_embeddings(self, X, groups, n_groups):
+        """
+        Média de z(x) de cada grupo e de todas as linhas, em blocos (uma passada, memória fixa).
+
+        Args:
+            X (np.ndarray): Linhas (n, n_atributos).
+            groups (np.ndarray): Código 0..n_groups-1 do grupo de cada linha (-1 = só no total).
+            n_groups (int): Número de grupos.
+        Returns:
+            np.ndarray: Médias (n_groups + 1, n_components); a última linha é o total.
+        """
+        somas = np.zeros((n_groups + 1, self.n_components))
+        for inicio in range(0, len(X), _LINHAS_POR_BLOCO):
+            bloco = slice(inicio, inicio + _LINHAS_POR_BLOCO)
+            projecao = self._padronizar(X[bloco]).astype(np.float32) @ self.weights_
+            projecao += self.offsets_
+            z = np.cos(projecao, out=projecao)
+            # Soma por grupo como um produto de matrizes: uma linha indicadora por grupo e uma de uns (total).
+            indicadora = np.zeros((n_groups + 1, len(z)), dtype=np.float32)
+            com_grupo = np.flatnonzero(groups[bloco] >= 0)
+            indicadora[groups[bloco][com_grupo], com_grupo] = 1.0
+            indicadora[-1] = 1.0
+            somas += indicadora @ z
+        contagens = np.append(np.bincount(groups[groups >= 0], minlength=n_groups), len(X))
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return np.sqrt(2 / self.n_components) * somas / contagens[:, None]
+
+
+# ==============================================================================
+# SEÇÃO: RELATÓRIO
+# ==============================================================================
+
+def fidelity_metrics(real, synthetic, target=TARGET_PADRAO, exclude_columns=('ID',), n_components=512,
+                     bandwidth=None, random_state=42):
+    """
+    Métricas de fidelidade entre linhas reais e sintéticas, no total e por classe.
+
+    Args:
+        real (pd.DataFrame): Dataset real (com a coluna target).
+        synthetic (pd.DataFrame): Dataset sintético (mesmas colunas numéricas).
+        target (str): Coluna da classe.
+        exclude_columns (tuple): Colunas numéricas ignoradas (ex: ID).
+        n_components (int): Random features da MMD.
+        bandwidth (float, opcional): Largura do kernel (padrão: mediana das distâncias entre reais).
+        random_state (int): Semente das projeções da MMD.
+    Returns:
+        dict: 'per_class' (pd.DataFrame: por classe e 'all', n_real, n_synthetic,
+              ks_mean, ks_max, ks_max_feature, corr_rmse, corr_max, mmd), 'ks'
+              (pd.DataFrame: KS por classe x atributo) e 'bandwidth' (float).
+    """
+    atributos = [coluna for coluna in real.select_dtypes(include=np.number).columns
+                 if coluna not in exclude_columns and coluna != target and coluna in synthetic.columns]
+    X_real = real[atributos].to_numpy(dtype=float)
+    X_sint = synthetic[atributos].to_numpy(dtype=float)
+    classes_real = real[target].astype(str).to_numpy()
+    classes_sint = synthetic[target].astype(str).to_numpy()
+    classes = [classe for classe in pd.unique(classes_real) if classe in set(classes_sint)]
+
+    # --- MMD: uma passada pelas linhas, médias de todos os grupos de uma vez ---
+    with TRACER.stage('fidelidade_mmd', n=len(X_real) + len(X_sint)):
+        mmd = RandomFourierMMD(n_components, bandwidth, random_state=random_state).fit(X_real)
+        # Classes sem par no outro dataset (código -1) só entram no total ('all').
+        medias_real = mmd.mean_embeddings(X_real, pd.Categorical(classes_real, categories=classes).codes, len(classes))
+        medias_sint = mmd.mean_embeddings(X_sint, pd.Categorical(classes_sint, categories=classes).codes, len(classes))
+        valores_mmd = np.sqrt(np.maximum(((medias_real - medias_sint) ** 2).sum(axis=1), 0))
+
+    linhas, ks_por_grupo = [], {}
+    with TRACER.stage('fidelidade_ks_correlacao'):
+        for indice, classe in enumerate([*classes, 'all']):
+            reais = X_real if classe == 'all' else X_real[classes_real == classe]
+            sinteticos = X_sint if classe == 'all' else X_sint[classes_sint == classe]
+            ks = ks_statistics(reais, sinteticos)
+            ks_por_grupo[classe] = ks
+            corr_rmse, corr_max = correlation_distance(reais, sinteticos)
+            pior = int(np.nanargmax(ks)) if not np.isnan(ks).all() else None
+            linhas.append({'class': classe, 'n_real': len(reais), 'n_synthetic': len(sinteticos),
+                           'ks_mean': np.nanmean(ks) if pior is not None else np.nan,
+                           'ks_max': ks[pior] if pior is not None else np.nan,
+                           'ks_max_feature': atributos[pior] if pior is not None else None,
+                           'corr_rmse': corr_rmse, 'corr_max': corr_max, 'mmd': valores_mmd[indice]})
+
+    return {'per_class': pd.DataFrame(linhas), 'ks': pd.DataFrame(ks_por_grupo, index=atributos).T,
+            'bandwidth': mmd.bandwidth_}
+
+
+def fidelity_summary(result):
+    """
+    Uma linha numérica por execução: cada métrica de per_class como '<métrica>[<classe>]'.
+
+    Args:
+        result (dict): Retorno de fidelity_metrics.
+    Returns:
+        dict: {'ks_mean[all]': ..., 'mmd[Alta]': ..., ...}.
+    """
+    resumo = {}
+    for linha in result['per_class'].to_dict('records'):
+        for metrica in ('ks_mean', 'ks_max', 'corr_rmse', 'corr_max', 'mmd'):
+            resumo[f"{metrica}[{linha['class']}]"] = linha[metrica]
+    return resumo
+
+
+def append_fidelity_log(result, path, **run_info):
+    """
+    Acrescenta o resumo de uma execução a um CSV de histórico (cria o arquivo se necessário).
+
+    Args:
+        result (dict): Retorno de fidelity_metrics.
+        path (str): CSV do histórico.
+        **run_info: Colunas extras da execução (ex: parâmetros do gerador).
+    Returns:
+        str: O caminho do histórico.
+    """
+    linha = {'timestamp': datetime.now().isoformat(timespec='seconds'), **run_info, **fidelity_summary(result)}
+    historico = pd.DataFrame([linha])
+    if os.path.exists(path):  # Colunas novas (ex: outra classe) entram no fim sem perder as anteriores.
+        historico = pd.concat([pd.read_csv(path), historico], ignore_index=True)
+    historico.to_csv(path, index=False)
+    return path
+
+
+# ==============================================================================
+# SEÇÃO: EXECUÇÃO PELA LINHA DE COMANDO
+# ==============================================================================
+
+if __name__ == '__main__':
+    from leitura_csv import read_dataset_csv  # Leitura dos CSVs do projeto (';' e ',' decimal).
+
+    parser = argparse.ArgumentParser(description="Fidelidade dos sintéticos (KS, correlação e MMD por classe).")
+    parser.add_argument('real', help="CSV com as linhas reais.")
+    parser.add_argument('synthetic', help="CSV com as linhas sintéticas.")
+    parser.add_argument('--target', default=TARGET_PADRAO)
+    parser.add_argument('--n-components', type=int, default=512)
+    parser.add_argument('--random-state', type=int, default=42)
+    parser.add_argument('--append', help="CSV de histórico onde acrescentar o resumo desta execução.")
+    args = parser.parse_args()
+
+    resultado = fidelity_metrics(read_dataset_csv(args.real), read_dataset_csv(args.synthetic), target=args.target,
+                                 n_components=args.n_components, random_state=args.random_state)
+    with pd.option_context('display.width', 200, 'display.max_columns', None):
+        print(resultado['per_class'].round(4).to_string(index=False))
+        print("\nKS por classe e atributo:")
+        print(resultado['ks'].round(3).to_string())
+    if args.append:
+        print(f"\nResumo acrescentado a: {append_fidelity_log(resultado, args.append, real=args.real, synthetic=args.synthetic)}")
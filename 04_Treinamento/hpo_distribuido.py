@@ -0,0 +1,605 @@
+# ==============================================================================
+# MÓDULO: HPO DISTRIBUÍDO (COORDENADOR E WORKERS EM VÁRIAS MÁQUINAS)
+# Descrição: O HPO do nested CV roda em uma única máquina (joblib, n_jobs=-1).
+#            Aqui o coordenador quebra o HPO em tarefas (experimento,
+#            configuração, fold externo, modelo, candidato) e as entrega por
+#            socket (multiprocessing.connection) a quantos workers se
+#            conectarem, em processos locais ou em outras máquinas. Cada
+#            tarefa avalia um candidato em todos os splits internos do fold;
+#            o coordenador escolhe o melhor candidato, faz o refit e grava o
+#            resultado no mesmo all_results de experimento.py.
+#
+#            Tolerância a falhas:
+#            - worker que cai (conexão encerrada): as tarefas dele voltam à fila;
+#            - worker travado: cada tarefa é um empréstimo com prazo
+#              (task_timeout), renovado pelos heartbeats do worker; prazo
+#              vencido = tarefa devolvida à fila;
+#            - a primeira resposta de uma tarefa vale (respostas atrasadas de
+#              um worker que voltou são ignoradas);
+#            - tarefa que derruba workers max_attempts vezes é registrada com
+#              score nan (como o error_score do sklearn);
+#            - todos os workers locais encerrados sem nenhum worker conectado:
+#              RuntimeError com os códigos de saída (em vez de esperar para
+#              sempre); só com workers remotos, use timeout.
+#
+#            Os candidatos e os splits internos são os mesmos do
+#            RandomizedSearchCV (ParameterSampler e RepeatedStratifiedKFold com a
+#            mesma semente), então os resultados são iguais aos de
+#            run_experiments(fast_hpo=False). Os modos rápidos de
+#            busca_hiperparametros.py (que avaliam todos os candidatos de uma vez
+#            por split) não se aplicam a tarefas de um candidato. O
+#            spot-checking, barato, roda no coordenador.
+#
+#            Segurança: as mensagens são serializadas com pickle e autenticadas
+#            pela authkey; use apenas em rede confiável.
+#
+# Uso:
+#   # Máquina coordenadora (0 workers locais; os nós se conectam pela rede)
+#   python hpo_distribuido.py coordinator --host 0.0.0.0 --port 6000 --authkey segredo --results resultados.joblib
+#   # Em cada nó
+#   python hpo_distribuido.py worker --host coordenador --port 6000 --authkey segredo
+#
+#   # No mesmo processo, com 4 workers locais
+#   resultados = run_distributed_experiments(EXPERIMENTS, local_workers=4)
+# ==============================================================================
+
+import argparse  # Parâmetros de linha de comando.
+import collections  # Fila de tarefas pendentes.
+import multiprocessing  # Workers locais.
+import os  # authkey aleatória, variável de ambiente e nome do worker.
+import socket  # Nome da máquina do worker.
+import threading  # Uma thread por conexão e heartbeats do worker.
+import time  # Prazos das tarefas e tempo de ajuste.
+import traceback  # Erro de uma tarefa devolvido ao coordenador.
+from multiprocessing.connection import Client, Listener  # Conexões autenticadas por authkey.
+
+import numpy as np  # Scores dos splits internos.
+import pandas as pd  # Tabela das tarefas.
+from joblib import Parallel, delayed  # Splits internos em paralelo dentro de um worker.
+from sklearn.base import clone  # Pipeline de cada candidato.
+from sklearn.metrics import get_scorer  # Mesmo scorer do RandomizedSearchCV.
+from sklearn.model_selection import ParameterSampler, RepeatedStratifiedKFold  # Candidatos e splits do HPO.
+
+from cache_predicoes import PredictionCache  # Predições de cada modelo em cada dataset calculadas uma vez.
+from experimento import (  # Configuração e registro dos resultados comuns aos experimentos.
+    BASE_MODELS, EXPERIMENTS, PARAM_DISTS, RANDOM_SEED, SCALERS, TARGET, _cabecalho_scaler,
+    _nova_estrutura_resultados, build_pipeline, evaluation_sets, experiment_result, load_experiment_data,
+    outer_folds, record_fold, save_results, spot_check)
+
+ENDERECO_PADRAO = ('localhost', 6000)
+SCORING = 'f1_macro'
+
+
+# ==============================================================================
+# SEÇÃO: COORDENADOR
+# ==============================================================================
+
+class HPOCoordinator:
+    """
+    Servidor de tarefas: entrega tarefas aos workers conectados e recolhe os resultados.
+
+    Protocolo (tuplas serializadas pela multiprocessing.connection):
+        worker -> ('hello', nome)            coordenador -> ('context', context)
+        worker -> ('ready',)                 coordenador -> ('task', id, tarefa) | ('wait', s) | ('stop',)
+        worker -> ('heartbeat', id)          (renova o prazo da tarefa)
+        worker -> ('result', id, resultado) | ('error', id, traceback)
+
+    Args:
+        context: Dados enviados uma vez a cada worker (ex: datasets e folds).
+        address (tuple): (host, porta) de escuta; porta 0 = porta livre (ver .address).
+        authkey (bytes): Chave compartilhada com os workers.
+        task_timeout (float): Segundos sem heartbeat até uma tarefa voltar à fila.
+        max_attempts (int): Entregas de uma tarefa antes de registrá-la como erro.
+        wait_interval (float): Espera sugerida a um worker ocioso enquanto há tarefas emprestadas.
+    """
+
+    def __init__(self, context, address=ENDERECO_PADRAO, authkey=None, task_timeout=600.0, max_attempts=3,
+                 wait_interval=0.5):
+        self.context = context
+        self.authkey = authkey
+        self.task_timeout = task_timeout
+        self.max_attempts = max_attempts
+        self.wait_interval = wait_interval
+        self._listener = Listener(address, authkey=authkey)
+        self._estado = threading.Condition()
+        self._tarefas, self._pendentes, self._emprestimos = {}, collections.deque(), {}
+        self.results, self.attempts, self.workers = {}, collections.Counter(), {}
+        self._id_conexao = 0
+        self._encerrando = False
+        self._thread_aceite = threading.Thread(target=self._aceitar, daemon=True)
+        self._thread_aceite.start()
+
+    @property
+    def address(self):
+        """Endereço real de escuta (útil com porta 0)."""
+        return self._listener.address
+
+    # --------------------------------------------------------------------------
+    # Conexões
+    # --------------------------------------------------------------------------
+
+    def _aceitar(self):
+        """Aceita conexões e atende cada uma em uma thread própria."""
+        while not self._encerrando:
+            try:
+                conexao = self._listener.accept()
+            except (OSError, EOFError, multiprocessing.AuthenticationError):  # Listener fechado ou cliente sem a authkey.
+                if self._encerrando:
+                    break
+                continue
+            if self._encerrando:
+                conexao.close()
+                break
+            with self._estado:
+                self._id_conexao += 1
+                id_conexao = self._id_conexao
+            threading.Thread(target=self._atender, args=(conexao, id_conexao), daemon=True).start()
+
+    def _atender(self, conexao, id_conexao):
+        """Conversa com um worker até ele sair; tarefas emprestadas a ele voltam à fila."""
+        try:
+            _, nome = conexao.recv()
+            with self._estado:
+                self.workers[id_conexao] = nome
+            conexao.send(('context', self.context))
+            while True:
+                mensagem = conexao.recv()
+                if mensagem[0] == 'ready':
+                    resposta = self._proxima(id_conexao)
+                    conexao.send(resposta)
+                    if resposta[0] == 'stop':
+                        break
+                elif mensagem[0] == 'heartbeat':
+                    self._renovar(mensagem[1], id_conexao)
+                elif mensagem[0] == 'result':
+                    self._concluir(mensagem[1], mensagem[2], id_conexao)
+                elif mensagem[0] == 'error':
+                    self._concluir(mensagem[1], {'scores': None, 'error': mensagem[2]}, id_conexao)
+        except (EOFError, OSError):  # Worker caiu ou a rede falhou.
+            pass
+        finally:
+            conexao.close()
+            with self._estado:
+                self.workers.pop(id_conexao, None)
+                for id_tarefa, (dono, _) in list(self._emprestimos.items()):
+                    if dono == id_conexao:
+                        self._devolver(id_tarefa)
+                self._estado.notify_all()
+
+    # --------------------------------------------------------------------------
+    # Fila de tarefas (chamadas com self._estado adquirido, exceto as públicas)
+    # --------------------------------------------------------------------------
+
+    def _devolver(self, id_tarefa):
+        """Tarefa emprestada volta ao início da fila (ou vira erro após max_attempts)."""
+        del self._emprestimos[id_tarefa]
+        if id_tarefa in self.results:
+            return
+        if self.attempts[id_tarefa] >= self.max_attempts:
+            self.results[id_tarefa] = {'scores': None, 'error': f"tarefa abandonada após {self.attempts[id_tarefa]} tentativas",
+                                       'fit_time': 0.0, 'worker': None}
+        else:
+            self._pendentes.appendleft(id_tarefa)
+
+    def _expirar(self):
+        """Devolve à fila as tarefas cujo prazo venceu (worker travado ou inacessível)."""
+        agora = time.monotonic()
+        for id_tarefa, (_, prazo) in list(self._emprestimos.items()):
+            if prazo < agora:
+                self._devolver(id_tarefa)
+
+    def _proxima(self, id_conexao):
+        """Resposta a um worker ocioso: próxima tarefa, espera ou fim."""
+        with self._estado:
+            self._expirar()
+            while self._pendentes:
+                id_tarefa = self._pendentes.popleft()
+                if id_tarefa in self.results:
+                    continue
+                self.attempts[id_tarefa] += 1
+                self._emprestimos[id_tarefa] = (id_conexao, time.monotonic() + self.task_timeout)
+                return ('task', id_tarefa, self._tarefas[id_tarefa])
+            if self._encerrando:
+                return ('stop',)
+            return ('wait', self.wait_interval)
+
+    def _renovar(self, id_tarefa, id_conexao):
+        """Heartbeat: estende o prazo da tarefa se ainda estiver com este worker."""
+        with self._estado:
+            if self._emprestimos.get(id_tarefa, (None,))[0] == id_conexao:
+                self._emprestimos[id_tarefa] = (id_conexao, time.monotonic() + self.task_timeout)
+
+    def _concluir(self, id_tarefa, resultado, id_conexao):
+        """Registra a primeira resposta de uma tarefa."""
+        with self._estado:
+            if self._emprestimos.get(id_tarefa, (None,))[0] == id_conexao:
+                del self._emprestimos[id_tarefa]
+            if id_tarefa in self._tarefas and id_tarefa not in self.results:
+                self.results[id_tarefa] = dict(resultado, worker=self.workers.get(id_conexao))
+                self._estado.notify_all()
+
+    # --------------------------------------------------------------------------
+    # API pública
+    # --------------------------------------------------------------------------
+
+    def run(self, tasks, timeout=None, progress=None, processes=None):
+        """
+        Entrega as tarefas aos workers e espera todas terminarem.
+
+        Args:
+            tasks (dict): id da tarefa -> tarefa (enviada ao worker).
+            timeout (float, opcional): Segundos até desistir (TimeoutError).
+            progress (callable, opcional): Chamada com (concluídas, total) a cada resultado.
+            processes (list, opcional): Processos dos workers locais (start_local_workers).
+                Se todos terminarem e nenhum worker estiver conectado, não há
+                quem conclua as tarefas: RuntimeError com os códigos de saída.
+        Returns:
+            dict: id da tarefa -> resultado ({'scores', 'fit_time', 'worker'} ou {'scores': None, 'error'}).
+        """
+        limite = None if timeout is None else time.monotonic() + timeout
+        with self._estado:
+            self._tarefas.update(tasks)
+            self._pendentes.extend(tasks)
+            concluidas = -1
+            while not all(id_tarefa in self.results for id_tarefa in tasks):
+                if progress is not None and len(self.results) != concluidas:
+                    concluidas = len(self.results)
+                    progress(concluidas, len(self._tarefas))
+                if limite is not None and time.monotonic() > limite:
+                    raise TimeoutError(f"{len(tasks) - sum(t in self.results for t in tasks)} tarefas sem resultado.")
+                if processes and not self.workers and not any(p.is_alive() for p in processes):
+                    raise RuntimeError(f"{len(tasks) - sum(t in self.results for t in tasks)} tarefas sem resultado: "
+                                       f"workers locais encerrados (códigos de saída "
+                                       f"{[p.exitcode for p in processes]}) e nenhum worker conectado.")
+                self._estado.wait(timeout=1.0)
+                self._expirar()  # Prazos vencidos mesmo sem workers pedindo tarefas.
+            if progress is not None:
+                progress(len(self.results), len(self._tarefas))
+            return {id_tarefa: self.results[id_tarefa] for id_tarefa in tasks}
+
+    def close(self):
+        """Responde 'stop' aos workers e deixa de aceitar conexões."""
+        with self._estado:
+            if self._encerrando:
+                return
+            self._encerrando = True
+        try:  # Desbloqueia o accept() com uma conexão própria.
+            Client(self.address, authkey=self.authkey).close()
+        except OSError:
+            pass
+        self._thread_aceite.join(timeout=5)
+        self._listener.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
+
+
+# ==============================================================================
+# SEÇÃO: WORKER
+# ==============================================================================
+
+def _avaliar_split(pipeline, X, y, idx_treino, idx_val, scorer):
+    """Ajusta o candidato em um split interno e devolve o score (nan se o ajuste falhar, como error_score=nan)."""
+    try:
+        estimador = clone(pipeline).fit(X.iloc[idx_treino], y[idx_treino])
+        return scorer(estimador, X.iloc[idx_val], y[idx_val])
+    except Exception:
+        return np.nan
+
+
+def _executar_tarefa(context, task, cache_folds, n_jobs=1):
+    """
+    Avalia um candidato em todos os splits internos do fold externo da tarefa.
+
+    Returns:
+        dict: {'scores': score de cada split interno, 'fit_time': segundos}.
+    """
+    chave = (task['train_file'], task['fold'])
+    if chave not in cache_folds:  # Fold e splits internos calculados uma vez por worker.
+        X, y = context['datasets'][task['train_file']]
+        idx_fold = context['folds'][task['train_file']][task['fold']]
+        X_fold, y_fold = X.iloc[idx_fold], y[idx_fold]
+        cv_hpo = RepeatedStratifiedKFold(n_splits=context['n_splits_inner'], n_repeats=context['n_repeats_hpo'],
+                                         random_state=context['random_state'])
+        cache_folds[chave] = (X_fold, y_fold, list(cv_hpo.split(X_fold, y_fold)))
+    X_fold, y_fold, splits = cache_folds[chave]
+    pipeline = clone(build_pipeline(context['base_models'][task['model']],
+                                    context['scalers'][task['config']])).set_params(**task['params'])
+    scorer = get_scorer(SCORING)
+    inicio = time.time()
+    scores = Parallel(n_jobs=n_jobs)(delayed(_avaliar_split)(pipeline, X_fold, y_fold, idx_treino, idx_val, scorer)
+                                     for idx_treino, idx_val in splits)
+    return {'scores': np.asarray(scores, dtype=float), 'fit_time': time.time() - inicio}
+
+
+def _batimentos(conexao, trava, id_tarefa, parar, intervalo):
+    """Envia heartbeats da tarefa em andamento até `parar` ser sinalizado."""
+    while not parar.wait(intervalo):
+        try:
+            with trava:
+                conexao.send(('heartbeat', id_tarefa))
+        except OSError:
+            return
+
+
+def _conectar(address, authkey, connect_timeout):
+    """Conecta ao coordenador, tentando de novo até connect_timeout (o coordenador pode subir depois)."""
+    limite = None if connect_timeout is None else time.monotonic() + connect_timeout
+    while True:
+        try:
+            return Client(tuple(address), authkey=authkey)
+        except OSError:
+            if limite is not None and time.monotonic() > limite:
+                raise
+            time.sleep(1.0)
+
+
+def run_worker(address=ENDERECO_PADRAO, authkey=None, name=None, n_jobs=1, heartbeat_interval=10.0,
+               connect_timeout=600.0, max_tasks=None):
+    """
+    Conecta ao coordenador e executa tarefas até receber 'stop' (ou a conexão cair).
+
+    Args:
+        address (tuple): (host, porta) do coordenador.
+        authkey (bytes): Chave compartilhada com o coordenador.
+        name (str, opcional): Nome do worker na tabela de tarefas (None = máquina:pid).
+        n_jobs (int): Processos do joblib para os splits internos de uma tarefa.
+        heartbeat_interval (float): Segundos entre heartbeats (menor que o task_timeout do coordenador).
+        connect_timeout (float, opcional): Segundos tentando conectar (None = sem limite).
+        max_tasks (int, opcional): Sai após este número de tarefas.
+    Returns:
+        int: Número de tarefas executadas.
+    """
+    nome = name or f"{socket.gethostname()}:{os.getpid()}"
+    conexao = _conectar(address, authkey, connect_timeout)
+    trava = threading.Lock()  # A thread de heartbeats e a principal enviam pela mesma conexão.
+    cache_folds, concluidas = {}, 0
+    try:
+        conexao.send(('hello', nome))
+        _, context = conexao.recv()
+        while max_tasks is None or concluidas < max_tasks:
+            with trava:
+                conexao.send(('ready',))
+            mensagem = conexao.recv()
+            if mensagem[0] == 'stop':
+                break
+            if mensagem[0] == 'wait':
+                time.sleep(mensagem[1])
+                continue
+            _, id_tarefa, tarefa = mensagem
+            parar = threading.Event()
+            batimentos = threading.Thread(target=_batimentos, args=(conexao, trava, id_tarefa, parar, heartbeat_interval),
+                                          daemon=True)
+            batimentos.start()
+            try:
+                resposta = ('result', id_tarefa, _executar_tarefa(context, tarefa, cache_folds, n_jobs))
+            except Exception:
+                resposta = ('error', id_tarefa, traceback.format_exc())
+            finally:
+                parar.set()
+                batimentos.join()
+            with trava:
+                conexao.send(resposta)
+            concluidas += 1
+    except (EOFError, OSError):  # Coordenador encerrado.
+        pass
+    finally:
+        conexao.close()
+    return concluidas
+
+
+def start_local_workers(address, authkey, n, n_jobs=1, **kwargs):
+    """
+    Inicia n workers em processos locais (spawn: sem herdar as threads do coordenador).
+
+    Returns:
+        list: Processos iniciados (encerram sozinhos ao receber 'stop').
+    """
+    host, porta = address
+    endereco = ('localhost' if host in ('', '0.0.0.0') else host, porta)
+    contexto_mp = multiprocessing.get_context('spawn')
+    processos = [contexto_mp.Process(target=run_worker, name=f"hpo-worker-{i}",
+                                     kwargs=dict(kwargs, address=endereco, authkey=authkey, name=f"local-{i}",
+                                                 n_jobs=n_jobs))
+                 for i in range(n)]
+    for processo in processos:
+        processo.start()
+    return processos
+
+
+# ==============================================================================
+# SEÇÃO: EXPERIMENTOS COM HPO DISTRIBUÍDO
+# ==============================================================================
+
+def _melhor_candidato(respostas):
+    """Índice do candidato de maior score médio (o primeiro em caso de empate, como o RandomizedSearchCV)."""
+    medias = np.array([np.nan if r['scores'] is None else np.mean(r['scores']) for r in respostas])
+    return 0 if np.all(np.isnan(medias)) else int(np.nanargmax(medias))
+
+
+def run_distributed_experiments(experiments=EXPERIMENTS, address=('localhost', 0), authkey=None, local_workers=0,
+                                scalers=SCALERS, base_models=BASE_MODELS, param_dists=PARAM_DISTS, n_splits_outer=5,
+                                n_splits_inner=5, n_repeats_hpo=5, n_iter=30, top_n=5, task_timeout=600.0,
+                                timeout=None, worker_n_jobs=1, prediction_cache=None, target=TARGET,
+                                random_state=RANDOM_SEED, n_jobs=-1, verbose=True):
+    """
+    Equivalente a run_experiments(fast_hpo=False), com o HPO distribuído aos workers.
+
+    Args:
+        experiments (list): Entradas no formato de EXPERIMENTS.
+        address (tuple): (host, porta) de escuta do coordenador (porta 0 = porta livre).
+        authkey (bytes, opcional): Chave dos workers (None = aleatória, só para workers locais).
+        local_workers (int): Workers iniciados em processos locais. Com 0, é preciso
+            conectar workers remotos (run_worker / linha de comando).
+        scalers, base_models, param_dists (dict): Escalonadores, modelos e espaços de busca.
+        n_splits_outer, n_splits_inner, n_repeats_hpo, n_iter, top_n: Ver run_experiments.
+        task_timeout (float): Segundos sem heartbeat até uma tarefa voltar à fila.
+        timeout (float, opcional): Segundos até desistir do HPO (TimeoutError). Com
+            workers locais, a queda de todos já interrompe a espera; só com workers
+            remotos, sem timeout, espera até algum se conectar.
+        worker_n_jobs (int): n_jobs de cada worker local.
+        prediction_cache (PredictionCache, opcional): Cache de predições (None = um novo, comum a todos).
+        target (str): Coluna alvo.
+        random_state (int): Semente.
+        n_jobs (int): Processos do joblib no spot-checking (no coordenador).
+        verbose (bool): Imprime o progresso.
+    Returns:
+        dict: nome do experimento -> resultado no formato de run_experiment, com a
+              chave extra 'hpo_tasks' (DataFrame: uma linha por tarefa, com o
+              score médio, o tempo, o worker e o número de entregas).
+    """
+    authkey = os.urandom(16) if authkey is None else authkey
+    prediction_cache = PredictionCache() if prediction_cache is None else prediction_cache
+
+    # --- Dados, folds externos e spot-checking (no coordenador) ---
+    datasets, folds, preparados = {}, {}, {}
+    for experiment in experiments:
+        data = load_experiment_data(experiment, target=target, datasets=datasets, verbose=verbose)
+        arquivo_treino = experiment['train_file']
+        if arquivo_treino not in folds:
+            folds[arquivo_treino] = outer_folds(data['y_train'], n_splits_outer, random_state)
+        if verbose:
+            print(f"\n\n{'#' * 60}\n EXPERIMENTO: {experiment['name']} \n{'#' * 60}")
+        spot_scores, selecionados = {}, {}
+        for sc_name, ScalerCls in scalers.items():
+            if verbose:
+                _cabecalho_scaler(sc_name, ScalerCls)
+            spot_scores[sc_name], selecionados[sc_name] = spot_check(
+                data['X_train'], data['y_train'], ScalerCls, base_models, n_splits=n_splits_inner, top_n=top_n,
+                random_state=random_state, n_jobs=n_jobs, trace_labels={'experiment': experiment['name'], 'scaler': sc_name},
+                verbose=verbose, scaler_name=sc_name)
+        preparados[experiment['name']] = (experiment, data, *folds[arquivo_treino], spot_scores, selecionados)
+
+    # --- Uma tarefa por (experimento, configuração, fold, modelo, candidato) ---
+    tarefas, candidatos = {}, {}
+    for nome, (experiment, data, _, splits, _, selecionados) in preparados.items():
+        for sc_name in scalers:
+            for model_name in selecionados[sc_name]:
+                if not param_dists.get(model_name):  # Modelos sem HPO: ajuste direto no coordenador.
+                    continue
+                candidatos[nome, sc_name, model_name] = list(ParameterSampler(param_dists[model_name], n_iter,
+                                                                              random_state=random_state))
+                for fold_idx in range(len(splits)):
+                    for idx_candidato, params in enumerate(candidatos[nome, sc_name, model_name]):
+                        tarefas[nome, sc_name, fold_idx, model_name, idx_candidato] = {
+                            'experiment': nome, 'train_file': experiment['train_file'], 'config': sc_name,
+                            'fold': fold_idx, 'model': model_name, 'candidate': idx_candidato, 'params': params}
+    context = {
+        'datasets': {e['train_file']: (d['X_train'], d['y_train']) for e, d, *_ in preparados.values()},
+        'folds': {arquivo: [idx_treino for idx_treino, _ in splits] for arquivo, (_, splits) in folds.items()},
+        'scalers': scalers, 'base_models': base_models, 'n_splits_inner': n_splits_inner,
+        'n_repeats_hpo': n_repeats_hpo, 'random_state': random_state,
+    }
+
+    def _progresso(concluidas, total):
+        if verbose and (concluidas == total or concluidas % max(1, total // 20) == 0):
+            print(f"HPO distribuído: {concluidas}/{total} tarefas concluídas")
+
+    # --- Coordenador e workers ---
+    coordinator = HPOCoordinator(context, address, authkey=authkey, task_timeout=task_timeout)
+    processos = start_local_workers(coordinator.address, authkey, local_workers, n_jobs=worker_n_jobs)
+    if verbose:
+        print(f"\nCoordenador em {coordinator.address}: {len(tarefas)} tarefas, {local_workers} workers locais")
+    try:
+        respostas = coordinator.run(tarefas, timeout=timeout, progress=_progresso, processes=processos)
+    finally:
+        coordinator.close()
+        for processo in processos:
+            processo.join(timeout=30)
+            if processo.is_alive():
+                processo.terminate()
+
+    tabela = pd.DataFrame([
+        dict({k: v for k, v in tarefa.items() if k != 'train_file'},
+             mean_score=np.nan if respostas[chave]['scores'] is None else np.mean(respostas[chave]['scores']),
+             std_score=np.nan if respostas[chave]['scores'] is None else np.std(respostas[chave]['scores']),
+             fit_time=respostas[chave].get('fit_time', 0.0), worker=respostas[chave]['worker'],
+             attempts=coordinator.attempts[chave], error=respostas[chave].get('error'))
+        for chave, tarefa in tarefas.items()])
+
+    # --- Melhor candidato, refit e avaliação (no coordenador) ---
+    resultados = {}
+    for nome, (experiment, data, outer_cv, splits, spot_scores, selecionados) in preparados.items():
+        X_train, y_train, labels, class_names = data['X_train'], data['y_train'], data['labels'], data['class_names']
+        conjuntos_avaliacao = evaluation_sets(data, splits)
+        test_sets = conjuntos_avaliacao[0]
+        all_results, best_roc = _nova_estrutura_resultados(scalers, base_models, class_names)
+        for sc_name, ScalerCls in scalers.items():
+            for fold_idx, (idx_treino, _) in enumerate(splits):
+                if verbose:
+                    print(f"\n--- {nome} | Fold Externo {fold_idx + 1}/{len(splits)} (Config: {sc_name}) ---")
+                X_fold, y_fold = X_train.iloc[idx_treino], y_train[idx_treino]
+                X_eval, y_eval = test_sets if isinstance(test_sets, tuple) else test_sets[fold_idx]
+                for model_name in selecionados[sc_name]:
+                    pipeline = clone(build_pipeline(base_models[model_name], ScalerCls))
+                    tempo_hpo = 0.0
+                    if (nome, sc_name, model_name) in candidatos:
+                        cands = candidatos[nome, sc_name, model_name]
+                        respostas_modelo = [respostas[nome, sc_name, fold_idx, model_name, i] for i in range(len(cands))]
+                        pipeline.set_params(**cands[_melhor_candidato(respostas_modelo)])
+                        tempo_hpo = sum(r.get('fit_time', 0.0) for r in respostas_modelo)
+                    inicio = time.time()
+                    estimador = pipeline.fit(X_fold, y_fold)
+                    record_fold(all_results[sc_name][model_name], best_roc[sc_name][model_name], estimador,
+                                tempo_hpo + time.time() - inicio, fold_idx, X_eval, y_eval, labels, class_names,
+                                prediction_cache, verbose=verbose, model_name=model_name,
+                                eval_label=experiment.get('eval_label', 'teste'))
+        resultados[nome] = experiment_result(experiment, data, outer_cv, splits, conjuntos_avaliacao, spot_scores,
+                                             selecionados, all_results, best_roc, prediction_cache, base_models,
+                                             n_splits_inner, random_state)
+        resultados[nome]['hpo_tasks'] = tabela[tabela['experiment'] == nome].reset_index(drop=True)
+    return resultados
+
+
+# ==============================================================================
+# SEÇÃO: EXECUÇÃO PELA LINHA DE COMANDO
+# ==============================================================================
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="HPO distribuído: coordenador e workers.")
+    subparsers = parser.add_subparsers(dest='role', required=True)
+    for papel, ajuda in (('coordinator', "Executa os experimentos distribuindo o HPO."),
+                         ('worker', "Conecta a um coordenador e executa tarefas de HPO.")):
+        sub = subparsers.add_parser(papel, help=ajuda)
+        sub.add_argument('--host', default='localhost', help="Host de escuta (coordinator) ou do coordenador (worker).")
+        sub.add_argument('--port', type=int, default=ENDERECO_PADRAO[1])
+        sub.add_argument('--authkey', default=os.environ.get('HPO_AUTHKEY'),
+                         help="Chave compartilhada (padrão: variável de ambiente HPO_AUTHKEY).")
+    coordenador = subparsers.choices['coordinator']
+    coordenador.add_argument('--local-workers', type=int, default=0)
+    coordenador.add_argument('--task-timeout', type=float, default=600.0)
+    coordenador.add_argument('--timeout', type=float, help="Segundos até desistir do HPO (padrão: sem limite).")
+    coordenador.add_argument('--experiments', nargs='+', choices=[e['name'] for e in EXPERIMENTS],
+                             help="Experimentos a executar (padrão: todos).")
+    coordenador.add_argument('--results', help="Arquivo .joblib onde gravar os resultados (lido por load_results).")
+    coordenador.add_argument('--n-splits-outer', type=int, default=5)
+    coordenador.add_argument('--n-splits-inner', type=int, default=5)
+    coordenador.add_argument('--n-repeats-hpo', type=int, default=5)
+    coordenador.add_argument('--n-iter', type=int, default=30)
+    coordenador.add_argument('--top-n', type=int, default=5)
+    worker = subparsers.choices['worker']
+    worker.add_argument('--name')
+    worker.add_argument('--n-jobs', type=int, default=1)
+    worker.add_argument('--max-tasks', type=int)
+    args = parser.parse_args()
+    if not args.authkey:
+        parser.error("informe --authkey ou a variável de ambiente HPO_AUTHKEY")
+    chave = args.authkey.encode()
+
+    if args.role == 'worker':
+        total = run_worker((args.host, args.port), chave, name=args.name, n_jobs=args.n_jobs, max_tasks=args.max_tasks)
+        print(f"Worker encerrado após {total} tarefas.")
+    else:
+        selecionados = [e for e in EXPERIMENTS if args.experiments is None or e['name'] in args.experiments]
+        resultados = run_distributed_experiments(
+            selecionados, (args.host, args.port), chave, local_workers=args.local_workers,
+            n_splits_outer=args.n_splits_outer, n_splits_inner=args.n_splits_inner, n_repeats_hpo=args.n_repeats_hpo,
+            n_iter=args.n_iter, top_n=args.top_n, task_timeout=args.task_timeout, timeout=args.timeout)
+        if args.results:
+            save_results(resultados, args.results)
+        tarefas = pd.concat([r['hpo_tasks'] for r in resultados.values()])
+        print(tarefas.groupby('worker', dropna=False)[['fit_time']].agg(['count', 'sum']).to_string())
@@ -0,0 +1,221 @@
+# ==============================================================================
+# MÓDULO: IMPORTÂNCIA POR PERMUTAÇÃO EM LOTE
+# Descrição: Importância dos atributos dos pipelines ajustados (best_estimators)
+#            no conjunto de teste. Equivale ao
+#            sklearn.inspection.permutation_importance (mesmas permutações para
+#            a mesma semente), mas:
+#            - calcula o score de referência uma única vez por estimador;
+#            - aplica o pré-processamento (imputer/scaler) uma única vez, pois
+#              essas etapas atuam coluna a coluna;
+#            - empilha as n_repeats cópias permutadas de cada atributo em uma
+#              única matriz e faz uma só chamada a predict por atributo;
+#            - distribui os estimadores (folds x configurações) entre os núcleos.
+# ==============================================================================
+
+import numpy as np  # Matrizes permutadas e agregação dos scores.
+import pandas as pd  # Tabela-resumo das importâncias.
+from joblib import Parallel, delayed  # Paraleliza os estimadores/atributos.
+from sklearn.impute import SimpleImputer  # Etapas de pré-processamento coluna a coluna.
+from sklearn.preprocessing import MinMaxScaler, StandardScaler
+from sklearn.utils import Bunch, check_random_state  # Mesmo retorno e mesmo sorteio do sklearn.
+
+from metricas import PREDICTION_METRICS  # Métricas calculadas direto das predições.
+
+# --- Etapas cujo transform atua em cada coluna isoladamente ---
+# Permutar uma coluna antes ou depois dessas etapas dá o mesmo resultado.
+_ETAPAS_POR_COLUNA = (SimpleImputer, StandardScaler, MinMaxScaler)
+
+
+# ==============================================================================
+# SEÇÃO: FUNÇÕES AUXILIARES
+# ==============================================================================
+
+def _permutacoes(n_amostras, n_repeats, random_state):
+    """
+    Gera os índices das n_repeats permutações, na mesma sequência usada pelo
+    permutation_importance do sklearn (a mesma para todos os atributos).
+
+    Args:
+        n_amostras (int): Número de amostras do conjunto de teste.
+        n_repeats (int): Número de permutações por atributo.
+        random_state (int ou None): Semente.
+    Returns:
+        np.ndarray: Índices no formato (n_repeats, n_amostras), já em relação
+                    à coluna original.
+    """
+    semente = check_random_state(random_state).randint(np.iinfo(np.int32).max + 1)
+    rng = check_random_state(semente)
+    sorteio = np.arange(n_amostras)
+    composta = np.arange(n_amostras)
+    permutacoes = np.empty((n_repeats, n_amostras), dtype=np.intp)
+    for repeticao in range(n_repeats):
+        rng.shuffle(sorteio)
+        # O sklearn permuta a coluna já permutada na repetição anterior: compõe os índices.
+        composta = composta[sorteio]
+        permutacoes[repeticao] = composta
+    return permutacoes
+
+
+def _separar_modelo(estimador, X):
+    """
+    Aplica uma única vez as etapas de pré-processamento coluna a coluna do pipeline.
+
+    Args:
+        estimador: Pipeline ajustado (com a etapa final 'model') ou modelo simples.
+        X (pd.DataFrame ou np.ndarray): Atributos do conjunto de teste.
+    Returns:
+        tuple: (modelo que fará as predições, matriz de entrada desse modelo).
+               Se alguma etapa não for coluna a coluna, retorna o próprio
+               estimador e X sem transformação.
+    """
+    etapas = getattr(estimador, 'steps', None)
+    if not etapas or not all(isinstance(etapa, _ETAPAS_POR_COLUNA) for _, etapa in etapas[:-1]):
+        return estimador, X
+    X_transformado = X
+    for _, etapa in etapas[:-1]:
+        X_transformado = etapa.transform(X_transformado)
+    X_transformado = np.asarray(X_transformado)
+    if X_transformado.shape[1] != X.shape[1]:  # Ex: imputer descartando coluna vazia.
+        return estimador, X
+    return etapas[-1][1], X_transformado
+
+
+def _scores_atributo(modelo, X_base, y, coluna, permutacoes, metrica):
+    """
+    Scores das n_repeats permutações de um atributo com uma única chamada a predict.
+
+    Args:
+        modelo: Estimador ajustado que recebe X_base.
+        X_base (pd.DataFrame ou np.ndarray): Matriz de entrada do modelo.
+        y (np.ndarray): Rótulos verdadeiros.
+        coluna (int): Índice do atributo permutado.
+        permutacoes (np.ndarray): Índices (n_repeats, n_amostras).
+        metrica (callable): Métrica f(y_true, y_pred).
+    Returns:
+        np.ndarray: Score de cada repetição.
+    """
+    n_repeats, n_amostras = permutacoes.shape
+    if isinstance(X_base, pd.DataFrame):
+        lote = pd.DataFrame(np.tile(X_base.to_numpy(), (n_repeats, 1)), columns=X_base.columns)
+        lote[X_base.columns[coluna]] = X_base.iloc[:, coluna].to_numpy()[permutacoes.ravel()]
+        lote = lote.astype(X_base.dtypes.to_dict())
+    else:
+        lote = np.tile(X_base, (n_repeats, 1))
+        lote[:, coluna] = X_base[permutacoes.ravel(), coluna]
+    predicoes = np.asarray(modelo.predict(lote)).reshape(n_repeats, n_amostras)
+    return np.array([metrica(y, predicoes[repeticao]) for repeticao in range(n_repeats)])
+
+
+def _importancias_estimador(estimador, X, y, permutacoes, metrica, predicoes_referencia=None):
+    """
+    Matriz de importâncias (n_atributos, n_repeats) de um estimador ajustado.
+
+    Args:
+        estimador: Pipeline ou modelo ajustado.
+        X (pd.DataFrame ou np.ndarray): Atributos do conjunto de teste.
+        y (np.ndarray): Rótulos verdadeiros.
+        permutacoes (np.ndarray): Índices (n_repeats, n_amostras).
+        metrica (callable): Métrica f(y_true, y_pred).
+        predicoes_referencia (np.ndarray, opcional): Predições já calculadas em X sem permutação.
+    Returns:
+        np.ndarray: Queda do score (referência - permutado) por atributo e repetição.
+    """
+    modelo, X_base = _separar_modelo(estimador, X)
+    if predicoes_referencia is None:
+        predicoes_referencia = modelo.predict(X_base)
+    score_referencia = metrica(y, np.asarray(predicoes_referencia))  # Calculado uma única vez.
+    return np.array([score_referencia - _scores_atributo(modelo, X_base, y, coluna, permutacoes, metrica)
+                     for coluna in range(X.shape[1])])
+
+
+# ==============================================================================
+# SEÇÃO: IMPORTÂNCIA POR PERMUTAÇÃO
+# ==============================================================================
+
+def permutation_importance_batched(estimator, X, y, n_repeats=10, random_state=None, scoring='f1_macro', n_jobs=None):
+    """
+    Importância por permutação de um estimador ajustado, equivalente ao
+    sklearn.inspection.permutation_importance para a mesma semente.
+
+    Args:
+        estimator: Pipeline ou modelo já ajustado.
+        X (pd.DataFrame ou np.ndarray): Atributos do conjunto de teste.
+        y (np.ndarray): Rótulos codificados.
+        n_repeats (int): Número de permutações por atributo.
+        random_state (int ou None): Semente das permutações.
+        scoring (str): Métrica (ver metricas.PREDICTION_METRICS).
+        n_jobs (int): Número de processos (um atributo por tarefa).
+    Returns:
+        Bunch: importances_mean, importances_std e importances (n_atributos, n_repeats).
+    """
+    if scoring not in PREDICTION_METRICS:
+        raise ValueError(f"Métrica '{scoring}' não suportada. Use uma de {list(PREDICTION_METRICS)}.")
+    metrica = PREDICTION_METRICS[scoring]
+    y = np.asarray(y)
+    permutacoes = _permutacoes(X.shape[0], n_repeats, random_state)
+
+    modelo, X_base = _separar_modelo(estimator, X)
+    score_referencia = metrica(y, np.asarray(modelo.predict(X_base)))
+    scores = Parallel(n_jobs=n_jobs)(
+        delayed(_scores_atributo)(modelo, X_base, y, coluna, permutacoes, metrica) for coluna in range(X.shape[1]))
+    importancias = score_referencia - np.array(scores)
+    return Bunch(importances_mean=importancias.mean(axis=1), importances_std=importancias.std(axis=1),
+                 importances=importancias)
+
+
+def permutation_importance_table(all_results, test_sets, n_repeats=10, random_state=None, scoring='f1_macro', n_jobs=-1,
+                                 prediction_cache=None):
+    """
+    Importância por permutação de todos os best_estimators (folds x configurações)
+    e tabela-resumo por (configuração, modelo, atributo).
+
+    Args:
+        all_results (dict): Resultados do treino, all_results[config][modelo]['best_estimators'].
+        test_sets (tuple ou list): (X, y) usado para todos os folds, ou lista com
+            um (X, y) por fold, na ordem de 'best_estimators'.
+        n_repeats (int): Número de permutações por atributo.
+        random_state (int ou None): Semente das permutações (as mesmas em todos os estimadores).
+        scoring (str): Métrica (ver metricas.PREDICTION_METRICS).
+        n_jobs (int): Número de processos (um estimador por tarefa).
+        prediction_cache (PredictionCache, opcional): Cache de onde vêm as predições
+            de referência (sem permutação), já calculadas na avaliação dos folds.
+    Returns:
+        pd.DataFrame: Colunas config, model, feature, importance_mean, importance_std
+                      (sobre folds e repetições) e n_folds, ordenada por importância.
+    """
+    if scoring not in PREDICTION_METRICS:
+        raise ValueError(f"Métrica '{scoring}' não suportada. Use uma de {list(PREDICTION_METRICS)}.")
+    metrica = PREDICTION_METRICS[scoring]
+
+    tarefas = []
+    for config_name, config_results in all_results.items():
+        for model_name, model_data in config_results.items():
+            for fold_idx, estimator in enumerate(model_data['best_estimators']):
+                X_teste, y_teste = test_sets if isinstance(test_sets, tuple) else test_sets[fold_idx]
+                tarefas.append((config_name, model_name, estimator, X_teste, np.asarray(y_teste)))
+
+    # Mesmas permutações para todos os estimadores avaliados no mesmo conjunto de teste.
+    permutacoes_por_tamanho = {}
+    for *_, X_teste, _ in tarefas:
+        if X_teste.shape[0] not in permutacoes_por_tamanho:
+            permutacoes_por_tamanho[X_teste.shape[0]] = _permutacoes(X_teste.shape[0], n_repeats, random_state)
+
+    importancias = Parallel(n_jobs=n_jobs)(
+        delayed(_importancias_estimador)(estimator, X_teste, y_teste, permutacoes_por_tamanho[X_teste.shape[0]], metrica,
+                                         prediction_cache.predict(estimator, X_teste) if prediction_cache is not None else None)
+        for _, _, estimator, X_teste, y_teste in tarefas)
+
+    # --- Agregação por (configuração, modelo): folds x repetições de cada atributo ---
+    agrupadas = {}
+    for (config_name, model_name, _, X_teste, _), importancia in zip(tarefas, importancias):
+        agrupadas.setdefault((config_name, model_name), {'features': list(getattr(X_teste, 'columns', range(X_teste.shape[1]))),
+                                                         'valores': []})['valores'].append(importancia)
+    linhas = []
+    for (config_name, model_name), dados in agrupadas.items():
+        valores = np.stack(dados['valores'], axis=1)  # (n_atributos, n_folds, n_repeats)
+        for i_atributo, feature in enumerate(dados['features']):
+            linhas.append({'config': config_name, 'model': model_name, 'feature': feature,
+                           'importance_mean': valores[i_atributo].mean(), 'importance_std': valores[i_atributo].std(),
+                           'n_folds': valores.shape[1]})
+    tabela = pd.DataFrame(linhas, columns=['config', 'model', 'feature', 'importance_mean', 'importance_std', 'n_folds'])
+    return tabela.sort_values(['config', 'model', 'importance_mean'], ascending=[True, True, False]).reset_index(drop=True)
@@ -0,0 +1,157 @@
+# ==============================================================================
+# MÓDULO: LEITURA MULTITHREAD DOS CSVs DO PROJETO
+# Descrição: Leitor dedicado ao dialeto dos datasets do projeto:
+#            - separador ';' e decimal ',';
+#            - primeira coluna vazia com BOM no cabeçalho ('﻿;ID;...');
+#            - colunas vazias no fim de cada linha (';;;;').
+#            As colunas sem nome no cabeçalho são descartadas já na leitura
+#            (usecols), sem serem materializadas. O arquivo é dividido em
+#            blocos alinhados em quebras de linha e cada bloco é lido pelo
+#            parser C do pandas (que libera o GIL na tokenização e converte a
+#            vírgula decimal para float durante o parse) em uma thread. Se o
+#            pyarrow estiver instalado, usa o leitor multithread dele.
+#            Pressupõe que nenhum campo entre aspas contém quebra de linha
+#            (caso dos exports do laboratório): os blocos são divididos em
+#            '\n' sem considerar aspas.
+# ==============================================================================
+
+import io  # Cada bloco é lido de um buffer em memória.
+import mmap  # Acesso ao arquivo sem copiá-lo inteiro.
+import os  # Número de núcleos.
+from concurrent.futures import ThreadPoolExecutor  # Blocos lidos em paralelo.
+
+import numpy as np  # Arrays tipados retornados.
+import pandas as pd  # Parser C por bloco e DataFrame final.
+
+try:  # Dependência opcional: leitor CSV multithread do Arrow.
+    import pyarrow.csv as pa_csv
+except ImportError:
+    pa_csv = None
+
+SEPARADOR = ';'
+DECIMAL = ','
+_TAMANHO_MINIMO_BLOCO = 4 * 2 ** 20  # Arquivos/blocos menores que isso não compensam dividir (bytes).
+
+
+# ==============================================================================
+# SEÇÃO: FUNÇÕES AUXILIARES
+# ==============================================================================
+
+def _cabecalho(dados):
+    """
+    Lê a primeira linha e identifica as colunas com nome.
+
+    Args:
+        dados (bytes ou mmap): Conteúdo do arquivo.
+    Returns:
+        tuple: (posição do início dos dados, nomes de todas as colunas, índices das colunas com nome).
+    """
+    fim = dados.find(b'\n')
+    fim = len(dados) if fim == -1 else fim
+    linha = bytes(dados[:fim]).decode('utf-8-sig').rstrip('\r')
+    nomes = [nome.strip() for nome in linha.split(SEPARADOR)]
+    return fim + 1, nomes, [i for i, nome in enumerate(nomes) if nome]
+
+
+def _limites_blocos(dados, inicio, n_blocos):
+    """Divide [inicio, len(dados)) em até n_blocos intervalos terminados em quebra de linha."""
+    tamanho = len(dados) - inicio
+    n_blocos = max(1, min(n_blocos, tamanho // _TAMANHO_MINIMO_BLOCO))
+    limites = [inicio]
+    for k in range(1, n_blocos):
+        posicao = dados.find(b'\n', inicio + k * tamanho // n_blocos)
+        if posicao == -1:
+            break
+        if posicao + 1 > limites[-1]:
+            limites.append(posicao + 1)
+    limites.append(len(dados))
+    return list(zip(limites[:-1], limites[1:]))
+
+
+def _ler_bloco(dados, inicio, fim, indices):
+    """Lê um bloco (sem cabeçalho) apenas nas colunas `indices`."""
+    return pd.read_csv(io.BytesIO(dados[inicio:fim]), sep=SEPARADOR, decimal=DECIMAL, header=None, usecols=indices,
+                       encoding='utf-8')
+
+
+def _ler_pyarrow(path, nomes, indices, n_threads):
+    """
+    Leitura com o pyarrow (multithread, vírgula decimal convertida pelo próprio Arrow).
+
+    O pool de threads do Arrow é global ao processo: com `n_threads`, o tamanho
+    anterior é restaurado ao final da leitura.
+    """
+    from pyarrow import cpu_count, set_cpu_count
+    threads_anteriores = cpu_count()
+    if n_threads:
+        set_cpu_count(n_threads)
+    nomes_unicos = [nome if nome else f'_vazia_{i}' for i, nome in enumerate(nomes)]
+    try:
+        tabela = pa_csv.read_csv(
+            path,
+            read_options=pa_csv.ReadOptions(use_threads=True, column_names=nomes_unicos, skip_rows=1, encoding='utf-8'),
+            parse_options=pa_csv.ParseOptions(delimiter=SEPARADOR),
+            convert_options=pa_csv.ConvertOptions(decimal_point=DECIMAL,
+                                                  include_columns=[nomes_unicos[i] for i in indices]))
+    finally:
+        if n_threads:
+            set_cpu_count(threads_anteriores)
+    return {nomes[i]: tabela.column(nomes_unicos[i]).to_numpy(zero_copy_only=False) for i in indices}
+
+
+# ==============================================================================
+# SEÇÃO: LEITURA
+# ==============================================================================
+
+def read_dataset_arrays(path, n_threads=None, engine=None):
+    """
+    Lê um CSV do projeto e retorna um array tipado por coluna com nome.
+
+    Args:
+        path (str): Caminho do CSV.
+        n_threads (int, opcional): Número de threads (None = número de núcleos).
+        engine (str, opcional): 'pyarrow', 'pandas' ou None (pyarrow se instalado).
+    Returns:
+        dict: {coluna: np.ndarray} na ordem do arquivo (float64 para colunas
+              numéricas com ausentes, int64 para inteiras, object para texto).
+    """
+    if engine not in (None, 'pyarrow', 'pandas'):
+        raise ValueError(f"Engine '{engine}' não suportada. Use 'pyarrow', 'pandas' ou None.")
+    if engine == 'pyarrow' and pa_csv is None:
+        raise ImportError("engine='pyarrow' requer o pacote pyarrow.")
+    n_threads = n_threads or os.cpu_count() or 1
+
+    with open(path, 'rb') as arquivo:
+        if os.fstat(arquivo.fileno()).st_size == 0:
+            return {}
+        with mmap.mmap(arquivo.fileno(), 0, access=mmap.ACCESS_READ) as dados:
+            inicio, nomes, indices = _cabecalho(dados)
+            if engine == 'pyarrow' or (engine is None and pa_csv is not None):
+                return _ler_pyarrow(path, nomes, indices, n_threads)
+            if inicio >= len(dados):
+                return {nomes[i]: np.empty(0) for i in indices}
+            limites = _limites_blocos(dados, inicio, n_threads * 2) if n_threads > 1 else [(inicio, len(dados))]
+            if len(limites) == 1:  # Arquivo pequeno ou uma thread: leitura direta, sem cópia do bloco.
+                blocos = [pd.read_csv(path, sep=SEPARADOR, decimal=DECIMAL, header=None, skiprows=1, usecols=indices,
+                                      encoding='utf-8')]
+            else:
+                with ThreadPoolExecutor(max_workers=n_threads) as executor:
+                    blocos = list(executor.map(lambda limite: _ler_bloco(dados, *limite, indices), limites))
+    tabela = pd.concat(blocos, ignore_index=True) if len(blocos) > 1 else blocos[0]
+    return {nomes[i]: tabela[i].to_numpy() for i in indices}
+
+
+def read_dataset_csv(path, n_threads=None, engine=None):
+    """
+    Lê um CSV do projeto como DataFrame (mesmo resultado de
+    pd.read_csv(path, sep=';', decimal=',') sem as colunas sem nome e com os
+    nomes aparados), com leitura multithread.
+
+    Args:
+        path (str): Caminho do CSV.
+        n_threads (int, opcional): Número de threads (None = número de núcleos).
+        engine (str, opcional): 'pyarrow', 'pandas' ou None (pyarrow se instalado).
+    Returns:
+        pd.DataFrame: Dataset lido.
+    """
+    return pd.DataFrame(read_dataset_arrays(path, n_threads, engine), copy=False)
@@ -0,0 +1,175 @@
+# ==============================================================================
+# MÓDULO: MÉTRICAS DE AVALIAÇÃO EM UMA PASSADA
+# Descrição: Monta a matriz de confusão uma única vez (np.bincount) e deriva
+#            dela todas as métricas que os notebooks guardam em metrics_dict:
+#            F1, precisão e recall macro, a matriz de confusão e o
+#            classification_report (output_dict=True). Os valores são
+#            idênticos aos de f1_score, precision_score, recall_score,
+#            confusion_matrix e classification_report com zero_division=0,
+#            sem validar e percorrer os rótulos a cada chamada.
+# ==============================================================================
+
+import numpy as np  # Contagens e divisões vetorizadas.
+
+
+# ==============================================================================
+# SEÇÃO: FUNÇÕES AUXILIARES
+# ==============================================================================
+
+def _dividir(numerador, denominador):
+    """Divisão elemento a elemento com zero_division=0 (mesma regra do sklearn)."""
+    numerador = np.asarray(numerador, dtype=float)
+    denominador = np.asarray(denominador, dtype=float)
+    return np.divide(numerador, denominador, out=np.zeros_like(numerador), where=denominador != 0)
+
+
+def _media(valores, pesos=None):
+    """Média (ponderada) como no sklearn: pesos todos nulos equivalem a média simples."""
+    if len(valores) == 0:
+        return np.nan
+    if pesos is None or np.sum(pesos) == 0:
+        return np.mean(valores)
+    return np.average(valores, weights=pesos)
+
+
+def _matriz_confusao(y_true, y_pred, rotulos):
+    """
+    Matriz de confusão com np.bincount.
+
+    Args:
+        y_true (np.ndarray): Rótulos verdadeiros.
+        y_pred (np.ndarray): Rótulos preditos.
+        rotulos (np.ndarray): Rótulos ordenados e únicos, contendo todos os valores de y_true e y_pred.
+    Returns:
+        np.ndarray: Contagens (n_rotulos, n_rotulos), linhas = classe real, colunas = classe predita.
+    """
+    n_rotulos = len(rotulos)
+    celulas = np.searchsorted(rotulos, y_true) * n_rotulos + np.searchsorted(rotulos, y_pred)
+    return np.bincount(celulas, minlength=n_rotulos * n_rotulos).reshape(n_rotulos, n_rotulos)
+
+
+def _prf(vp, preditos, reais, average=None):
+    """
+    Precisão, recall e F1 a partir das somas por classe da matriz de confusão.
+
+    Args:
+        vp (np.ndarray): Verdadeiros positivos por classe.
+        preditos (np.ndarray): Total predito por classe (VP + FP).
+        reais (np.ndarray): Total real por classe (VP + FN, suporte).
+        average (str ou None): None, 'micro', 'macro' ou 'weighted'.
+    Returns:
+        tuple: (precisão, recall, f1), por classe (average=None) ou médias (float).
+    """
+    if average == 'micro':
+        vp, preditos, reais = np.sum(vp, keepdims=True), np.sum(preditos, keepdims=True), np.sum(reais, keepdims=True)
+    precisao = _dividir(vp, preditos)
+    recall = _dividir(vp, reais)
+    f1 = _dividir(2.0 * np.asarray(vp, dtype=float), np.asarray(reais, dtype=float) + preditos)
+    if average is None:
+        return precisao, recall, f1
+    pesos = reais if average == 'weighted' else None
+    return tuple(float(_media(valores, pesos)) for valores in (precisao, recall, f1))
+
+
+# ==============================================================================
+# SEÇÃO: MÉTRICAS
+# ==============================================================================
+
+def f1_macro_score(y_true, y_pred):
+    """
+    F1 macro igual ao f1_score(average='macro', zero_division=0), sem a validação
+    de entrada do sklearn. Usado nos laços que pontuam milhares de predições
+    (modos rápidos de HPO, importância por permutação).
+
+    Args:
+        y_true (np.ndarray): Rótulos verdadeiros.
+        y_pred (np.ndarray): Rótulos preditos.
+    Returns:
+        float: F1 macro sobre as classes presentes em y_true ou y_pred.
+    """
+    y_true, y_pred = np.asarray(y_true), np.asarray(y_pred)
+    matriz = _matriz_confusao(y_true, y_pred, np.union1d(y_true, y_pred))
+    denominador = matriz.sum(axis=0) + matriz.sum(axis=1)  # 2*VP + FP + FN por classe.
+    return float(_dividir(2.0 * np.diag(matriz), denominador).mean())
+
+
+# --- Métricas calculadas direto das predições (nome do scoring do sklearn -> função) ---
+PREDICTION_METRICS = {
+    'f1_macro': f1_macro_score,
+}
+
+
+def evaluation_metrics(y_true, y_pred, labels=None, report_labels=None, target_names=None):
+    """
+    Todas as métricas de metrics_dict a partir de uma única matriz de confusão.
+
+    Equivale a:
+        f1_score / precision_score / recall_score(y_true, y_pred, average='macro', zero_division=0)
+        confusion_matrix(y_true, y_pred, labels=labels)
+        classification_report(y_true, y_pred, labels=report_labels, target_names=target_names,
+                              output_dict=True, zero_division=0)
+
+    Args:
+        y_true (array-like): Rótulos verdadeiros codificados.
+        y_pred (array-like): Rótulos preditos codificados.
+        labels (array-like, opcional): Rótulos da matriz de confusão retornada
+            (None = rótulos presentes em y_true ou y_pred).
+        report_labels (array-like, opcional): Rótulos do classification_report
+            (None = rótulos presentes em y_true ou y_pred).
+        target_names (array-like, opcional): Nomes das classes do report, na ordem de report_labels.
+    Returns:
+        dict: Chaves 'f1_macro', 'precision_macro', 'recall_macro', 'confusion_matrix' e 'report_dict'.
+    """
+    y_true, y_pred = np.asarray(y_true), np.asarray(y_pred)
+    presentes = np.union1d(y_true, y_pred)
+
+    # --- Matriz de confusão única, sobre todos os rótulos necessários ---
+    todos = presentes
+    for extra in (labels, report_labels):
+        if extra is not None:
+            todos = np.union1d(todos, extra)
+    matriz = _matriz_confusao(y_true, y_pred, todos)
+    vp, preditos, reais = np.diag(matriz), matriz.sum(axis=0), matriz.sum(axis=1)
+
+    def posicoes(rotulos):
+        return np.searchsorted(todos, rotulos)
+
+    # --- Médias macro (f1_score & cia. consideram apenas os rótulos presentes) ---
+    idx_presentes = posicoes(presentes)
+    precision_macro, recall_macro, f1_macro = _prf(vp[idx_presentes], preditos[idx_presentes], reais[idx_presentes], 'macro')
+
+    # --- Matriz de confusão nos rótulos pedidos ---
+    idx_cm = posicoes(presentes if labels is None else np.asarray(labels))
+    confusion_matrix = matriz[np.ix_(idx_cm, idx_cm)]
+
+    # --- classification_report(output_dict=True) ---
+    labels_given = report_labels is not None
+    rotulos_report = np.asarray(report_labels) if labels_given else presentes
+    if target_names is not None and len(rotulos_report) != len(target_names) and not labels_given:
+        raise ValueError(f"Number of classes, {len(rotulos_report)}, does not match size of target_names, "
+                         f"{len(target_names)}. Try specifying the labels parameter")
+    if target_names is None:
+        target_names = ["%s" % rotulo for rotulo in rotulos_report]
+    idx_report = posicoes(rotulos_report)
+    vp_r, preditos_r, reais_r = vp[idx_report], preditos[idx_report], reais[idx_report]
+
+    report_dict = {}
+    precisao, recall, f1 = _prf(vp_r, preditos_r, reais_r)
+    for nome, p, r, f, s in zip(target_names, precisao, recall, f1, reais_r):
+        report_dict[nome] = {'precision': float(p), 'recall': float(r), 'f1-score': float(f), 'support': float(s)}
+    micro_is_accuracy = not labels_given or set(rotulos_report) >= set(presentes)
+    suporte_total = float(np.sum(reais_r))
+    for average in ('micro', 'macro', 'weighted'):
+        p, r, f = _prf(vp_r, preditos_r, reais_r, average)
+        titulo = 'accuracy' if average == 'micro' and micro_is_accuracy else f'{average} avg'
+        report_dict[titulo] = {'precision': p, 'recall': r, 'f1-score': f, 'support': suporte_total}
+    if 'accuracy' in report_dict:
+        report_dict['accuracy'] = report_dict['accuracy']['precision']
+
+    return {
+        'f1_macro': f1_macro,
+        'precision_macro': precision_macro,
+        'recall_macro': recall_macro,
+        'report_dict': report_dict,
+        'confusion_matrix': confusion_matrix,
+    }
@@ -0,0 +1,521 @@
+# ==============================================================================
+# MÓDULO: MONITOR DE DERIVA DAS NOVAS AMOSTRAS DE SOLO
+# Descrição: Compara as amostras que chegam do laboratório com a distribuição
+#            do dataset de treino, para decidir quando o retreinamento (nested
+#            CV completo, caro) é de fato necessário em vez de retreinar por
+#            calendário.
+#            - Perfil do treino (build_training_profile), salvo em JSON: por
+#              atributo, momentos (contagem, média, desvio, mínimo, máximo) e
+#              um esboço de quantis (bordas dos decis do treino e a fração de
+#              linhas em cada faixa); os mesmos momentos por classe; e o
+#              histograma da pontuação pelas regras do milho.
+#            - Monitor (DriftMonitor): estatísticas acumuladas das novas
+#              amostras, atualizadas em O(1) por amostra em relação ao
+#              histórico (média e variância de Welford/Chan, contagens por
+#              faixa de quantil, contagem fora da faixa do treino). O relatório
+#              marca os atributos que passam dos limites: deslocamento da média
+#              (em desvios do treino), razão dos desvios, PSI (population
+#              stability index, com suavização de Laplace) das faixas de
+#              quantil e fração fora da faixa. Cada critério só marca quando,
+#              além do tamanho do efeito, o teste correspondente rejeita a
+#              mesma distribuição (p < p_value com correção de Bonferroni):
+#              z de Welch na média, z do log da variância ajustado pela
+#              curtose do treino, qui-quadrado de homogeneidade nas faixas e
+#              binomial na fração fora da faixa. Com poucas amostras os
+#              estimadores oscilam muito; sem o teste, lotes da própria
+#              distribuição do treino seriam marcados quase sempre.
+#            A classe das novas amostras, quando não informada, vem da própria
+#            pontuação pelas regras (mesmas faixas das classes do projeto).
+#            Os atributos são comparados em unidades originais (CSV bruto).
+#
+# Uso:
+#   python monitor_deriva.py profile Dataset_OriginalComClass.csv perfil_treinamento.json
+#   python monitor_deriva.py check perfil_treinamento.json novas_amostras.csv   # Código de saída 1 = retreinar.
+# ==============================================================================
+
+import argparse  # Parâmetros de linha de comando.
+import json  # Persistência do perfil do treino.
+import sys  # Código de saída da verificação.
+import warnings  # Colunas sem valores nas estatísticas por classe.
+
+import numpy as np  # Estatísticas acumuladas.
+import pandas as pd  # Entrada em DataFrame e relatório.
+from scipy.special import bdtrc, chdtrc, ndtr  # Caudas binomial, qui-quadrado e normal (sem importar scipy.stats).
+
+from regras_milho import CRITERIOS_MILHO, FAIXAS_PONTUACAO_MILHO, rule_scores  # Pontuação e classes pelas regras.
+
+# --- Limites padrão para marcar deriva (um atributo é marcado se passar de qualquer um) ---
+DEFAULT_DRIFT_LIMITS = {
+    'mean_shift': 0.5,  # |média nova - média do treino| em desvios padrão do treino.
+    'std_ratio': 2.0,  # Desvio novo / desvio do treino acima disso (ou abaixo do inverso).
+    'psi': 0.25,  # PSI das faixas de quantil (> 0,25 é a convenção usual de mudança relevante).
+    'out_of_range': 0.05,  # Fração de valores fora do [mínimo, máximo] do treino.
+    'p_value': 0.01,  # Nível dos testes, dividido pelo número de linhas do relatório (Bonferroni).
+}
+_AMOSTRAS_POR_FAIXA = 10  # O PSI/qui-quadrado só marca com pelo menos 10 valores por faixa, em média.
+
+
+# ==============================================================================
+# SEÇÃO: FUNÇÕES AUXILIARES
+# ==============================================================================
+
+def score_classes(scores, class_score_ranges=FAIXAS_PONTUACAO_MILHO):
+    """
+    Classe de cada pontuação pelas faixas do projeto (como o mapa_pontuacao_classe do gerador).
+
+    Args:
+        scores (np.ndarray): Pontuação pelas regras.
+        class_score_ranges (dict): {classe: (pontuação mínima, pontuação máxima)}.
+    Returns:
+        np.ndarray: Nome da classe de cada linha (None fora de todas as faixas).
+    """
+    scores = np.asarray(scores)
+    condicoes = [(scores >= minimo) & (scores <= maximo) for minimo, maximo in class_score_ranges.values()]
+    return np.select(condicoes, list(class_score_ranges), default=None).astype(object)
+
+
+def _momentos(X):
+    """
+    Contagem, média, desvio (ddof=1, como o pandas), mínimo, máximo e curtose
+    (não excessiva, m4 / m2²) de cada coluna, ignorando NaN.
+    """
+    contagem = (~np.isnan(X)).sum(axis=0)
+    with warnings.catch_warnings(), np.errstate(invalid='ignore', divide='ignore'):
+        warnings.simplefilter('ignore', RuntimeWarning)  # Colunas sem valores: estatísticas NaN.
+        desvios = X - np.nanmean(X, axis=0)
+        curtose = np.nanmean(desvios ** 4, axis=0) / np.nanmean(desvios ** 2, axis=0) ** 2
+        return {'count': contagem.tolist(), 'mean': np.nanmean(X, axis=0).tolist(),
+                'std': np.nanstd(X, axis=0, ddof=1).tolist(), 'min': np.nanmin(X, axis=0).tolist(),
+                'max': np.nanmax(X, axis=0).tolist(), 'kurtosis': curtose.tolist()}
+
+
+def _psi(contagens, frequencias_treino, n_treino):
+    """
+    PSI e p-valor do qui-quadrado de homogeneidade entre as contagens novas e as do treino (mesmas faixas).
+
+    As frações dos dois lados recebem suavização de Laplace (+1 por faixa), o
+    que evita log(0) sem o piso arbitrário que inflava o PSI de faixas vazias.
+
+    Returns:
+        tuple: (PSI, p-valor); NaN sem amostras novas.
+    """
+    contagens = np.asarray(contagens, dtype=float)
+    total, n_faixas = contagens.sum(), len(contagens)
+    if total == 0 or n_treino == 0:
+        return np.nan, np.nan
+    treino = np.asarray(frequencias_treino, dtype=float) * n_treino
+    novas_suav = (contagens + 1) / (total + n_faixas)
+    treino_suav = (treino + 1) / (n_treino + n_faixas)
+    psi = float(np.sum((novas_suav - treino_suav) * np.log(novas_suav / treino_suav)))
+
+    # --- Qui-quadrado de homogeneidade (tabela 2 x faixas), ignorando faixas vazias nos dois lados ---
+    colunas = (contagens + treino) > 0
+    if colunas.sum() < 2:
+        return psi, 1.0
+    tabela = np.vstack([contagens[colunas], treino[colunas]])
+    esperado = tabela.sum(axis=1, keepdims=True) * tabela.sum(axis=0) / tabela.sum()
+    estatistica = float(((tabela - esperado) ** 2 / esperado).sum())
+    return psi, float(chdtrc(colunas.sum() - 1, estatistica))
+
+
+def _p_normal(z):
+    """P(|Z| >= z) da normal padrão (NaN propagado)."""
+    return float(2 * ndtr(-abs(z))) if not np.isnan(z) else np.nan
+
+
+def _p_media(media, media_treino, dp, dp_treino, n, n_treino):
+    """p-valor do z de Welch para a diferença das médias."""
+    if n < 2 or n_treino < 2 or np.isnan(dp_treino):
+        return np.nan
+    erro = np.sqrt(dp_treino ** 2 / n_treino + dp ** 2 / n)
+    if erro == 0:
+        return 1.0 if media == media_treino else 0.0
+    return _p_normal((media - media_treino) / erro)
+
+
+def _p_variancia(dp, dp_treino, curtose_treino, n, n_treino):
+    """
+    p-valor da razão das variâncias pelo z de log(s² / s²_treino), com
+    Var(log s²) ≈ (curtose - 1) / n; a curtose do treino corrige as caudas
+    pesadas dos atributos em ppm (o teste F supõe normalidade).
+    """
+    if n < 2 or n_treino < 2 or not dp > 0 or not dp_treino > 0:
+        return np.nan
+    curtose = curtose_treino if curtose_treino is not None and np.isfinite(curtose_treino) else 3.0
+    variancia_log = max(curtose - 1, 1e-12) * (1 / n + 1 / n_treino)
+    return _p_normal(np.log(dp ** 2 / dp_treino ** 2) / np.sqrt(variancia_log))
+
+
+def _p_fora_faixa(n_fora, n, n_treino):
+    """
+    P(pelo menos n_fora de n valores fora da faixa do treino) se vierem da mesma
+    distribuição contínua: cada valor novo cai fora do [mínimo, máximo] de
+    n_treino valores com probabilidade 2 / (n_treino + 1).
+    """
+    if n == 0 or n_treino == 0:
+        return np.nan
+    return 1.0 if n_fora == 0 else float(bdtrc(n_fora - 1, n, min(2 / (n_treino + 1), 1.0)))
+
+
+def _matriz(data, features):
+    """Converte amostras (DataFrame, dict/Series de uma amostra ou array na ordem de features) em array float."""
+    if isinstance(data, pd.DataFrame):
+        return data.reindex(columns=features).to_numpy(dtype=float)
+    if isinstance(data, (dict, pd.Series)):
+        return np.array([[data.get(coluna, np.nan) for coluna in features]], dtype=float)
+    return np.atleast_2d(np.asarray(data, dtype=float))
+
+
+# ==============================================================================
+# SEÇÃO: PERFIL DO TREINO
+# ==============================================================================
+
+def build_training_profile(df, features=None, target=None, criteria=CRITERIOS_MILHO,
+                           class_score_ranges=FAIXAS_PONTUACAO_MILHO, n_bins=10):
+    """
+    Resumo da distribuição do treino usado como referência pelo DriftMonitor.
+
+    Args:
+        df (pd.DataFrame): Dataset de treino em unidades originais.
+        features (list, opcional): Atributos monitorados (padrão: colunas numéricas exceto ID e target).
+        target (str, opcional): Coluna da classe; se None, a classe vem da pontuação pelas regras.
+        criteria (dict): Critérios da pontuação ({coluna: (mínimo, máximo)}).
+        class_score_ranges (dict): Faixas de pontuação de cada classe.
+        n_bins (int): Faixas do esboço de quantis (10 = decis).
+    Returns:
+        dict: Perfil serializável em JSON (ver save_profile).
+    """
+    if features is None:
+        features = [coluna for coluna in df.select_dtypes(include=np.number).columns if coluna not in ('ID', target)]
+    features = list(features)
+    X = df[features].to_numpy(dtype=float)
+    pontuacoes = rule_scores(X, features, criteria)
+    classes = df[target].astype(str).to_numpy(dtype=object) if target else score_classes(pontuacoes, class_score_ranges)
+    n_pontuacoes = len(criteria) + 1
+
+    bordas, frequencias = [], []
+    for j in range(len(features)):
+        valores = X[~np.isnan(X[:, j]), j]
+        if len(valores) == 0:
+            bordas.append([])
+            frequencias.append([1.0])
+            continue
+        # Bordas internas (quantis 1/n_bins ... (n_bins-1)/n_bins), sem repetições em atributos discretos.
+        internas = np.unique(np.quantile(valores, np.arange(1, n_bins) / n_bins))
+        contagens = np.bincount(np.searchsorted(internas, valores, side='right'), minlength=len(internas) + 1)
+        bordas.append(internas.tolist())
+        frequencias.append((contagens / len(valores)).tolist())
+
+    por_classe = {}
+    for classe in pd.unique(classes):
+        if classe is None:
+            continue
+        linhas = classes == classe
+        por_classe[str(classe)] = {
+            'n_samples': int(linhas.sum()), 'moments': _momentos(X[linhas]),
+            'rule_score_freq': (np.bincount(pontuacoes[linhas], minlength=n_pontuacoes) / linhas.sum()).tolist()}
+
+    return {'features': features, 'n_samples': len(X), 'target': target,
+            'criteria': {coluna: list(faixa) for coluna, faixa in criteria.items()},
+            'class_score_ranges': {classe: list(faixa) for classe, faixa in class_score_ranges.items()},
+            'moments': _momentos(X), 'quantile_edges': bordas, 'bin_freq': frequencias,
+            'rule_score_freq': (np.bincount(pontuacoes, minlength=n_pontuacoes) / max(len(X), 1)).tolist(),
+            'classes': por_classe}
+
+
+def save_profile(profile, path):
+    """Salva o perfil do treino em JSON e retorna o caminho."""
+    with open(path, 'w', encoding='utf-8') as arquivo:
+        json.dump(profile, arquivo, ensure_ascii=False, indent=1)  # NaN/Infinity: extensões aceitas pelo json do Python.
+    return path
+
+
+def load_profile(path):
+    """Lê um perfil salvo por save_profile."""
+    with open(path, encoding='utf-8') as arquivo:
+        return json.load(arquivo)
+
+
+# ==============================================================================
+# SEÇÃO: MONITOR DAS NOVAS AMOSTRAS
+# ==============================================================================
+
+class _Acumulador:
+    """Contagem, média, soma dos quadrados dos desvios (M2), mínimo e máximo por coluna, combináveis por lote."""
+
+    __slots__ = ('count', 'mean', 'm2', 'min', 'max')
+
+    def __init__(self, n_colunas):
+        self.count = np.zeros(n_colunas)
+        self.mean = np.zeros(n_colunas)
+        self.m2 = np.zeros(n_colunas)
+        self.min = np.full(n_colunas, np.inf)
+        self.max = np.full(n_colunas, -np.inf)
+
+    def update(self, X):
+        """Combina um lote (linhas de X, NaN ignorado) com o acumulado (fórmula de Chan): custo só do lote."""
+        validos = ~np.isnan(X)
+        n_lote = validos.sum(axis=0)
+        if not n_lote.any():
+            return
+        with np.errstate(invalid='ignore', divide='ignore'):
+            media_lote = np.where(validos, X, 0.0).sum(axis=0) / n_lote
+            m2_lote = np.where(validos, X - media_lote, 0.0) ** 2
+            total = self.count + n_lote
+            delta = np.nan_to_num(media_lote - self.mean)
+            self.mean = np.where(n_lote > 0, self.mean + delta * n_lote / total, self.mean)
+            self.m2 = self.m2 + m2_lote.sum(axis=0) + np.where(n_lote > 0, delta ** 2 * self.count * n_lote / total, 0.0)
+        self.count = total
+        self.min = np.fmin(self.min, np.where(validos, X, np.inf).min(axis=0))
+        self.max = np.fmax(self.max, np.where(validos, X, -np.inf).max(axis=0))
+
+    def std(self):
+        """Desvio padrão amostral (ddof=1); NaN com menos de 2 valores."""
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return np.where(self.count > 1, np.sqrt(self.m2 / (self.count - 1)), np.nan)
+
+
+class DriftMonitor:
+    """
+    Estatísticas acumuladas das novas amostras comparadas ao perfil do treino.
+
+    Cada amostra (ou lote) atualiza contadores de tamanho fixo; o custo por
+    amostra não depende de quantas já foram vistas e nada é guardado além dos
+    contadores. As amostras sem classe informada recebem a classe da pontuação
+    pelas regras.
+
+    Args:
+        profile (dict): Perfil do treino (build_training_profile ou load_profile).
+        limits (dict, opcional): Limites que substituem os de DEFAULT_DRIFT_LIMITS.
+        min_samples (int): Valores novos mínimos de um atributo (ou classe) para marcá-lo com deriva.
+    """
+
+    def __init__(self, profile, limits=None, min_samples=30):
+        self.profile = profile
+        self.features = list(profile['features'])
+        self.limits = {**DEFAULT_DRIFT_LIMITS, **(limits or {})}
+        self.min_samples = min_samples
+        self._criterios = {coluna: tuple(faixa) for coluna, faixa in profile['criteria'].items()}
+        self._faixas_classes = {classe: tuple(faixa) for classe, faixa in profile['class_score_ranges'].items()}
+        self._bordas = [np.asarray(bordas, dtype=float) for bordas in profile['quantile_edges']]
+        momentos = profile['moments']
+        self._min_treino = np.asarray(momentos['min'], dtype=float)
+        self._max_treino = np.asarray(momentos['max'], dtype=float)
+        self.reset()
+
+    def reset(self):
+        """Descarta as amostras acumuladas (ex: após um retreinamento com o perfil novo)."""
+        n_atributos = len(self.features)
+        self.n_samples = 0
+        self._geral = _Acumulador(n_atributos)
+        self._classes = {}
+        self._contagens_faixas = [np.zeros(len(bordas) + 1, dtype=np.int64) for bordas in self._bordas]
+        self._fora_faixa = np.zeros(n_atributos, dtype=np.int64)
+        self._contagens_pontuacao = np.zeros(len(self.profile['rule_score_freq']), dtype=np.int64)
+        self._contagens_classes = {}
+
+    def update(self, sample, label=None):
+        """
+        Acrescenta uma amostra.
+
+        Args:
+            sample (dict, pd.Series ou array): Valores dos atributos (ausentes = NaN).
+            label (str, opcional): Classe da amostra (padrão: pela pontuação das regras).
+        """
+        self.update_batch(_matriz(sample, self.features), None if label is None else [label])
+
+    def update_batch(self, data, labels=None):
+        """
+        Acrescenta um lote de amostras (mesmo resultado que update() linha a linha).
+
+        Args:
+            data (pd.DataFrame ou np.ndarray): Amostras (array na ordem de self.features).
+            labels (array-like, opcional): Classe de cada amostra (padrão: pela pontuação das regras).
+        """
+        X = _matriz(data, self.features)
+        if len(X) == 0:
+            return
+        pontuacoes = rule_scores(X, self.features, self._criterios)
+        classes = (np.asarray(labels, dtype=object).astype(str) if labels is not None
+                   else score_classes(pontuacoes, self._faixas_classes))
+        self._geral.update(X)
+        for classe in pd.unique(classes):
+            if classe is None:
+                continue
+            linhas = classes == classe
+            self._classes.setdefault(classe, _Acumulador(len(self.features))).update(X[linhas])
+            self._contagens_classes[classe] = self._contagens_classes.get(classe, 0) + int(linhas.sum())
+        for j, bordas in enumerate(self._bordas):
+            valores = X[~np.isnan(X[:, j]), j]
+            self._contagens_faixas[j] += np.bincount(np.searchsorted(bordas, valores, side='right'),
+                                                     minlength=len(bordas) + 1)
+            self._fora_faixa[j] += int(((valores < self._min_treino[j]) | (valores > self._max_treino[j])).sum())
+        self._contagens_pontuacao += np.bincount(np.minimum(pontuacoes, len(self._contagens_pontuacao) - 1),
+                                                 minlength=len(self._contagens_pontuacao))
+        self.n_samples += len(X)
+
+    # --------------------------------------------------------------------------
+    # Relatórios
+    # --------------------------------------------------------------------------
+
+    def _marcar(self, linha, alfa):
+        """
+        Preenche 'drift' e 'reasons' de uma linha do relatório: cada critério
+        marca se o efeito passa do limite e o p-valor do seu teste fica abaixo de `alfa`.
+        """
+        motivos = []
+        if linha['n'] >= self.min_samples:  # Valores do atributo (ou da classe) observados.
+            razao, limite_razao = linha['std_ratio'], self.limits['std_ratio']
+            criterios = {
+                'mean_shift': (linha['mean_shift'] > self.limits['mean_shift'], linha['mean_pvalue']),
+                'std_ratio': (razao > limite_razao or razao < 1 / limite_razao, linha['std_pvalue']),
+                'psi': (linha['psi'] > self.limits['psi'] and linha['n'] >= _AMOSTRAS_POR_FAIXA * linha['n_bins'],
+                        linha['psi_pvalue']),
+                'out_of_range': (linha['out_of_range'] > self.limits['out_of_range'], linha['out_of_range_pvalue']),
+            }
+            motivos = [nome for nome, (efeito, p_valor) in criterios.items() if efeito and p_valor < alfa]
+        linha['drift'], linha['reasons'] = bool(motivos), ','.join(motivos)
+        return linha
+
+    def _linha(self, nome, n, momentos, j, media, dp, contagens=None, frequencias=None, n_fora=None):
+        """Linha do relatório (efeitos e p-valores) de um atributo com os momentos do treino `momentos`."""
+        n_treino = momentos['count'][j]
+        media_treino, dp_treino = momentos['mean'][j], momentos['std'][j]
+        curtose = momentos.get('kurtosis', [None] * (j + 1))[j]  # Perfis antigos, sem curtose: normal.
+        with np.errstate(invalid='ignore', divide='ignore'):
+            razao = dp / dp_treino
+        psi, p_psi = _psi(contagens, frequencias, n_treino) if contagens is not None else (np.nan, np.nan)
+        return {'feature': nome, 'n': n, 'train_mean': media_treino, 'mean': media, 'train_std': dp_treino, 'std': dp,
+                'mean_shift': self._deslocamento(media, media_treino, dp_treino), 'std_ratio': razao, 'psi': psi,
+                'out_of_range': n_fora / n if n and n_fora is not None else np.nan,
+                'mean_pvalue': _p_media(media, media_treino, dp, dp_treino, n, n_treino),
+                'std_pvalue': _p_variancia(dp, dp_treino, curtose, n, n_treino), 'psi_pvalue': p_psi,
+                'out_of_range_pvalue': _p_fora_faixa(n_fora, n, n_treino) if n_fora is not None else np.nan,
+                'n_bins': len(contagens) if contagens is not None else 0}
+
+    @staticmethod
+    def _deslocamento(media, media_treino, dp_treino):
+        """|média - média do treino| em desvios do treino (desvio nulo: 0 se iguais, inf se diferentes)."""
+        diferenca = abs(media - media_treino)
+        if np.isnan(dp_treino):  # Menos de 2 valores no treino (ex: classe rara): sem referência de dispersão.
+            return np.nan
+        if dp_treino <= 0:
+            return 0.0 if diferenca == 0 else (np.nan if np.isnan(diferenca) else np.inf)
+        return diferenca / dp_treino
+
+    def report(self):
+        """
+        Comparação das novas amostras com o treino, por atributo.
+
+        Além dos atributos, inclui as linhas 'rule_score' (pontuação pelas regras)
+        e 'class_share' (proporção das classes; apenas PSI).
+
+        Returns:
+            pd.DataFrame: Colunas feature, n, train_mean, mean, train_std, std,
+                          mean_shift, std_ratio, psi, out_of_range, os p-valores
+                          (mean_pvalue, std_pvalue, psi_pvalue, out_of_range_pvalue),
+                          drift e reasons.
+        """
+        momentos = self.profile['moments']
+        desvios = self._geral.std()
+        linhas = []
+        for j, atributo in enumerate(self.features):
+            n = int(self._geral.count[j])
+            linhas.append(self._linha(atributo, n, momentos, j, self._geral.mean[j] if n else np.nan, desvios[j],
+                                      self._contagens_faixas[j], self.profile['bin_freq'][j], self._fora_faixa[j]))
+
+        # --- Pontuação pelas regras: momentos calculados dos histogramas ---
+        niveis = np.arange(len(self._contagens_pontuacao))
+        freq_treino = np.asarray(self.profile['rule_score_freq'])
+        media_treino = float(niveis @ freq_treino)
+        dp_treino = float(np.sqrt(freq_treino @ (niveis - media_treino) ** 2))
+        curtose_treino = float(freq_treino @ (niveis - media_treino) ** 4 / dp_treino ** 4) if dp_treino > 0 else np.nan
+        n = int(self._contagens_pontuacao.sum())
+        media = float(niveis @ self._contagens_pontuacao / n) if n else np.nan
+        dp = float(np.sqrt(self._contagens_pontuacao @ (niveis - media) ** 2 / n)) if n else np.nan
+        momentos_pontuacao = {'count': [self.profile['n_samples']], 'mean': [media_treino], 'std': [dp_treino],
+                              'kurtosis': [curtose_treino]}
+        linhas.append(self._linha('rule_score', n, momentos_pontuacao, 0, media, dp, self._contagens_pontuacao,
+                                  freq_treino))
+
+        # --- Proporção das classes (deriva da distribuição a priori) ---
+        classes = list(self.profile['classes'])
+        contagens = np.array([self._contagens_classes.get(classe, 0) for classe in classes])
+        freq_classes = np.array([self.profile['classes'][c]['n_samples'] for c in classes]) / max(self.profile['n_samples'], 1)
+        psi, p_psi = _psi(contagens, freq_classes, self.profile['n_samples']) if classes else (np.nan, np.nan)
+        linhas.append({'feature': 'class_share', 'n': int(contagens.sum()), 'train_mean': np.nan, 'mean': np.nan,
+                       'train_std': np.nan, 'std': np.nan, 'mean_shift': np.nan, 'std_ratio': np.nan, 'psi': psi,
+                       'out_of_range': np.nan, 'mean_pvalue': np.nan, 'std_pvalue': np.nan, 'psi_pvalue': p_psi,
+                       'out_of_range_pvalue': np.nan, 'n_bins': len(classes)})
+        alfa = self.limits['p_value'] / len(linhas)
+        return pd.DataFrame([self._marcar(linha, alfa) for linha in linhas]).drop(columns='n_bins')
+
+    def class_report(self):
+        """
+        Comparação dos momentos por classe (deslocamento da média e razão dos desvios).
+
+        Returns:
+            pd.DataFrame: Colunas class, feature, n, train_mean, mean, mean_shift, std_ratio,
+                          mean_pvalue, std_pvalue, drift, reasons.
+        """
+        colunas = ['class', 'feature', 'n', 'train_mean', 'mean', 'mean_shift', 'std_ratio', 'mean_pvalue',
+                   'std_pvalue', 'drift', 'reasons']
+        linhas = []
+        for classe, acumulador in self._classes.items():
+            perfil_classe = self.profile['classes'].get(classe)
+            if perfil_classe is None:  # Classe sem amostras no treino.
+                continue
+            desvios = acumulador.std()
+            for j, atributo in enumerate(self.features):
+                n = int(acumulador.count[j])
+                linha = self._linha(atributo, n, perfil_classe['moments'], j, acumulador.mean[j] if n else np.nan,
+                                    desvios[j])
+                linhas.append({'class': classe, **linha})
+        alfa = self.limits['p_value'] / max(len(linhas), 1)
+        return pd.DataFrame([self._marcar(linha, alfa) for linha in linhas], columns=colunas)
+
+    def drifted_features(self):
+        """Atributos (e 'rule_score'/'class_share') marcados com deriva no relatório atual."""
+        relatorio = self.report()
+        return relatorio.loc[relatorio['drift'], 'feature'].tolist()
+
+    def needs_retraining(self):
+        """True se há amostras suficientes e algum atributo passou dos limites."""
+        return self.n_samples >= self.min_samples and bool(self.drifted_features())
+
+
+# ==============================================================================
+# SEÇÃO: EXECUÇÃO PELA LINHA DE COMANDO
+# ==============================================================================
+
+if __name__ == '__main__':
+    from leitura_csv import read_dataset_csv  # Leitura dos CSVs do projeto (';' e ',' decimal).
+
+    parser = argparse.ArgumentParser(description="Monitor de deriva das novas amostras em relação ao treino.")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    perfil = subparsers.add_parser('profile', help="Gera o perfil do treino a partir de um CSV em unidades originais.")
+    perfil.add_argument('dataset')
+    perfil.add_argument('output')
+    perfil.add_argument('--target', help="Coluna da classe (padrão: classe pela pontuação das regras).")
+    perfil.add_argument('--n-bins', type=int, default=10)
+    verificacao = subparsers.add_parser('check', help="Compara um CSV de novas amostras com o perfil do treino.")
+    verificacao.add_argument('profile')
+    verificacao.add_argument('samples')
+    verificacao.add_argument('--min-samples', type=int, default=30)
+    for limite, valor in DEFAULT_DRIFT_LIMITS.items():
+        verificacao.add_argument(f"--{limite.replace('_', '-')}", type=float, default=valor, dest=limite)
+    args = parser.parse_args()
+
+    if args.command == 'profile':
+        treino = read_dataset_csv(args.dataset).dropna(axis='columns', how='all')
+        print(f"Perfil salvo em: {save_profile(build_training_profile(treino, target=args.target, n_bins=args.n_bins), args.output)}")
+    else:
+        monitor = DriftMonitor(load_profile(args.profile), min_samples=args.min_samples,
+                               limits={limite: getattr(args, limite) for limite in DEFAULT_DRIFT_LIMITS})
+        monitor.update_batch(read_dataset_csv(args.samples))
+        with pd.option_context('display.width', 200, 'display.max_columns', None):
+            print(monitor.report().round(3).to_string(index=False))
+        retreinar = monitor.needs_retraining()
+        print(f"\n{monitor.n_samples} amostras novas. " + ("Deriva acima dos limites: retreinamento recomendado." if retreinar
+                                                          else "Nenhuma deriva acima dos limites."))
+        sys.exit(1 if retreinar else 0)
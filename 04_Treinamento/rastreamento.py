@@ -0,0 +1,252 @@
+# ==============================================================================
+# MÓDULO: RASTREAMENTO DE TEMPO E MEMÓRIA POR ETAPA
+# Descrição: Camada leve de instrumentação para scripts e notebooks. Cada etapa
+#            nomeada (carga de dados, cada regra de validação, geração por
+#            classe, cada HPO (scaler, fold, modelo), cada gráfico) registra
+#            tempo de relógio, tempo de CPU e pico de memória alocada
+#            (tracemalloc). As etapas podem ser aninhadas e são exportadas como
+#            trace no formato Chrome Trace Event (abre no chrome://tracing ou no
+#            https://ui.perfetto.dev). Desativado, o custo é um teste de flag.
+#
+# Uso:
+#   from rastreamento import TRACER, traced
+#   TRACER.enable()                      # Ou variável de ambiente TRACE_ETAPAS=1.
+#   with TRACER.stage('hpo', scaler='STD', fold=0, model='SVM'):
+#       rs.fit(X, y)
+#   @traced()                            # Decorator: uma etapa por chamada.
+#   def boxplot_metric(...): ...
+#   TRACER.begin('carga'); ...; TRACER.end()   # Para código no nível do módulo (scripts).
+#   TRACER.export_chrome_trace('trace.json')
+#
+# Com TRACE_ETAPAS=1 o trace começa no início do processo: a primeira etapa
+# aberta gera antes uma etapa 'startup' (importações e inicialização até o
+# primeiro trabalho útil).
+# ==============================================================================
+
+import functools  # Decorator que preserva o nome da função.
+import json  # Exportação do trace.
+import os  # PID do trace e variável de ambiente.
+import threading  # Pilha de etapas por thread.
+import time  # Relógio e tempo de CPU.
+import tracemalloc  # Pico de memória alocada.
+from contextlib import nullcontext  # Contexto vazio quando desativado.
+
+_CONTEXTO_NULO = nullcontext()  # Reaproveitado: nenhuma alocação por etapa quando desativado.
+_IMPORTACAO_NS = time.perf_counter_ns()  # Referência quando o início do processo não está disponível.
+
+
+def process_uptime():
+    """
+    Tempo decorrido desde o início do processo.
+
+    Lê /proc/self/stat (Linux). Nos demais sistemas, conta a partir da importação
+    deste módulo (subestima o tempo das importações anteriores).
+
+    Returns:
+        float: Segundos desde o início do processo.
+    """
+    try:
+        with open('/proc/self/stat', encoding='ascii') as arquivo:
+            campos = arquivo.read().rsplit(')', 1)[1].split()  # O nome do processo pode conter espaços.
+        inicio_s = int(campos[19]) / os.sysconf('SC_CLK_TCK')  # Campo 22 (starttime), em ticks desde o boot.
+        with open('/proc/uptime', encoding='ascii') as arquivo:
+            return max(float(arquivo.read().split()[0]) - inicio_s, 0.0)
+    except (OSError, ValueError, IndexError, AttributeError):
+        return (time.perf_counter_ns() - _IMPORTACAO_NS) / 1e9
+
+
+class _Etapa:
+    """Context manager de uma etapa ativa."""
+
+    __slots__ = ('tracer', 'name', 'args')
+
+    def __init__(self, tracer, name, args):
+        self.tracer, self.name, self.args = tracer, name, args
+
+    def __enter__(self):
+        self.tracer.begin(self.name, **self.args)
+        return self
+
+    def __exit__(self, *exc):
+        self.tracer.end()
+        return False
+
+
+class Tracer:
+    """
+    Registro de etapas (tempo de relógio, tempo de CPU, pico de memória).
+
+    O pico de memória de uma etapa é o maior volume alocado durante ela, acima do
+    que já estava alocado no início (inclui as etapas internas). O tracemalloc é
+    global ao processo: com threads, os picos de etapas simultâneas se misturam.
+    Processos filhos (joblib n_jobs=-1) não são rastreados.
+
+    Args:
+        enabled (bool): Começa ativado.
+        memory (bool): Mede o pico de memória (tracemalloc deixa o Python mais lento).
+    """
+
+    def __init__(self, enabled=False, memory=True):
+        self.enabled = False
+        self.memory = memory
+        self.events = []
+        self._local = threading.local()
+        self._origem_ns = time.perf_counter_ns()
+        self._inicio_processo_ns = None  # Pendente até a primeira etapa (etapa 'startup').
+        self._iniciou_tracemalloc = False
+        if enabled:  # Ativado desde o início (TRACE_ETAPAS=1): mede também a inicialização.
+            self._inicio_processo_ns = self._origem_ns = self._origem_ns - int(process_uptime() * 1e9)
+            self.enable(memory)
+
+    # --------------------------------------------------------------------------
+    # Ativação
+    # --------------------------------------------------------------------------
+
+    def enable(self, memory=None):
+        """Ativa o rastreamento (e o tracemalloc, se memory=True)."""
+        if memory is not None:
+            self.memory = memory
+        if self.memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._iniciou_tracemalloc = True
+        self.enabled = True
+
+    def disable(self):
+        """Desativa o rastreamento (os eventos já registrados são mantidos)."""
+        self.enabled = False
+        if self._iniciou_tracemalloc:
+            tracemalloc.stop()
+            self._iniciou_tracemalloc = False
+
+    def clear(self):
+        """Descarta os eventos registrados."""
+        self.events = []
+        self._origem_ns = time.perf_counter_ns()
+        self._inicio_processo_ns = None
+
+    # --------------------------------------------------------------------------
+    # Registro das etapas
+    # --------------------------------------------------------------------------
+
+    def _pilha(self):
+        pilha = getattr(self._local, 'pilha', None)
+        if pilha is None:
+            pilha = self._local.pilha = []
+        return pilha
+
+    def _registrar_startup(self):
+        """Registra a etapa 'startup': do início do processo até a primeira etapa."""
+        inicio_ns, self._inicio_processo_ns = self._inicio_processo_ns, None
+        self.events.append({'name': 'startup', 'ph': 'X', 'pid': os.getpid(), 'tid': threading.get_ident(),
+                            'ts': (inicio_ns - self._origem_ns) / 1e3,
+                            'dur': (time.perf_counter_ns() - inicio_ns) / 1e3,
+                            'args': {'cpu_ms': round(time.process_time_ns() / 1e6, 3)}})
+
+    def begin(self, name, **args):
+        """Abre uma etapa (feche com end()). Sem efeito se desativado."""
+        if not self.enabled:
+            return
+        if self._inicio_processo_ns is not None:
+            self._registrar_startup()
+        pilha = self._pilha()
+        memoria_atual = 0
+        if self.memory and tracemalloc.is_tracing():
+            memoria_atual, pico = tracemalloc.get_traced_memory()
+            if pilha:  # Preserva o pico da etapa externa antes de zerar o contador.
+                pilha[-1]['pico'] = max(pilha[-1]['pico'], pico)
+            tracemalloc.reset_peak()
+        pilha.append({'name': name, 'args': args, 'inicio_ns': time.perf_counter_ns(),
+                      'cpu_ns': time.process_time_ns(), 'memoria': memoria_atual, 'pico': memoria_atual})
+
+    def end(self):
+        """Fecha a etapa aberta mais recente."""
+        pilha = getattr(self._local, 'pilha', None)
+        if not pilha:
+            return
+        fim_ns, cpu_fim_ns = time.perf_counter_ns(), time.process_time_ns()
+        etapa = pilha.pop()
+        pico_kb = None
+        if self.memory and tracemalloc.is_tracing():
+            pico = max(etapa['pico'], tracemalloc.get_traced_memory()[1])
+            pico_kb = round((pico - etapa['memoria']) / 1024, 1)
+            if pilha:
+                pilha[-1]['pico'] = max(pilha[-1]['pico'], pico)
+            tracemalloc.reset_peak()
+        argumentos = {chave: valor if isinstance(valor, (int, float, bool)) else str(valor)
+                      for chave, valor in etapa['args'].items()}
+        argumentos['cpu_ms'] = round((cpu_fim_ns - etapa['cpu_ns']) / 1e6, 3)
+        if pico_kb is not None:
+            argumentos['peak_kb'] = pico_kb
+        self.events.append({'name': etapa['name'], 'ph': 'X', 'pid': os.getpid(), 'tid': threading.get_ident(),
+                            'ts': (etapa['inicio_ns'] - self._origem_ns) / 1e3, 'dur': (fim_ns - etapa['inicio_ns']) / 1e3,
+                            'args': argumentos})
+
+    def stage(self, name, **args):
+        """
+        Context manager de uma etapa.
+
+        Args:
+            name (str): Nome da etapa (ex: 'hpo', 'carga_dados').
+            **args: Atributos da etapa exibidos no trace (ex: scaler, fold, model).
+        Returns:
+            Context manager (um contexto vazio compartilhado se desativado).
+        """
+        if not self.enabled:
+            return _CONTEXTO_NULO
+        return _Etapa(self, name, args)
+
+    def traced(self, name=None):
+        """Decorator: registra cada chamada da função como uma etapa (nome padrão = nome da função)."""
+        def decorator(funcao):
+            nome_etapa = name or funcao.__qualname__
+
+            @functools.wraps(funcao)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return funcao(*args, **kwargs)
+                self.begin(nome_etapa)
+                try:
+                    return funcao(*args, **kwargs)
+                finally:
+                    self.end()
+            return wrapper
+        return decorator
+
+    # --------------------------------------------------------------------------
+    # Exportação
+    # --------------------------------------------------------------------------
+
+    def export_chrome_trace(self, path):
+        """
+        Salva os eventos no formato Chrome Trace Event (JSON).
+
+        Args:
+            path (str): Arquivo de saída (.json).
+        Returns:
+            str: O caminho salvo.
+        """
+        with open(path, 'w', encoding='utf-8') as arquivo:
+            json.dump({'traceEvents': self.events, 'displayTimeUnit': 'ms'}, arquivo, ensure_ascii=False)
+        return path
+
+    def summary(self):
+        """
+        Totais por nome de etapa.
+
+        Returns:
+            pd.DataFrame: Colunas stage, calls, wall_s, cpu_s, max_peak_mb, ordenada por wall_s.
+        """
+        import pandas as pd  # Importado só aqui: o rastreamento não atrasa a inicialização dos scripts.
+
+        linhas = [{'stage': evento['name'], 'wall_s': evento['dur'] / 1e6, 'cpu_s': evento['args']['cpu_ms'] / 1e3,
+                   'peak_mb': evento['args'].get('peak_kb', float('nan')) / 1024} for evento in self.events]
+        if not linhas:
+            return pd.DataFrame(columns=['stage', 'calls', 'wall_s', 'cpu_s', 'max_peak_mb'])
+        resumo = pd.DataFrame(linhas).groupby('stage').agg(calls=('wall_s', 'size'), wall_s=('wall_s', 'sum'),
+                                                           cpu_s=('cpu_s', 'sum'), max_peak_mb=('peak_mb', 'max'))
+        return resumo.sort_values('wall_s', ascending=False).reset_index()
+
+
+# --- Instância compartilhada pelos módulos, scripts e notebooks ---
+TRACER = Tracer(enabled=os.environ.get('TRACE_ETAPAS', '0') not in ('', '0'))
+traced = TRACER.traced
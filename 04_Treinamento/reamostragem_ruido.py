@@ -0,0 +1,223 @@
+# ==============================================================================
+# MÓDULO: SOBREAMOSTRAGEM COM RUÍDO GAUSSIANO (COMPATÍVEL COM IMBLEARN)
+# Descrição: Versão vetorizada do gerador de sintéticos
+#            (02_GeradorDeSinteticos/ML_Trabalho_GeradorSinteticos_v4.py:
+#            gerar_amostra_com_ruido_gaussiano + calcular_pontuacao_amostra +
+#            classificar_adequacao_milho) empacotada como um sampler do
+#            imblearn. Pode ser usada dentro de um ImbPipeline, de modo que a
+#            sobreamostragem ocorra em cada fold apenas na parte de treino, sem
+#            um CSV pré-aumentado por configuração.
+# ==============================================================================
+
+import math  # Tamanho dos lotes de candidatos.
+import warnings  # Aviso quando a classe não atinge a contagem pedida.
+
+import numpy as np  # Geração vetorizada dos candidatos e pontuação.
+from imblearn.over_sampling.base import BaseOverSampler  # Base dos samplers de sobreamostragem.
+from imblearn.utils import check_target_type  # Mesma validação de y do imblearn.
+from sklearn.utils import check_random_state  # Semente reprodutível.
+from sklearn.utils.validation import validate_data  # Validação de X aceitando NaN.
+
+from rastreamento import TRACER  # Tempo/memória por regra e por classe (desativado por padrão).
+from regras_milho import COLUNAS_TEXTURA, rule_scores  # Colunas de textura e pontuação pelos critérios.
+
+_TENTATIVAS_TEXTURA = 500  # Tentativas da geração especial de textura (como no gerador).
+
+
+# ==============================================================================
+# SEÇÃO: SAMPLER
+# ==============================================================================
+
+class GaussianNoiseOversampler(BaseOverSampler):
+    """
+    Sobreamostragem por ruído gaussiano com validação pelas regras agronômicas.
+
+    Para cada classe a aumentar, sorteia amostras base da própria classe, soma
+    ruído N(0, noise_fraction * std) às colunas numéricas (limitado ao mínimo e
+    máximo observados), trata as colunas de textura (areia, argila e silte somando
+    100%) como o gerador e, se `class_score_ranges` for informado, mantém apenas
+    os candidatos cuja pontuação pelos critérios cai na faixa da classe alvo.
+    Os candidatos são gerados e validados em lotes vetorizados até atingir a
+    contagem pedida ou o limite de tentativas (max_retries por amostra x 1.5).
+
+    As estatísticas (std, mínimo, máximo) vêm dos dados recebidos em fit_resample,
+    ou seja, apenas da parte de treino do fold.
+
+    Args:
+        sampling_strategy: Estratégia do imblearn ('auto' = igualar à classe majoritária).
+        random_state (int, RandomState ou None): Semente.
+        noise_fraction (float): Fração do desvio padrão usada como desvio do ruído (FRACAO_STD_RUIDO).
+        criteria (dict ou None): Critérios {coluna: (mínimo, máximo)} em unidades originais.
+        class_score_ranges (dict ou None): {rótulo de y: (pontuação mínima, máxima)}.
+            Se None, os candidatos não são validados pelas regras.
+        texture_columns (tuple): Colunas (areia, argila, silte) normalizadas para somar 100%.
+        special_texture_class: Rótulo de y para o qual a textura é sorteada dentro dos
+            critérios (a lógica de 'Alta adequacao' do gerador).
+        feature_scale (dict ou None): {coluna: (mínimo, máximo)} para converter X
+            normalizado (MinMax) em unidades originais; None = X já está em unidades originais.
+        exclude_columns (tuple): Colunas copiadas da amostra base, sem ruído (ex: 'ID').
+        max_retries (int): Tentativas por amostra (MAX_RETRIES_PER_INDIVIDUAL_SAMPLE).
+        base_indices (array-like ou None): Posições das linhas de X que podem servir de
+            amostra base (ex: só as amostras reais novas numa atualização incremental);
+            as estatísticas continuam vindo de todas as linhas. None = todas.
+    """
+
+    _parameter_constraints = {
+        **BaseOverSampler._parameter_constraints,
+        'noise_fraction': [float, int],
+        'criteria': [dict, None],
+        'class_score_ranges': [dict, None],
+        'texture_columns': [tuple, list],
+        'special_texture_class': 'no_validation',
+        'feature_scale': [dict, None],
+        'exclude_columns': [tuple, list],
+        'max_retries': [int],
+        'base_indices': ['array-like', None],
+    }
+
+    def __init__(self, sampling_strategy='auto', random_state=None, noise_fraction=0.05, criteria=None,
+                 class_score_ranges=None, texture_columns=COLUNAS_TEXTURA, special_texture_class=None,
+                 feature_scale=None, exclude_columns=('ID',), max_retries=30, base_indices=None):
+        super().__init__(sampling_strategy=sampling_strategy)
+        self.random_state = random_state
+        self.noise_fraction = noise_fraction
+        self.criteria = criteria
+        self.class_score_ranges = class_score_ranges
+        self.texture_columns = texture_columns
+        self.special_texture_class = special_texture_class
+        self.feature_scale = feature_scale
+        self.exclude_columns = exclude_columns
+        self.max_retries = max_retries
+        self.base_indices = base_indices
+
+    def _check_X_y(self, X, y, accept_sparse=None):
+        # Como o gerador, aceita valores ausentes (não recebem ruído e não pontuam).
+        y, binarize_y = check_target_type(y, indicate_one_vs_all=True)
+        X, y = validate_data(self, X=X, y=y, reset=True, ensure_all_finite='allow-nan', dtype=np.float64)
+        return X, y, binarize_y
+
+    # --------------------------------------------------------------------------
+    # Geração dos candidatos
+    # --------------------------------------------------------------------------
+
+    def _textura_com_ruido(self, candidatos, base, linhas, rng):
+        """Ruído + normalização para 100% nas colunas de textura (caso geral do gerador)."""
+        n = len(linhas)
+        texturas = np.empty((n, 3))
+        for k, i_coluna in enumerate(self._idx_textura):
+            desvio = self._std[i_coluna] * self.noise_fraction
+            ruido = rng.normal(0, desvio, n) if desvio > 0 else 0.0
+            texturas[:, k] = np.fmax(0, base[linhas, i_coluna] + ruido)  # max(0, x) do gerador.
+        soma = texturas.sum(axis=1)
+        valida = soma > 1e-5
+        areia = np.where(valida, texturas[:, 0] / np.where(valida, soma, 1) * 100.0, 33.33)
+        argila = np.where(valida, texturas[:, 1] / np.where(valida, soma, 1) * 100.0, 33.33)
+        silte = np.where(valida, 100.0 - areia - argila, 33.34)
+        for k, valores in enumerate((areia, argila, silte)):
+            candidatos[linhas, self._idx_textura[k]] = valores
+
+    def _textura_nos_criterios(self, candidatos, base, rng):
+        """Sorteia areia/argila/silte dentro dos critérios e somando 100% (lógica de 'Alta adequacao')."""
+        (s_min, s_max), (c_min, c_max), (l_min, l_max) = (self.criteria[c] for c in self.texture_columns)
+        pendentes = np.arange(len(candidatos))
+        for _ in range(_TENTATIVAS_TEXTURA):
+            if not len(pendentes):
+                break
+            areia = rng.uniform(s_min, s_max, len(pendentes))
+            argila_min = np.maximum(c_min, 100.0 - areia - l_max)
+            argila_max = np.minimum(c_max, 100.0 - areia - l_min)
+            possivel = argila_min <= argila_max
+            argila = rng.uniform(argila_min, np.where(possivel, argila_max, argila_min))
+            silte = 100.0 - areia - argila
+            ok = possivel & (silte >= l_min) & (silte <= l_max)
+            linhas = pendentes[ok]
+            for k, valores in enumerate((areia[ok], argila[ok], silte[ok])):
+                candidatos[linhas, self._idx_textura[k]] = valores
+            pendentes = pendentes[~ok]
+        if len(pendentes):  # Fallback do gerador: ruído + normalização.
+            self._textura_com_ruido(candidatos, base, pendentes, rng)
+
+    def _gerar_candidatos(self, base_classe, n_candidatos, classe, rng):
+        """Gera n_candidatos amostras com ruído a partir das amostras base da classe (unidades originais)."""
+        base = base_classe[rng.randint(0, len(base_classe), n_candidatos)]
+        candidatos = base.copy()
+        desvios = self._std[self._idx_ruido] * self.noise_fraction
+        com_desvio = np.isfinite(desvios) & (desvios > 0)
+        idx_ruido, desvios = self._idx_ruido[com_desvio], desvios[com_desvio]
+        ruido = rng.normal(0, 1, (n_candidatos, len(idx_ruido))) * desvios
+        candidatos[:, idx_ruido] = np.clip(base[:, idx_ruido] + ruido, self._min[idx_ruido], self._max[idx_ruido])
+
+        if self._idx_textura is not None:
+            textura_especial = (classe == self.special_texture_class and self.criteria is not None
+                                and all(c in self.criteria for c in self.texture_columns))
+            if textura_especial:
+                self._textura_nos_criterios(candidatos, base, rng)
+            else:
+                self._textura_com_ruido(candidatos, base, np.arange(n_candidatos), rng)
+        return candidatos
+
+    def _validos(self, candidatos, classe):
+        """Máscara dos candidatos cuja classe pelas regras é a classe alvo."""
+        if self.class_score_ranges is None or self.criteria is None:
+            return np.ones(len(candidatos), dtype=bool)
+        minimo, maximo = self.class_score_ranges[classe]
+        pontuacao = rule_scores(candidatos, self._colunas, self.criteria)
+        return (pontuacao >= minimo) & (pontuacao <= maximo)
+
+    # --------------------------------------------------------------------------
+    # fit_resample
+    # --------------------------------------------------------------------------
+
+    def _fit_resample(self, X, y):
+        rng = check_random_state(self.random_state)
+        self._colunas = [str(c) for c in getattr(self, 'feature_names_in_', range(X.shape[1]))]
+
+        # --- Conversão para unidades originais (inverso do MinMax do pré-processamento) ---
+        escala = {c: faixa for c, faixa in (self.feature_scale or {}).items() if c not in self.exclude_columns}
+        self._escala_min = np.array([escala.get(c, (0.0, 1.0))[0] for c in self._colunas], dtype=float)
+        self._escala_amplitude = np.array([escala.get(c, (0.0, 1.0))[1] - escala.get(c, (0.0, 1.0))[0]
+                                           for c in self._colunas], dtype=float)
+        X_bruto = X * self._escala_amplitude + self._escala_min
+
+        # --- Estatísticas da parte de treino (original_df_stats do gerador) ---
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore', category=RuntimeWarning)  # Colunas inteiramente NaN.
+            self._std = np.nan_to_num(np.nanstd(X_bruto, axis=0, ddof=1))
+            self._min = np.nanmin(X_bruto, axis=0)
+            self._max = np.nanmax(X_bruto, axis=0)
+
+        posicoes = {c: i for i, c in enumerate(self._colunas)}
+        self._idx_textura = (np.array([posicoes[c] for c in self.texture_columns])
+                             if all(c in posicoes for c in self.texture_columns) else None)
+        sem_ruido = set(self.exclude_columns) | (set(self.texture_columns) if self._idx_textura is not None else set())
+        self._idx_ruido = np.array([i for i, c in enumerate(self._colunas) if c not in sem_ruido], dtype=int)
+
+        elegiveis = np.ones(len(X), dtype=bool)
+        if self.base_indices is not None:
+            elegiveis[:] = False
+            elegiveis[np.asarray(self.base_indices, dtype=int)] = True
+
+        X_novos, y_novos = [X], [y]
+        for classe, n_necessarios in self.sampling_strategy_.items():
+            base_classe = X_bruto[(y == classe) & elegiveis]
+            if n_necessarios == 0 or not len(base_classe):
+                continue
+            aceitos, n_aceitos = [], 0
+            tentativas_restantes = int(n_necessarios * self.max_retries * 1.5)  # Limite de segurança do gerador.
+            taxa_aceite = 1.0
+            with TRACER.stage('geracao', classe=classe, necessarios=int(n_necessarios)):
+                while n_aceitos < n_necessarios and tentativas_restantes > 0:
+                    lote = min(tentativas_restantes, max(16, math.ceil(1.2 * (n_necessarios - n_aceitos) / taxa_aceite)))
+                    candidatos = self._gerar_candidatos(base_classe, lote, classe, rng)
+                    validos = candidatos[self._validos(candidatos, classe)]
+                    aceitos.append(validos)
+                    n_aceitos += len(validos)
+                    tentativas_restantes -= lote
+                    taxa_aceite = max(len(validos) / lote, 1e-3)
+            gerados = np.concatenate(aceitos)[:n_necessarios] if aceitos else np.empty((0, X.shape[1]))
+            if len(gerados) < n_necessarios:
+                warnings.warn(f"Classe {classe!r}: gerou apenas {len(gerados)} de {n_necessarios} amostras válidas.")
+            X_novos.append((gerados - self._escala_min) / np.where(self._escala_amplitude == 0, 1, self._escala_amplitude))
+            y_novos.append(np.full(len(gerados), classe, dtype=y.dtype))
+
+        return np.vstack(X_novos), np.concatenate(y_novos)
@@ -0,0 +1,73 @@
+# ==============================================================================
+# MÓDULO: CRITÉRIOS E PONTUAÇÃO DO MILHO (SEM DEPENDÊNCIAS DE ML)
+# Descrição: Critérios agronômicos do milho, faixas de pontuação das classes e
+#            pontuação vetorizada pelas regras. Ficam separados do sampler
+#            (reamostragem_ruido.py, que importa o imblearn e o sklearn) para
+#            que a pontuação (adequacao_culturas.py, gerador de sintéticos)
+#            dependa apenas do NumPy/pandas e inicie sem carregar o sklearn.
+#            Os critérios e as faixas são importados sempre daqui.
+# ==============================================================================
+
+import numpy as np  # Pontuação vetorizada.
+import pandas as pd  # Leitura do CSV bruto para a escala dos atributos.
+
+from rastreamento import TRACER  # Tempo/memória por regra (desativado por padrão).
+
+# --- Critérios agronômicos do milho (mesmos do gerador de sintéticos) ---
+CRITERIOS_MILHO = {
+    'pH': (5.5, 6.5), 'Sand %': (30, 50), 'Clay %': (20, 35), 'Silt %': (20, 40),
+    'EC mS/cm': (0, 1), 'O.M. %': (2.0, float('inf')), 'CACO3 %': (0, 5),
+    'N_NO3 ppm': (20, float('inf')), 'P ppm': (12, float('inf')), 'K ppm': (120, float('inf')),
+    'Mg ppm': (50, 150), 'Fe ppm': (4, 8), 'Zn ppm': (1, 2), 'Mn ppm': (5, 20),
+    'Cu ppm': (0.5, 2), 'B ppm': (0.5, 1.5)
+}
+# --- Faixas de pontuação de cada classe (Baixa, Média, Alta), como no mapa_pontuacao_classe ---
+FAIXAS_PONTUACAO_MILHO = {'Baixa': (0, 5), 'Média': (6, 11), 'Alta': (12, len(CRITERIOS_MILHO))}
+COLUNAS_TEXTURA = ('Sand %', 'Clay %', 'Silt %')
+
+
+# ==============================================================================
+# SEÇÃO: ESCALA DOS ATRIBUTOS E PONTUAÇÃO
+# ==============================================================================
+
+def load_feature_scale(raw_csv_path, sep=';', decimal=','):
+    """
+    Lê o CSV bruto (antes do pré-processamento) e retorna o (mínimo, máximo) de
+    cada coluna numérica, isto é, a escala usada pelo MinMaxScaler do
+    pré-processamento. Permite aplicar os critérios (em unidades originais) aos
+    dados normalizados.
+
+    Args:
+        raw_csv_path (str): Caminho do CSV bruto.
+        sep (str): Separador de colunas.
+        decimal (str): Separador decimal.
+    Returns:
+        dict: {coluna: (mínimo, máximo)}.
+    """
+    df_bruto = pd.read_csv(raw_csv_path, sep=sep, decimal=decimal)
+    df_bruto = df_bruto.dropna(axis='columns', how='all')
+    df_bruto.columns = df_bruto.columns.str.strip()
+    numericas = df_bruto.select_dtypes(include=np.number)
+    return {col: (numericas[col].min(), numericas[col].max()) for col in numericas.columns}
+
+
+def rule_scores(X_raw, columns, criteria):
+    """
+    Pontuação de adequação de cada linha (vetorizada de calcular_pontuacao_amostra).
+
+    Args:
+        X_raw (np.ndarray): Atributos em unidades originais (n_amostras, n_colunas).
+        columns (list): Nomes das colunas de X_raw.
+        criteria (dict): {coluna: (mínimo, máximo)}; máximo inf = sem limite superior.
+    Returns:
+        np.ndarray: Pontuação (número de critérios atendidos) por linha. NaN não pontua.
+    """
+    pontuacao = np.zeros(len(X_raw), dtype=np.int64)
+    for i_coluna, coluna in enumerate(columns):
+        if coluna in criteria:
+            with TRACER.stage(f'regra[{coluna}]'):
+                minimo, maximo = criteria[coluna]
+                valores = X_raw[:, i_coluna]
+                atende = valores >= minimo if maximo == float('inf') else (valores >= minimo) & (valores <= maximo)
+                pontuacao += atende  # Comparações com NaN são False.
+    return pontuacao
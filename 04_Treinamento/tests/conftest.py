@@ -0,0 +1,27 @@
+# ==============================================================================
+# MÓDULO: conftest.py
+# DESCRIÇÃO: Configuração comum dos testes de 04_Treinamento: põe a pasta dos
+#              módulos no caminho de importação e carrega a base original
+#              (rótulos de 'Adequação MILHO') usada como distribuição de referência.
+#              Execução: python -m pytest -q 04_Treinamento/tests
+# ==============================================================================
+
+import os  # Caminhos relativos a este arquivo.
+import sys  # Caminho de importação dos módulos de 04_Treinamento.
+
+import pytest  # Fixtures.
+
+PASTA_TREINAMENTO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PASTA_TREINAMENTO)
+
+from leitura_csv import read_dataset_csv  # noqa: E402  Leitura dos CSVs do projeto.
+
+TARGET = 'Adequação MILHO'
+CAMINHO_ORIGINAL = os.path.join(PASTA_TREINAMENTO, '..', '00_Datasets', 'Dataset_OriginalComClass.csv')
+
+
+@pytest.fixture(scope='session')
+def base_original():
+    """Base original com a classe do milho (sem colunas vazias nem linhas sem rótulo)."""
+    df = read_dataset_csv(CAMINHO_ORIGINAL).dropna(axis='columns', how='all')
+    return df[df[TARGET].notna()].reset_index(drop=True)
@@ -0,0 +1,26 @@
+# ==============================================================================
+# MÓDULO: test_atualizacao_incremental.py
+# DESCRIÇÃO: Regressão da atualização incremental: um envio de amostras da
+#              mesma distribuição do treino (holdout aleatório da base original)
+#              não deve pedir a busca completa por deriva.
+# ==============================================================================
+
+import warnings  # Avisos dos sintéticos (classe 'Alta' com poucas amostras).
+
+import numpy as np  # Sorteio do holdout.
+import pytest  # Parametrização.
+
+from atualizacao_incremental import deploy_model, incremental_update  # Módulo testado.
+
+
+@pytest.mark.parametrize('n', [40, 156])
+@pytest.mark.parametrize('semente', [0, 1, 2])
+def test_holdout_da_mesma_distribuicao_nao_pede_busca_completa(base_original, n, semente):
+    ordem = np.random.RandomState(semente).permutation(len(base_original))
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore', UserWarning)
+        bundle = deploy_model(base_original.iloc[ordem[n:]].reset_index(drop=True))
+        relatorio = incremental_update(bundle, base_original)
+    assert relatorio['n_new'] == n
+    assert relatorio['drifted_features'] == []
+    assert not relatorio['needs_full_search']
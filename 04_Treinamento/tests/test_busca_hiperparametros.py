@@ -0,0 +1,61 @@
+# ==============================================================================
+# MÓDULO: test_busca_hiperparametros.py
+# DESCRIÇÃO: Modos rápidos de HPO: a busca da árvore de decisão reproduz o
+#              RandomizedSearchCV quando todos os candidatos são reavaliados e
+#              faz o número de ajustes documentado; a busca da floresta só é
+#              usada com hiperparâmetros do próprio modelo.
+# ==============================================================================
+
+import numpy as np  # Matriz de atributos.
+import pytest  # Monkeypatch.
+from sklearn.model_selection import RandomizedSearchCV, StratifiedKFold
+from sklearn.preprocessing import StandardScaler
+from sklearn.tree import DecisionTreeClassifier
+
+from busca_hiperparametros import DecisionTreePathSearch, RandomForestPrefixSearch  # Módulo testado.
+from conftest import TARGET  # Coluna da classe.
+from experimento import BASE_MODELS, PARAM_DISTS, build_pipeline  # Configuração dos experimentos.
+
+N_ITER = 12
+
+
+@pytest.fixture(scope='module')
+def dados(base_original):
+    X = base_original.drop(columns=[TARGET, 'ID']).select_dtypes(include=np.number).to_numpy(dtype=float)
+    return X, base_original[TARGET].astype('category').cat.codes.to_numpy()
+
+
+def _busca(classe_busca, **kwargs):
+    return classe_busca(build_pipeline(BASE_MODELS['DecisionTree']), PARAM_DISTS['DecisionTree'],
+                        cv=StratifiedKFold(3, shuffle=True, random_state=0), n_iter=N_ITER,
+                        scoring='f1_macro', random_state=0, **kwargs)
+
+
+def test_arvore_com_todos_reavaliados_coincide_com_randomized(dados):
+    X, y = dados
+    rapida = _busca(DecisionTreePathSearch, n_exatos=N_ITER).fit(X, y)
+    referencia = _busca(RandomizedSearchCV).fit(X, y)
+    assert rapida.best_params_ == referencia.best_params_
+    np.testing.assert_allclose(rapida.cv_results_['mean_test_score'], referencia.cv_results_['mean_test_score'])
+
+
+def test_arvore_ajustes_por_split(dados, monkeypatch):
+    X, y = dados
+    ajustes = []
+    fit_original = DecisionTreeClassifier.fit
+    monkeypatch.setattr(DecisionTreeClassifier, 'fit',
+                        lambda self, *args, **kwargs: ajustes.append(1) or fit_original(self, *args, **kwargs))
+    busca = _busca(DecisionTreePathSearch, n_exatos=5).fit(X, y)
+    grupos = {(c['model__criterion'], c['model__min_samples_leaf']) for c in busca.cv_results_['params']}
+    assert len(ajustes) == busca.n_splits_ * (len(grupos) + 5) + 1  # + 1: refit do melhor.
+
+
+@pytest.mark.parametrize('espaco, esperado', [
+    (PARAM_DISTS['RandomForest'], True),
+    ({**PARAM_DISTS['RandomForest'], 'scaler__with_mean': [True, False]}, False),
+    ({**PARAM_DISTS['RandomForest'], 'model__inexistente': [1, 2]}, False),
+    ({k: v for k, v in PARAM_DISTS['RandomForest'].items() if k != 'model__n_estimators'}, False),
+])
+def test_floresta_suporta_apenas_parametros_do_modelo(espaco, esperado):
+    pipeline = build_pipeline(BASE_MODELS['RandomForest'], StandardScaler)
+    assert RandomForestPrefixSearch.suporta(pipeline, espaco) is esperado
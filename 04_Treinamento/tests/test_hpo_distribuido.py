@@ -0,0 +1,24 @@
+# ==============================================================================
+# MÓDULO: test_hpo_distribuido.py
+# DESCRIÇÃO: O coordenador do HPO distribuído não espera para sempre quando
+#              todos os workers locais morrem sem nenhum worker conectado.
+# ==============================================================================
+
+import multiprocessing  # Workers locais que encerram sem conectar.
+import os  # Saída imediata do processo.
+import time  # Duração da espera.
+
+import pytest  # Verificação da exceção.
+
+from hpo_distribuido import HPOCoordinator  # Módulo testado.
+
+
+def test_run_interrompe_quando_workers_locais_morrem():
+    processos = [multiprocessing.get_context('spawn').Process(target=os._exit, args=(3,)) for _ in range(2)]
+    for processo in processos:
+        processo.start()
+    inicio = time.monotonic()
+    with HPOCoordinator({}, ('localhost', 0), authkey=b'teste') as coordenador:
+        with pytest.raises(RuntimeError, match=r'\[3, 3\]'):
+            coordenador.run({'tarefa': {}}, processes=processos)
+    assert time.monotonic() - inicio < 30
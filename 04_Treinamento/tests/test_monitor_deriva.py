@@ -0,0 +1,48 @@
+# ==============================================================================
+# MÓDULO: test_monitor_deriva.py
+# DESCRIÇÃO: Lotes da mesma distribuição do treino não devem ser marcados com
+#              deriva (tamanhos de 30 a 150, como os envios reais), e lotes com
+#              deslocamento, escala ou proporção de classes alterados devem.
+# ==============================================================================
+
+import numpy as np  # Sorteio das partições.
+import pytest  # Parametrização.
+
+from conftest import TARGET  # Coluna da classe.
+from monitor_deriva import DriftMonitor, build_training_profile  # Módulo testado.
+
+N_SORTEIOS = 20
+
+
+def _particoes(df, n, n_sorteios=N_SORTEIOS):
+    """Partições aleatórias (treino, lote de n amostras) da mesma base."""
+    for semente in range(n_sorteios):
+        ordem = np.random.RandomState(semente).permutation(len(df))
+        yield df.iloc[ordem[n:]], df.iloc[ordem[:n]].copy()
+
+
+def _marcado(perfil, lote):
+    monitor = DriftMonitor(perfil)
+    monitor.update_batch(lote, labels=lote[TARGET])
+    return monitor.needs_retraining()
+
+
+@pytest.mark.parametrize('n', [30, 40, 100, 150])
+def test_lotes_da_mesma_distribuicao_nao_marcam(base_original, n):
+    marcados = sum(_marcado(build_training_profile(treino, target=TARGET), lote)
+                   for treino, lote in _particoes(base_original, n))
+    assert marcados <= 1  # Nível nominal de 1% por relatório; tolera um falso alarme em 20.
+
+
+@pytest.mark.parametrize('n', [40, 150])
+def test_lotes_alterados_marcam(base_original, n):
+    atributo = 'Silt %'
+    for semente, (treino, lote) in enumerate(_particoes(base_original, n, n_sorteios=5)):
+        perfil = build_training_profile(treino, target=TARGET)
+        media, desvio = treino[atributo].mean(), treino[atributo].std()
+        deslocado = lote.assign(**{atributo: lote[atributo] + desvio})
+        escalado = lote.assign(**{atributo: media + (lote[atributo] - media) * 3})
+        classe_rara = base_original[base_original[TARGET] == 'Baixa'].sample(n, replace=True, random_state=semente)
+        assert _marcado(perfil, deslocado)
+        assert _marcado(perfil, escalado)
+        assert _marcado(perfil, classe_rara)